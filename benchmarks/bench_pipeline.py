@@ -0,0 +1,227 @@
+# benchmarks/bench_pipeline.py
+"""
+Бенчмарк конвеєра Universe Editor на синтетичних .pak.
+
+Для кожного режиму (extract / streaming / overlay) генерує свіжу копію
+.pak, запускає PatchEngine в окремому процесі й міряє час кожного етапу,
+файли/с і MB/s, пікову пам'ять (RSS) і пікове використання тимчасового
+диску. Результат дописується в JSON, щоб порівнювати запуски між собою.
+
+Запуск з кореня репозиторію:
+    python -m benchmarks.bench_pipeline --creatures 2000 --filler-files 5000 \\
+        --filler-kb 32 --modes extract,streaming,overlay --out bench_results.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.synth import make_pak
+from core.growth_index import INDEX_NAME
+from core.patch_engine import CREATURE_FOLDERS, OUTPUT_INPLACE, OUTPUT_OVERLAY, PatchEngine
+from core.xdb_patch import ENGINE_ETREE, ENGINE_FAST
+
+MODES = {
+    "extract": {"streaming": False, "output": OUTPUT_INPLACE},
+    "streaming": {"streaming": True, "output": OUTPUT_INPLACE},
+    "overlay": {"streaming": True, "output": OUTPUT_OVERLAY},
+}
+# Етапи, що працюють з усім архівом (решта — лише з creature .xdb)
+WHOLE_PAK_PHASES = {"extract", "repack", "rewrite", "backup"}
+
+
+def dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for f in files:
+            try:
+                total += os.path.getsize(os.path.join(root, f))
+            except OSError:
+                pass  # файл встигли видалити між walk і stat
+    return total
+
+
+class DiskSampler(threading.Thread):
+    """Раз на `interval` с міряє приріст розміру тек; зберігає пік."""
+
+    def __init__(self, paths, interval=0.05):
+        super().__init__(daemon=True)
+        self.paths = paths
+        self.interval = interval
+        self.base = sum(dir_size(p) for p in paths)
+        self.peak = 0
+        self._halt = threading.Event()
+
+    def run(self):
+        while not self._halt.is_set():
+            self.sample()
+            self._halt.wait(self.interval)
+
+    def sample(self):
+        self.peak = max(self.peak, sum(dir_size(p) for p in self.paths) - self.base)
+
+    def stop(self):
+        self._halt.set()
+        self.join()
+        self.sample()
+
+
+def peak_rss_bytes():
+    """Пікова RSS процесу й дочірніх (пул процесів); None, якщо ОС не дає."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    scale = 1 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) * scale
+
+
+def run_child(cfg):
+    """Один запуск у дочірньому процесі: cfg — dict, результат — dict."""
+    work = cfg["work_dir"]
+    tmp = os.path.join(work, "tmp")
+    os.makedirs(tmp, exist_ok=True)
+    tempfile.tempdir = tmp
+
+    marks = []
+    sampler = DiskSampler([tmp, os.path.dirname(cfg["pak"])])
+    sampler.start()
+    engine = PatchEngine(
+        cfg["pak"], cfg["factor"], cfg["backup"], "", False,
+        streaming=cfg["streaming"], workers=cfg["workers"], engine=cfg["engine"],
+        output=cfg["output"],
+        phase=lambda name: marks.append((name, time.perf_counter())),
+        # Свій індекс у робочій теці — щоб він був «холодним»
+        index_path=os.path.join(work, INDEX_NAME),
+    )
+    t0 = time.perf_counter()
+    result = engine.run()
+    total = time.perf_counter() - t0
+    sampler.stop()
+
+    phases = {}
+    for (name, start), (_, end) in zip(marks, marks[1:]):
+        phases[name] = phases.get(name, 0.0) + (end - start)
+    return {
+        "seconds": total,
+        "phases": phases,
+        "changed": result.changed_count,
+        "peak_rss_bytes": peak_rss_bytes(),
+        "peak_temp_disk_bytes": sampler.peak,
+    }
+
+
+def throughput(phases, total, pak_info):
+    """Файли/с і MB/s — для всього запуску й для кожного етапу."""
+    def rate(files, size, seconds):
+        if seconds <= 0:
+            return {"files_per_s": None, "mb_per_s": None}
+        return {"files_per_s": files / seconds, "mb_per_s": size / 1024 / 1024 / seconds}
+
+    out = {"total": rate(pak_info["members"], pak_info["raw_bytes"], total)}
+    creature_bytes = pak_info["creature_bytes"]
+    for name, seconds in phases.items():
+        if name in WHOLE_PAK_PHASES:
+            out[name] = rate(pak_info["members"], pak_info["raw_bytes"], seconds)
+        else:
+            out[name] = rate(pak_info["creatures"], creature_bytes, seconds)
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Бенчмарк конвеєра Universe Editor")
+    ap.add_argument("--creatures", type=int, default=2000)
+    ap.add_argument("--folders", default=",".join(CREATURE_FOLDERS),
+                    help="теки фракцій через кому")
+    ap.add_argument("--filler-files", type=int, default=5000, help="інших членів .pak")
+    ap.add_argument("--filler-kb", type=int, default=32, help="розмір члена-наповнювача")
+    ap.add_argument("--padding", type=int, default=20, help="зайвих <Item> на .xdb")
+    ap.add_argument("--modes", default="extract,streaming,overlay")
+    ap.add_argument("--engine", choices=[ENGINE_FAST, ENGINE_ETREE], default=ENGINE_FAST)
+    ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("--factor", type=float, default=1.5)
+    ap.add_argument("--backup", action="store_true", help="враховувати резервну копію")
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--out", default="bench_results.json",
+                    help="JSON-файл; нові результати дописуються до наявних")
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(json.loads(args.child))))
+        return
+
+    folders = [f.strip() for f in args.folders.split(",") if f.strip()]
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    for mode in modes:
+        if mode not in MODES:
+            ap.error(f"невідомий режим: {mode}")
+
+    root = tempfile.mkdtemp(prefix="universe_bench_")
+    try:
+        source = os.path.join(root, "source.pak")
+        pak_info = make_pak(source, args.creatures, folders, args.filler_files,
+                            args.filler_kb, args.padding)
+        print(f"pak: {pak_info['members']} членів, "
+              f"{pak_info['pak_bytes'] / 1024 / 1024:.1f} MB на диску")
+
+        runs = []
+        for mode in modes:
+            for rep in range(args.repeat):
+                work = os.path.join(root, f"{mode}_{rep}")
+                os.makedirs(os.path.join(work, "data"))
+                pak = os.path.join(work, "data", "Universe_mod.pak")
+                shutil.copyfile(source, pak)
+                cfg = dict(MODES[mode], pak=pak, work_dir=work, factor=args.factor,
+                           backup=args.backup, workers=args.workers, engine=args.engine)
+                proc = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_pipeline", "--child", json.dumps(cfg)],
+                    capture_output=True, text=True, check=True,
+                    cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                )
+                res = json.loads(proc.stdout.strip().splitlines()[-1])
+                res["mode"] = mode
+                res["repeat"] = rep
+                res["throughput"] = throughput(res["phases"], res["seconds"], pak_info)
+                runs.append(res)
+                shutil.rmtree(work, ignore_errors=True)
+
+                phases = ", ".join(f"{k} {v:.2f}s" for k, v in res["phases"].items())
+                rss = res["peak_rss_bytes"]
+                rss_text = f"{rss / 1024 / 1024:.0f} MB" if rss else "n/a"
+                print(f"{mode:>9} #{rep}: {res['seconds']:.2f}s "
+                      f"({res['throughput']['total']['mb_per_s']:.1f} MB/s) "
+                      f"RSS {rss_text}, диск +{res['peak_temp_disk_bytes'] / 1024 / 1024:.1f} MB "
+                      f"[{phases}]")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    record = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("child", "out")},
+        "pak": pak_info,
+        "runs": runs,
+    }
+    history = []
+    if os.path.exists(args.out):
+        with open(args.out, "r", encoding="utf-8") as f:
+            history = json.load(f)
+    history.append(record)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(history, f, ensure_ascii=False, indent=1)
+    print(f"Результати дописано до {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# benchmarks/bench_startup.py
+"""
+Бенчмарк запуску головного вікна на offscreen-платформі Qt.
+
+Кожен запуск — окремий процес `main.py --profile-startup --profile-exit`
+(див. core/startup_profile.py) з QT_QPA_PLATFORM=offscreen. Міряється
+повний час процесу (з інтерпретатором) і береться звіт профілювання:
+етапи побудови вікна й час імпортів.
+
+Холодний запуск — з порожнім кешем байткоду (PYTHONPYCACHEPREFIX на нову
+теку), теплий — з тим самим кешем після першого запуску. Дисковий кеш ОС
+не скидається, тож «холодний» тут означає без .pyc, а не після перезавантаження.
+Результат дописується в JSON, щоб порівнювати запуски між собою.
+
+Запуск з кореня репозиторію:
+    python -m benchmarks.bench_startup --repeat 5 --out startup_results.json
+    python -m benchmarks.bench_startup --tabs      # ще й побудова всіх вкладок
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from core.startup_profile import EXIT_ARG, PROFILE_ARG, TABS_ARG
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_once(work, pycache, tabs, timeout):
+    """Один запуск main.py; повертає звіт профілювання з доданим wall_seconds."""
+    report_path = os.path.join(work, "startup_profile.json")
+    cmd = [sys.executable, os.path.join(ROOT, "main.py"), f"{PROFILE_ARG}={report_path}", EXIT_ARG]
+    if tabs:
+        cmd.append(TABS_ARG)
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", PYTHONPYCACHEPREFIX=pycache)
+    t0 = time.perf_counter()
+    # cwd — тимчасова тека: *.ini вкладок не потрапляють у репозиторій
+    proc = subprocess.run(cmd, cwd=work, env=env, capture_output=True, text=True,
+                          timeout=timeout)
+    wall = time.perf_counter() - t0
+    if proc.returncode != 0 or not os.path.exists(report_path):
+        raise RuntimeError(f"main.py завершився з кодом {proc.returncode}:\n{proc.stderr}")
+    with open(report_path, "r", encoding="utf-8") as f:
+        report = json.load(f)
+    os.remove(report_path)
+    report["wall_seconds"] = wall
+    return report
+
+
+def summarize(runs, limit):
+    """Медіани: повний час, кожен етап, найдорожчі імпорти (повний час)."""
+    stages = {}
+    imports = {}
+    for run in runs:
+        for s in run["stages"]:
+            stages.setdefault(s["stage"], []).append(s["delta"])
+        for i in run["imports"]:
+            imports.setdefault(i["module"], []).append(i["total"])
+    top = sorted(((statistics.median(v), k) for k, v in imports.items()), reverse=True)[:limit]
+    return {
+        "runs": len(runs),
+        "wall_seconds": statistics.median(r["wall_seconds"] for r in runs),
+        "profiled_seconds": statistics.median(r["total"] for r in runs),
+        "stages": {k: statistics.median(v) for k, v in stages.items()},
+        "top_imports": {k: v for v, k in top},
+    }
+
+
+def print_summary(kind, summary):
+    print(f"{kind}: {summary['runs']} запусків, процес {summary['wall_seconds'] * 1000:.0f} мс, "
+          f"до вікна {summary['profiled_seconds'] * 1000:.0f} мс (медіани)")
+    for stage, seconds in summary["stages"].items():
+        print(f"  +{seconds * 1000:7.1f} мс  {stage}")
+    for module, seconds in summary["top_imports"].items():
+        print(f"  {seconds * 1000:8.1f} мс  import {module}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Бенчмарк запуску головного вікна (offscreen)")
+    ap.add_argument("--repeat", type=int, default=5, help="теплих запусків (і стільки ж холодних)")
+    ap.add_argument("--tabs", action="store_true", help="будувати всі вкладки, а не лише поточну")
+    ap.add_argument("--top", type=int, default=10, help="скільки найдорожчих імпортів показати")
+    ap.add_argument("--timeout", type=float, default=120)
+    ap.add_argument("--out", default="startup_results.json",
+                    help="JSON-файл; нові результати дописуються до наявних")
+    args = ap.parse_args()
+
+    root = tempfile.mkdtemp(prefix="startup_bench_")
+    cold, warm = [], []
+    try:
+        for rep in range(args.repeat):
+            # Холодний: свіжий кеш байткоду; теплий — одразу після нього з тим самим кешем
+            pycache = os.path.join(root, f"pycache_{rep}")
+            work = os.path.join(root, f"work_{rep}")
+            os.makedirs(work)
+            cold.append(run_once(work, pycache, args.tabs, args.timeout))
+            warm.append(run_once(work, pycache, args.tabs, args.timeout))
+            print(f"#{rep}: холодний {cold[-1]['wall_seconds'] * 1000:.0f} мс, "
+                  f"теплий {warm[-1]['wall_seconds'] * 1000:.0f} мс")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    results = {"cold": summarize(cold, args.top), "warm": summarize(warm, args.top)}
+    print_summary("Холодний", results["cold"])
+    print_summary("Теплий", results["warm"])
+
+    record = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {k: v for k, v in vars(args).items() if k != "out"},
+        "results": results,
+        "runs": {"cold": cold, "warm": warm},
+    }
+    history = []
+    if os.path.exists(args.out):
+        with open(args.out, "r", encoding="utf-8") as f:
+            history = json.load(f)
+    history.append(record)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(history, f, ensure_ascii=False, indent=1)
+    print(f"Результати дописано до {args.out}")
+
+
+if __name__ == "__main__":
+    main()
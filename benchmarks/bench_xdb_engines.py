@@ -0,0 +1,64 @@
+# benchmarks/bench_xdb_engines.py
+"""
+Порівняння рушіїв patch_growth: байтовий сканер проти ElementTree.
+
+Запуск з кореня репозиторію:
+    python -m benchmarks.bench_xdb_engines --count 20000 --repeat 3
+"""
+import argparse
+import time
+
+from benchmarks.synth import creature_set
+from core.patch_engine import CREATURE_FOLDERS
+from core.xdb_patch import ENGINE_ETREE, ENGINE_FAST, patch_growth, scan_growth
+
+
+def run_engine(files, factor, engine):
+    changed = 0
+    for member, data in files:
+        new_data, _ = patch_growth(data, factor, member, engine)
+        if new_data is not None:
+            changed += 1
+    return changed
+
+
+def check_equivalent(files, factor):
+    """Обидва рушії мають давати однакові значення WeeklyGrowth."""
+    for member, data in files:
+        fast, _ = patch_growth(data, factor, member, ENGINE_FAST)
+        tree, _ = patch_growth(data, factor, member, ENGINE_ETREE)
+        if (fast is None) != (tree is None):
+            raise AssertionError(f"Рушії розійшлися: {member}")
+        if fast is not None:
+            fast_vals = [v for _, _, v in scan_growth(fast)]
+            tree_vals = [v for _, _, v in scan_growth(tree)]
+            if fast_vals != tree_vals:
+                raise AssertionError(f"Різні значення: {member} {fast_vals} != {tree_vals}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--count", type=int, default=20000, help="кількість .xdb")
+    ap.add_argument("--padding", type=int, default=20, help="зайвих <Item> на файл")
+    ap.add_argument("--factor", type=float, default=1.5)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    files = creature_set(args.count, CREATURE_FOLDERS, padding=args.padding)
+    total_mb = sum(len(d) for _, d in files) / 1024 / 1024
+    check_equivalent(files[:500], args.factor)
+    print(f"{args.count} .xdb, {total_mb:.1f} MB, factor={args.factor}")
+
+    for engine in (ENGINE_ETREE, ENGINE_FAST):
+        best = None
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            changed = run_engine(files, args.factor, engine)
+            dt = time.perf_counter() - t0
+            best = dt if best is None else min(best, dt)
+        print(f"{engine:>6}: {best:.3f}s  {args.count / best:,.0f} файлів/с  "
+              f"{total_mb / best:.1f} MB/s  змінено {changed}")
+
+
+if __name__ == "__main__":
+    main()
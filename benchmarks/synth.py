@@ -0,0 +1,100 @@
+# benchmarks/synth.py
+"""
+Генератор синтетичних creature .xdb і цілих .pak у стилі Universe_mod
+для бенчмарків.
+"""
+import os
+import random
+import zipfile
+
+from core.pak_stream import CREATURES_PREFIX
+
+CREATURE_XDB = """<?xml version="1.0" encoding="UTF-8"?>
+<Creature>
+	<AttackSkill>{attack}</AttackSkill>
+	<DefenceSkill>{defence}</DefenceSkill>
+	<MinDamage>{min_dmg}</MinDamage>
+	<MaxDamage>{max_dmg}</MaxDamage>
+	<Speed>{speed}</Speed>
+	<Initiative>{initiative}</Initiative>
+	<Flying>false</Flying>
+	<Health>{health}</Health>
+	<KnownSpells/>
+	<SpellPoints>0</SpellPoints>
+	<Exp>{exp}</Exp>
+	<Power>{power}</Power>
+	<CreatureTier>{tier}</CreatureTier>
+	<Upgrade>false</Upgrade>
+	<CreatureTown>TOWN_{town}</CreatureTown>
+	<WeeklyGrowth>{growth}</WeeklyGrowth>
+	<Cost>
+		<Wood>0</Wood>
+		<Ore>0</Ore>
+		<Mercury>0</Mercury>
+		<Crystal>0</Crystal>
+		<Sulfur>0</Sulfur>
+		<Gem>0</Gem>
+		<Gold>{gold}</Gold>
+	</Cost>
+	<Abilities>
+{abilities}	</Abilities>
+	<Visual href="/GameMechanics/CreatureVisual/Creatures/{town}/{name}.xdb#xpointer(/CreatureVisual)"/>
+</Creature>
+"""
+
+
+def creature_xdb(name, town, rnd, padding=0):
+    """Вміст одного .xdb; `padding` — скільки зайвих <Item> додати в Abilities."""
+    abilities = "".join(
+        f"\t\t<Item>ABILITY_{rnd.randrange(1000):04d}</Item>\n" for _ in range(3 + padding)
+    )
+    return CREATURE_XDB.format(
+        name=name, town=town.upper(), abilities=abilities,
+        attack=rnd.randint(1, 40), defence=rnd.randint(1, 40),
+        min_dmg=rnd.randint(1, 20), max_dmg=rnd.randint(20, 60),
+        speed=rnd.randint(3, 9), initiative=rnd.randint(6, 14),
+        health=rnd.randint(3, 250), exp=rnd.randint(5, 3000),
+        power=rnd.randint(50, 9000), tier=rnd.randint(1, 7),
+        growth=rnd.randint(1, 30), gold=rnd.randint(15, 3000),
+    ).encode("utf-8")
+
+
+def creature_set(count, folders, seed=0, padding=0):
+    """Список (ім'я_члена_pak, байти) для `count` істот, рівномірно по `folders`."""
+    rnd = random.Random(seed)
+    out = []
+    for i in range(count):
+        town = folders[i % len(folders)]
+        name = f"Creature_{i:05d}"
+        member = f"{CREATURES_PREFIX}{town}/{name}.xdb"
+        out.append((member, creature_xdb(name, town, rnd, padding)))
+    return out
+
+
+def make_pak(path, creatures, folders, filler_files=0, filler_kb=16,
+             padding=0, seed=0):
+    """
+    Створює .pak: `creatures` істот у теках `folders` + `filler_files`
+    інших членів (текстури/тексти тощо) по ~`filler_kb` KB.
+    Наповнювач наполовину випадковий, щоб DEFLATE мав реальну роботу.
+    Повертає словник з підсумком (кількість членів, розміри).
+    """
+    rnd = random.Random(seed)
+    raw_bytes = 0
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as z_out:
+        for member, data in creature_set(creatures, folders, seed, padding):
+            z_out.writestr(member, data)
+            raw_bytes += len(data)
+        creature_bytes = raw_bytes
+        half = filler_kb * 512
+        for i in range(filler_files):
+            data = rnd.randbytes(half) + bytes(half)
+            z_out.writestr(f"Textures/Synthetic/{i // 500:03d}/tex_{i:06d}.dds", data)
+            raw_bytes += len(data)
+    return {
+        "members": creatures + filler_files,
+        "creatures": creatures,
+        "creature_bytes": creature_bytes,
+        "raw_bytes": raw_bytes,
+        "pak_bytes": os.path.getsize(path),
+    }
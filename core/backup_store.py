@@ -0,0 +1,146 @@
+# core/backup_store.py
+"""
+Інкрементне сховище резервних копій для .pak.
+
+Замість повної копії Universe_mod.pak.backup зберігаються лише ті члени,
+які змінив конкретний запуск, — у стані «до» і з дедуплікацією за SHA-256.
+Кожен запуск дає знімок із номером; знімок #N = стан архіву перед запуском N.
+
+<pak>.backups/
+    objects/<sha[:2]>/<sha>   — zlib-стиснутий вміст члена
+    snapshots/0001.json       — {id, created, note, members: {ім'я: {sha256, date_time}}}
+"""
+import hashlib
+import json
+import os
+import time
+import zipfile
+import zlib
+
+from core.pak_stream import rewrite_pak
+
+STORE_SUFFIX = ".backups"
+
+
+class BackupStore:
+    def __init__(self, pak_path):
+        self.pak_path = pak_path
+        self.root = pak_path + STORE_SUFFIX
+        self.objects_dir = os.path.join(self.root, "objects")
+        self.snapshots_dir = os.path.join(self.root, "snapshots")
+
+    # -----------------------
+    # Об'єкти
+    # -----------------------
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def put_object(self, data):
+        """Зберігає вміст (якщо такого ще немає) і повертає його SHA-256."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(zlib.compress(data, 9))
+            os.replace(tmp, path)
+        return digest
+
+    def get_object(self, digest):
+        with open(self._object_path(digest), "rb") as f:
+            data = zlib.decompress(f.read())
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise RuntimeError(f"Пошкоджений об'єкт резервної копії: {digest}")
+        return data
+
+    # -----------------------
+    # Знімки
+    # -----------------------
+    def snapshots(self):
+        """Усі знімки за зростанням номера."""
+        if not os.path.isdir(self.snapshots_dir):
+            return []
+        result = []
+        for fname in sorted(os.listdir(self.snapshots_dir)):
+            if not fname.endswith(".json"):
+                continue
+            with open(os.path.join(self.snapshots_dir, fname), "r", encoding="utf-8") as f:
+                result.append(json.load(f))
+        return sorted(result, key=lambda snap: snap["id"])
+
+    def save_snapshot(self, originals, note=""):
+        """
+        Записує знімок зі станом членів до змін.
+        `originals`: ім'я → (байти, date_time). Повертає номер знімка.
+        """
+        snaps = self.snapshots()
+        snap_id = snaps[-1]["id"] + 1 if snaps else 1
+        members = {}
+        for name, (data, date_time) in originals.items():
+            members[name] = {"sha256": self.put_object(data), "date_time": list(date_time)}
+
+        snap = {
+            "id": snap_id,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "note": note,
+            "members": members,
+        }
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+        path = os.path.join(self.snapshots_dir, f"{snap_id:04d}.json")
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snap, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, path)
+        return snap_id
+
+    def target_for(self, snapshot_id):
+        """
+        Які члени й з яким вмістом повернути, щоб отримати стан перед запуском
+        `snapshot_id`: для кожного члена — найстаріший знімок із номером ≥ N.
+        """
+        target = {}
+        for snap in self.snapshots():
+            if snap["id"] < snapshot_id:
+                continue
+            for name, meta in snap["members"].items():
+                target.setdefault(name, meta)
+        return target
+
+    def restore(self, snapshot_id, progress=None):
+        """
+        Повертає архів у стан знімка `snapshot_id`, переписуючи лише потрібні
+        члени (решта копіюється сирою). Поточний стан цих членів теж
+        зберігається знімком, тож відновлення можна скасувати.
+        Повертає кількість повернених членів.
+        """
+        target = self.target_for(snapshot_id)
+        replacements = {}
+        dates = {}
+        originals = {}
+        with zipfile.ZipFile(self.pak_path, "r") as z_in:
+            for name, meta in target.items():
+                if name not in z_in.NameToInfo:
+                    continue
+                info = z_in.getinfo(name)
+                current = z_in.read(info)
+                data = self.get_object(meta["sha256"])
+                if data == current:
+                    continue
+                replacements[name] = data
+                dates[name] = tuple(meta["date_time"])
+                originals[name] = (current, info.date_time)
+
+        if not replacements:
+            return 0
+
+        self.save_snapshot(originals, note=f"перед відновленням #{snapshot_id}")
+        new_pak = self.pak_path + ".new"
+        try:
+            rewrite_pak(self.pak_path, new_pak, replacements, progress, dates)
+        except Exception:
+            if os.path.exists(new_pak):
+                os.remove(new_pak)
+            raise
+        os.replace(new_pak, self.pak_path)
+        return len(replacements)
@@ -0,0 +1,239 @@
+# core/batch.py
+"""
+Пакетна обробка кількох .pak (кілька інсталяцій гри або модів) за раз.
+
+Файл завдань — JSON-список (або {"jobs": [...]}) записів виду:
+    {"pak": "C:/Games/HeroesV/data/Universe_mod.pak", "factor": "150%"}
+    {"pak": "D:/HoMM5_test/data/Universe_mod.pak", "factor": 2, "filter": "dragon",
+     "rules": "creature_rules.example.json", "output": "overlay"}
+
+Відносні шляхи pak/rules рахуються від теки файлу завдань.
+.pak обробляються паралельно (не більше `parallel` одночасно); усі рушії
+ділять один GrowthIndex і один PatchCache, тож однакові за CRC creature
+.xdb розбираються й змінюються лише раз на весь пакет.
+"""
+import json
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from core.growth_index import GrowthIndex
+from core.patch_engine import (
+    EXIT_ERROR, EXIT_OK, OUTPUT_INPLACE, OUTPUT_OVERLAY, PatchEngine, PatchError,
+    parse_factor
+)
+from core.stat_rules import growth_rules, load_rules
+from core.xdb_patch import ENGINE_FAST
+
+
+class PatchCache:
+    """
+    Потокобезпечний кеш результатів зміни .xdb, спільний для всіх рушіїв пакета.
+    Ключ — (CRC, розмір, рушій, дійові правила), значення —
+    (оригінальні_байти | None, нові_байти | None, changes).
+
+    Щоб .pak, які обробляються одночасно, не розбирали одні й ті самі .xdb
+    паралельно, ключ спершу «займається» одним рушієм (claim), а інші
+    чекають на його результат (wait) — після того, як розберуть свої.
+    """
+
+    def __init__(self):
+        self._items = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def claim(self, key):
+        """
+        (значення, None) — результат уже є; (None, None) — ключ зайнято
+        для цього рушія, він має викликати put або release;
+        (None, event) — ключ рахує інший рушій, див. wait.
+        """
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self.hits += 1
+                return value, None
+            event = self._pending.get(key)
+            if event is not None:
+                self.hits += 1
+                return None, event
+            self.misses += 1
+            self._pending[key] = threading.Event()
+            return None, None
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            event = self._pending.pop(key, None)
+        if event is not None:
+            event.set()
+
+    def release(self, key):
+        """Знімає зайнятість без результату (рушій упав) — чекачі рахують самі."""
+        with self._lock:
+            event = self._pending.pop(key, None)
+        if event is not None:
+            event.set()
+
+    def wait(self, key, event):
+        """Результат іншого рушія або None, якщо той не впорався."""
+        event.wait()
+        with self._lock:
+            return self._items.get(key)
+
+
+class BatchJob:
+    """Один .pak пакета зі своїм множником, фільтром, правилами й режимом результату."""
+
+    def __init__(self, pak_path, factor, creature_filter="", rules=None, output=OUTPUT_INPLACE):
+        self.pak_path = pak_path
+        self.factor = factor
+        self.creature_filter = creature_filter
+        self.rules = rules if rules is not None else growth_rules(factor)
+        self.output = output
+
+
+class BatchResult:
+    """Підсумок одного .pak: exit_code як у patch_cli.py, message — для логу."""
+
+    def __init__(self, job, exit_code, message, changed_count=0, dry_run=False, seconds=0.0):
+        self.job = job
+        self.exit_code = exit_code
+        self.message = message
+        self.changed_count = changed_count
+        self.dry_run = dry_run
+        self.seconds = seconds
+
+
+def parse_jobs(raw, base_dir=""):
+    """Список BatchJob з розібраного JSON. ValueError — з номером завдання."""
+    if isinstance(raw, dict):
+        raw = raw.get("jobs", [])
+    if not isinstance(raw, list) or not raw:
+        raise ValueError("Файл завдань має містити непорожній список завдань")
+
+    jobs = []
+    seen = set()
+    for i, item in enumerate(raw, start=1):
+        if not isinstance(item, dict) or not item.get("pak"):
+            raise ValueError(f"Завдання №{i}: потрібне поле 'pak'")
+        unknown = set(item) - {"pak", "factor", "filter", "rules", "output"}
+        if unknown:
+            raise ValueError(f"Завдання №{i}: невідомі ключі {sorted(unknown)}")
+
+        pak_path = os.path.join(base_dir, item["pak"])
+        key = os.path.normcase(os.path.abspath(pak_path))
+        if key in seen:
+            # Два рушії над одним файлом переписували б його одночасно
+            raise ValueError(f"Завдання №{i}: {item['pak']} уже є в пакеті")
+        seen.add(key)
+
+        try:
+            factor = parse_factor(str(item.get("factor", "100%")))
+        except ValueError as e:
+            raise ValueError(f"Завдання №{i}: невірний factor: {e}")
+        output = item.get("output", OUTPUT_INPLACE)
+        if output not in (OUTPUT_INPLACE, OUTPUT_OVERLAY):
+            raise ValueError(f"Завдання №{i}: невідомий output '{output}'")
+
+        rules = growth_rules(factor)
+        if item.get("rules"):
+            try:
+                rules += load_rules(os.path.join(base_dir, item["rules"]))
+            except (OSError, ValueError) as e:
+                raise ValueError(f"Завдання №{i}: помилка у файлі правил: {e}")
+
+        jobs.append(BatchJob(pak_path, factor, item.get("filter", ""), rules, output))
+    return jobs
+
+
+def load_jobs(path):
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    return parse_jobs(raw, os.path.dirname(os.path.abspath(path)))
+
+
+def run_batch(jobs, parallel=2, do_backup=True, dry_run=False, streaming=True,
+              workers=1, engine=ENGINE_FAST, progress=None, log=None, on_result=None,
+              index_path=None):
+    """
+    Обробляє `jobs` паралельно, не більше `parallel` .pak одночасно.
+    progress(int 0–100) — середній прогрес усіх .pak, log(str) — рядки
+    з префіксом [номер], on_result(BatchResult) — щойно .pak завершено.
+    index_path — файл спільного GrowthIndex (див. default_index_path).
+    Повертає список BatchResult у порядку `jobs`; помилка одного .pak
+    не зупиняє решту.
+    """
+    progress = progress or (lambda value: None)
+    log = log or (lambda message: None)
+    on_result = on_result or (lambda result: None)
+
+    index = GrowthIndex(index_path)
+    cache = PatchCache()
+    percents = [0] * len(jobs)
+    last_total = [-1]
+    lock = threading.Lock()
+
+    def job_progress(n, value):
+        with lock:
+            percents[n] = value
+            total = sum(percents) // len(percents)
+            if total == last_total[0]:
+                return
+            last_total[0] = total
+        progress(total)
+
+    # Індекс — послідовно: перший .pak читає .xdb, решта з тими самими
+    # CRC бере значення з індексу й відкриває лише центральний каталог
+    for n, job in enumerate(jobs, start=1):
+        try:
+            _, reparsed = index.entries(job.pak_path)
+        except (OSError, zipfile.BadZipFile):
+            continue  # помилку покаже сам рушій
+        log(f"[{n}] Індекс: перечитано {reparsed} .xdb")
+
+    def run_one(n, job):
+        prefix = f"[{n + 1}]"
+        log(f"{prefix} {job.pak_path}")
+        patcher = PatchEngine(
+            job.pak_path, job.factor, do_backup, job.creature_filter, dry_run,
+            streaming=streaming, workers=workers, engine=engine,
+            output=job.output, rules=job.rules,
+            progress=lambda value: job_progress(n, value),
+            log=lambda message: log(f"{prefix} {message}"),
+            index=index, patch_cache=cache,
+        )
+        t0 = time.perf_counter()
+        try:
+            res = patcher.run()
+            result = BatchResult(job, EXIT_OK, res.message, res.changed_count, res.dry_run)
+        except PatchError as e:
+            result = BatchResult(job, e.exit_code, str(e))
+        except Exception as e:
+            result = BatchResult(job, EXIT_ERROR, f"Помилка: {e}")
+        result.seconds = time.perf_counter() - t0
+        job_progress(n, 100)
+        on_result(result)
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+        futures = [pool.submit(run_one, n, job) for n, job in enumerate(jobs)]
+        results = [f.result() for f in futures]
+
+    log(f"Спільний кеш .xdb: {cache.hits} збігів, {cache.misses} розібрано")
+    return results
+
+
+def format_summary(results):
+    """Рядки підсумку пакета: по рядку на .pak і загальна кількість змін."""
+    ok = sum(1 for r in results if r.exit_code == EXIT_OK)
+    changed = sum(r.changed_count for r in results)
+    lines = [f"Пакет: {ok}/{len(results)} .pak успішно, змінено {changed} .xdb"]
+    for n, r in enumerate(results, start=1):
+        status = "OK" if r.exit_code == EXIT_OK else f"код {r.exit_code}"
+        lines.append(f" - [{n}] {r.job.pak_path} ({status}, {r.seconds:.1f}s): {r.message}")
+    return lines
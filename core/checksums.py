@@ -0,0 +1,145 @@
+# core/checksums.py
+"""
+Перевірка завантажених файлів за SHA-256 без залежності від Qt.
+
+Запис DOWNLOAD_SOURCES може містити очікувані "size" (байти) і "sha256"
+(hex). Хеш рахується під час завантаження (StreamHash) з тих самих шматків,
+що пишуться на диск. Перевірені хеші записуються в checksums.json поруч
+із файлами разом з розміром і часом зміни — поки вони ті самі, файлу
+можна довіряти без повторного читання.
+
+checksums.json — {version, files: {ім'я файлу: {size, mtime_ns, sha256}}}
+"""
+import hashlib
+import json
+import os
+import threading
+
+MANIFEST_NAME = "checksums.json"
+MANIFEST_VERSION = 1
+HASH_CHUNK = 1024 * 1024
+
+# Кілька завантажень у ту саму теку (черга) пишуть один маніфест
+_MANIFEST_LOCK = threading.Lock()
+
+
+def expected_checks(info):
+    """(size | None, sha256 | None) із запису DOWNLOAD_SOURCES."""
+    sha256 = info.get("sha256")
+    return info.get("size"), sha256.lower() if sha256 else None
+
+
+def file_sha256(path):
+    """SHA-256 файлу повним читанням — лише для ще не перевірених файлів."""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(HASH_CHUNK)
+            if not chunk:
+                break
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class StreamHash:
+    """
+    SHA-256 файлу, що пишеться шматками, можливо не по порядку (сегменти).
+    Шматок, що продовжує вже захешовану частину, хешується з пам'яті; байти,
+    записані раніше іншими сегментами чи попередньою спробою, дочитуються
+    з файлу один раз, коли до них доходить суцільна частина.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.pos = 0
+        self._sha = hashlib.sha256()
+        self._lock = threading.Lock()
+
+    def feed(self, offset, data, contiguous):
+        """Шматок `data` записано з `offset`; `contiguous` — межа суцільної частини."""
+        with self._lock:
+            if offset == self.pos:
+                self._sha.update(data)
+                self.pos += len(data)
+            if self.pos < contiguous:
+                self._catch_up(contiguous)
+
+    def _catch_up(self, end):
+        with open(self.path, "rb") as f:
+            f.seek(self.pos)
+            while self.pos < end:
+                chunk = f.read(min(HASH_CHUNK, end - self.pos))
+                if not chunk:
+                    raise OSError(f"{self.path}: файл коротший за записане")
+                self._sha.update(chunk)
+                self.pos += len(chunk)
+
+    def hexdigest(self, size):
+        """Хеш перших `size` байтів (дочитує, якщо ще не все захешовано)."""
+        with self._lock:
+            if self.pos < size:
+                self._catch_up(size)
+            return self._sha.hexdigest()
+
+
+class ChecksumManifest:
+    """Перевірені хеші файлів однієї теки."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.path = os.path.join(folder, MANIFEST_NAME)
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != MANIFEST_VERSION:
+            return {}
+        return data.get("files", {})
+
+    def verified(self, file_path):
+        """sha256 з маніфесту, якщо файл відтоді не змінювався; інакше None."""
+        with _MANIFEST_LOCK:
+            entry = self._load().get(os.path.basename(file_path))
+        if not entry:
+            return None
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        if st.st_size != entry["size"] or st.st_mtime_ns != entry["mtime_ns"]:
+            return None
+        return entry["sha256"]
+
+    def record(self, file_path, sha256):
+        st = os.stat(file_path)
+        with _MANIFEST_LOCK:
+            files = self._load()
+            files[os.path.basename(file_path)] = {
+                "size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha256,
+            }
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": MANIFEST_VERSION, "files": files}, f, indent=1)
+            os.replace(tmp, self.path)
+
+
+def manifest_for(file_path):
+    """ChecksumManifest теки, де лежить `file_path`."""
+    return ChecksumManifest(os.path.dirname(os.path.abspath(file_path)))
+
+
+def trusted_sha256(file_path, expected):
+    """
+    True, якщо `file_path` має хеш `expected`: з маніфесту без читання,
+    інакше повним хешуванням (результат записується в маніфест).
+    """
+    manifest = manifest_for(file_path)
+    known = manifest.verified(file_path)
+    if known is not None:
+        return known == expected
+    actual = file_sha256(file_path)
+    manifest.record(file_path, actual)
+    return actual == expected
@@ -0,0 +1,185 @@
+# core/download_cache.py
+"""
+Локальний кеш завантажених архівів з умовною перевіркою актуальності.
+
+Для кожного джерела (ключ — source_key) зберігається поточна версія:
+файл у objects/ і валідатори — ETag / Last-Modified для HTTP та sha блоба
+(і ETag відповіді API) для GitHub. Перед завантаженням джерело
+перевіряється умовним запитом; якщо нічого не змінилося, файл береться
+з кешу без передачі даних.
+
+Старі версії архівів лишаються в objects/, доки загальний розмір не
+перевищить ліміт, — тоді видаляються ті, що найдовше не використовувались.
+Об'єкти — жорсткі посилання на завантажені .zip, якщо кеш на тому самому
+диску, тож місце подвоюється лише при копіюванні між дисками.
+
+<cache>/index.json — {version, entries: {ключ: {...}}, objects: {ім'я: {key, size, last_used}}}
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+
+CACHE_DIR_NAME = ".download_cache"
+CACHE_VERSION = 1
+DEFAULT_LIMIT = 5 * 1024 * 1024 * 1024
+
+_CONTENT_RANGE_TOTAL = re.compile(r"bytes\s+\d+-\d+/(\d+)")
+
+
+def source_key(info):
+    """Стабільний ключ запису DOWNLOAD_SOURCES."""
+    src_type = info.get("type")
+    if src_type == "git":
+        return f"git:{info['repo']}/{info['file']}"
+    if src_type == "gdrive":
+        return f"gdrive:{info['id']}"
+    return f"url:{info.get('url') or info.get('id')}"
+
+
+def _link_or_copy(src, dst):
+    tmp = dst + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+def revalidate(session, url, entry, headers=None):
+    """
+    True, якщо файл за `url` не змінився відносно запису кешу `entry`.
+    Умовний запит лише на перший байт; сервери, що ігнорують
+    If-None-Match/If-Modified-Since, перевіряються порівнянням валідаторів.
+    """
+    if not entry.get("etag") and not entry.get("last_modified"):
+        return False
+    req_headers = {**(headers or {}), "Range": "bytes=0-0"}
+    if entry.get("etag"):
+        req_headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        req_headers["If-Modified-Since"] = entry["last_modified"]
+
+    r = session.get(url, headers=req_headers, stream=True)
+    with r:
+        if r.status_code == 304:
+            return True
+        if r.status_code not in (200, 206):
+            return False
+        m = _CONTENT_RANGE_TOTAL.match(r.headers.get("Content-Range", ""))
+        size = int(m.group(1)) if m else int(r.headers.get("Content-Length", 0)) or None
+        if size is not None and size != entry["size"]:
+            return False
+        etag = r.headers.get("ETag")
+        if etag and not etag.startswith("W/"):
+            return etag == entry.get("etag")
+        return bool(entry.get("last_modified")) and \
+            r.headers.get("Last-Modified") == entry["last_modified"]
+
+
+class DownloadCache:
+    """Потокобезпечний кеш; один екземпляр можна ділити між воркерами черги."""
+
+    def __init__(self, root, limit=DEFAULT_LIMIT):
+        self.root = root
+        self.limit = limit
+        self.objects_dir = os.path.join(root, "objects")
+        self.index_path = os.path.join(root, "index.json")
+        self._lock = threading.RLock()
+        self.data = {"version": CACHE_VERSION, "entries": {}, "objects": {}}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == CACHE_VERSION:
+            self.data = data
+
+    def save(self):
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            tmp = self.index_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.data, f, ensure_ascii=False, indent=1)
+            os.replace(tmp, self.index_path)
+
+    def _object_path(self, name):
+        return os.path.join(self.objects_dir, name)
+
+    def object_path(self, entry):
+        """Шлях файлу версії `entry` (з lookup)."""
+        return self._object_path(entry["object"])
+
+    def lookup(self, key):
+        """Запис поточної версії джерела або None (немає або об'єкт зник)."""
+        with self._lock:
+            entry = self.data["entries"].get(key)
+            if entry and os.path.isfile(self._object_path(entry["object"])):
+                return dict(entry)
+            return None
+
+    def store(self, key, path, **validators):
+        """
+        Кладе щойно завантажений `path` у кеш як поточну версію `key`.
+        validators: etag, last_modified, github_sha, api_etag, а також sha256
+        (перевірений хеш, якщо відомий).
+        """
+        size = os.path.getsize(path)
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+        name = f"{digest}-{int(time.time() * 1000)}{os.path.splitext(path)[1]}"
+        os.makedirs(self.objects_dir, exist_ok=True)
+        _link_or_copy(path, self._object_path(name))
+        with self._lock:
+            now = time.time()
+            self.data["objects"][name] = {"key": key, "size": size, "last_used": now}
+            self.data["entries"][key] = {"object": name, "size": size, **validators}
+            self._evict(keep=name)
+            self.save()
+
+    def update(self, key, **validators):
+        """Оновлює валідатори поточної версії (напр. новий ETag відповіді API)."""
+        with self._lock:
+            entry = self.data["entries"].get(key)
+            if entry:
+                entry.update(validators)
+                self.save()
+
+    def materialize(self, key, out_path):
+        """
+        Поточна версія `key` → `out_path` (посиланням або копією), якщо там
+        ще не той самий файл. Повертає розмір.
+        """
+        with self._lock:
+            entry = self.data["entries"][key]
+            obj = self._object_path(entry["object"])
+            self.data["objects"][entry["object"]]["last_used"] = time.time()
+            self.save()
+        if not (os.path.exists(out_path) and os.path.samefile(obj, out_path)):
+            _link_or_copy(obj, out_path)
+        return entry["size"]
+
+    def _evict(self, keep=None):
+        objects = self.data["objects"]
+        total = sum(meta["size"] for meta in objects.values())
+        for name in sorted(objects, key=lambda n: objects[n]["last_used"]):
+            if total <= self.limit:
+                break
+            if name == keep:
+                continue
+            meta = objects.pop(name)
+            total -= meta["size"]
+            entry = self.data["entries"].get(meta["key"])
+            if entry and entry["object"] == name:
+                del self.data["entries"][meta["key"]]
+            try:
+                os.remove(self._object_path(name))
+            except OSError:
+                pass  # уже видалено вручну
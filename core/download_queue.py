@@ -0,0 +1,84 @@
+# core/download_queue.py
+"""
+Черга завантажень кількох записів DOWNLOAD_SOURCES без залежності від Qt.
+
+Записи качаються паралельно (не більше `parallel` одночасно) через одну
+спільну requests.Session з пулом з'єднань на всі записи й сегменти.
+Помилка одного запису не зупиняє решту.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from core.downloads import DEFAULT_SEGMENTS, make_session
+from core.sources import fetch_source
+
+# Стани запису черги
+STATUS_QUEUED = "в черзі"
+STATUS_ACTIVE = "завантаження"
+STATUS_DONE = "готово"
+STATUS_FAILED = "помилка"
+
+
+class QueueItem:
+    """Один запис черги: назва, запис DOWNLOAD_SOURCES, куди писати і поточний стан."""
+
+    def __init__(self, name, info, out_path):
+        self.name = name
+        self.info = info
+        self.out_path = out_path
+        self.status = STATUS_QUEUED
+        self.done = 0
+        self.total = 0
+        self.error = None
+
+
+def totals(items):
+    """(завантажено, усього, чи відомі розміри всіх незавершених записів)."""
+    done = sum(item.done for item in items)
+    total = sum(item.total for item in items)
+    known = all(item.total or item.status in (STATUS_DONE, STATUS_FAILED) for item in items)
+    return done, total, known
+
+
+def run_queue(items, parallel=2, segments=DEFAULT_SEGMENTS, progress=None, log=None,
+              on_status=None, cache=None, limiter=None):
+    """
+    Качає `items` (список QueueItem) паралельно.
+    progress(item) — після кожного шматка (item.done/item.total оновлено),
+    log(item, str), on_status(item) — при зміні item.status.
+    cache — спільний DownloadCache (див. core.sources.fetch_source),
+    limiter — спільний BandwidthLimiter на всю чергу.
+    Повертає `items`.
+    """
+    progress = progress or (lambda item: None)
+    log = log or (lambda item, message: None)
+    on_status = on_status or (lambda item: None)
+    parallel = max(1, min(parallel, len(items)))
+    session = make_session(parallel * segments)
+
+    def set_status(item, status):
+        item.status = status
+        on_status(item)
+
+    def run_one(item):
+        def on_progress(done, total):
+            item.done = done
+            item.total = total
+            progress(item)
+
+        set_status(item, STATUS_ACTIVE)
+        try:
+            size = fetch_source(item.info, item.out_path, session, segments, on_progress,
+                                lambda message: log(item, message), cache,
+                                limiter=limiter)
+            item.done = item.total = size
+            set_status(item, STATUS_DONE)
+        except Exception as ex:
+            item.error = str(ex)
+            set_status(item, STATUS_FAILED)
+
+    try:
+        with ThreadPoolExecutor(max_workers=parallel) as pool:
+            list(pool.map(run_one, items))
+    finally:
+        session.close()
+    return items
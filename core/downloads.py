@@ -0,0 +1,494 @@
+# core/downloads.py
+"""
+Завантаження файлів по HTTP без залежності від Qt.
+
+Дані пишуться у `<файл>.part`, поруч — `<файл>.part.json` з URL, розміром,
+валідаторами (ETag / Last-Modified) і позицією кожного сегмента. Якщо
+завантаження обірвалося, наступний виклик продовжує з останнього
+записаного байта (`Range` + `If-Range`); у кінцевий файл .part
+перейменовується лише повністю завантаженим.
+
+Якщо сервер підтримує Range, файл ділиться на кілька діапазонів, що
+качаються паралельно окремими з'єднаннями й пишуться у заздалегідь
+виділений .part за своїми зміщеннями. Якщо ні — один потік.
+
+Прогрес — колбек progress(done, total) у байтах (total = 0, якщо розмір
+невідомий), лог — log(str). Необов'язковий on_data(contiguous, complete)
+повідомляє, скільки байтів .part уже записано підряд від початку, — щоб
+читати архів, поки він ще качається (core.stream_install).
+
+Розмір шматка читання підлаштовується під виміряну швидкість з'єднання
+(≈ CHUNK_TARGET_TIME на шматок), а спільний BandwidthLimiter обмежує
+сумарну швидкість усіх з'єднань. TransferStats — згладжена швидкість
+і ETA для відображення прогресу.
+
+Якщо відомі очікувані розмір і SHA-256 (core.checksums), розмір
+звіряється одразу після probe, а хеш рахується з шматків під час запису
+і перевіряється до перейменування .part.
+"""
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import DecodeError, ProtocolError, ReadTimeoutError, SSLError
+
+from core.checksums import StreamHash
+
+# Початковий розмір шматка; далі — за швидкістю, у межах MIN/MAX
+CHUNK_SIZE = 32768
+MIN_CHUNK_SIZE = 16 * 1024
+MAX_CHUNK_SIZE = 1024 * 1024
+CHUNK_TARGET_TIME = 0.1
+DEFAULT_SEGMENTS = 4
+# Менші файли не варто ділити — накладні витрати на з'єднання більші за виграш
+MIN_SEGMENT_SIZE = 4 * 1024 * 1024
+PART_SUFFIX = ".part"
+META_SUFFIX = ".part.json"
+# Як часто (с) зберігати позиції сегментів у sidecar
+META_SAVE_INTERVAL = 0.5
+
+_CONTENT_RANGE = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+
+
+class DownloadError(RuntimeError):
+    """Помилка завантаження, текст якої можна показати користувачу."""
+
+
+class _ServerChanged(Exception):
+    """Файл на сервері змінився між спробами — продовжувати не можна."""
+
+
+def make_session(pool_size=DEFAULT_SEGMENTS):
+    """requests.Session з пулом з'єднань на `pool_size` одночасних запитів."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class RemoteInfo:
+    """Що відомо про файл на сервері після probe."""
+
+    def __init__(self, size, ranges_ok, etag=None, last_modified=None):
+        self.size = size
+        self.ranges_ok = ranges_ok
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def validator(self):
+        """Значення для If-Range: сильний ETag або Last-Modified; None — не можна."""
+        if self.etag and not self.etag.startswith("W/"):
+            return self.etag
+        return self.last_modified
+
+
+class RateMeter:
+    """
+    Згладжена швидкість (байт/с) за експоненційним середнім і ETA.
+    update(done) викликають з прогресу; оновлення частіші за `interval` ігноруються.
+    """
+
+    def __init__(self, interval=0.25, smoothing=0.3):
+        self.interval = interval
+        self.smoothing = smoothing
+        self.speed = 0.0
+        self._last = None
+
+    def update(self, done):
+        now = time.monotonic()
+        if self._last is None:
+            self._last = (now, done)
+            return self.speed
+        last_t, last_done = self._last
+        if now - last_t < self.interval:
+            return self.speed
+        rate = max(0, done - last_done) / (now - last_t)
+        self.speed = rate if not self.speed else (
+            self.smoothing * rate + (1 - self.smoothing) * self.speed)
+        self._last = (now, done)
+        return self.speed
+
+    def eta(self, done, total):
+        """Секунд до кінця; None — якщо розмір або швидкість невідомі."""
+        if not total or self.speed <= 0:
+            return None
+        return max(0, total - done) / self.speed
+
+
+class TransferStats:
+    """
+    Прогрес передачі для UI: відсоток (лише при зміні) і рядок статистики
+    (done, total, байт/с, ETA | None) не частіше `interval`.
+    update() повертає (відсоток | None, статистика | None).
+    """
+
+    def __init__(self, interval=0.25):
+        self.interval = interval
+        self.meter = RateMeter(interval)
+        self._percent = -1
+        self._stats_at = 0.0
+
+    def update(self, done, total):
+        percent = None
+        if total:
+            value = int(done * 100 / total)
+            if value != self._percent:
+                self._percent = percent = value
+        stats = None
+        now = time.monotonic()
+        if now - self._stats_at >= self.interval:
+            self._stats_at = now
+            speed = self.meter.update(done)
+            stats = (done, total, speed, self.meter.eta(done, total))
+        return percent, stats
+
+
+class BandwidthLimiter:
+    """
+    Спільний ліміт швидкості (байт/с) для всіх з'єднань, що його отримали;
+    rate 0 — без ліміту. rate можна змінювати під час завантаження.
+    """
+    # Скільки секунд «недобору» можна надолужити одразу
+    BURST = 0.25
+
+    def __init__(self, rate=0):
+        self.rate = rate
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, n):
+        """Враховує `n` отриманих байтів і чекає, якщо ліміт перевищено."""
+        rate = self.rate
+        if not rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._next = max(self._next, now - self.BURST) + n / rate
+            delay = self._next - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _iter_adaptive(resp, limiter=None):
+    """
+    Шматки тіла відповіді; розмір наступного читання — скільки з'єднання
+    встигає за CHUNK_TARGET_TIME (з урахуванням ліміту швидкості).
+    Помилки urllib3 перетворюються на винятки requests, як в iter_content.
+    """
+    size = CHUNK_SIZE
+    last = time.monotonic()
+    while True:
+        try:
+            chunk = resp.raw.read(size, decode_content=True)
+        except ProtocolError as ex:
+            raise requests.exceptions.ChunkedEncodingError(ex)
+        except DecodeError as ex:
+            raise requests.exceptions.ContentDecodingError(ex)
+        except ReadTimeoutError as ex:
+            raise requests.exceptions.ConnectionError(ex)
+        except SSLError as ex:
+            raise requests.exceptions.SSLError(ex)
+        if not chunk:
+            return
+        if limiter is not None:
+            limiter.consume(len(chunk))
+        yield chunk
+        now = time.monotonic()
+        if now > last:
+            want = len(chunk) / (now - last) * CHUNK_TARGET_TIME
+            size = int(min(MAX_CHUNK_SIZE, max(MIN_CHUNK_SIZE, (size + want) / 2)))
+        last = now
+
+
+def probe(session, url, headers=None):
+    """Один запит `Range: bytes=0-0`: розмір, підтримка Range і валідатори."""
+    r = session.get(url, headers={**(headers or {}), "Range": "bytes=0-0"}, stream=True)
+    try:
+        etag = r.headers.get("ETag")
+        last_modified = r.headers.get("Last-Modified")
+        if r.status_code == 206:
+            m = _CONTENT_RANGE.match(r.headers.get("Content-Range", ""))
+            if m and m.group(3) != "*":
+                return RemoteInfo(int(m.group(3)), True, etag, last_modified)
+            return RemoteInfo(None, False, etag, last_modified)
+        if r.status_code == 200:
+            size = int(r.headers.get("Content-Length", 0)) or None
+            return RemoteInfo(size, False, etag, last_modified)
+        raise DownloadError(f"HTTP {r.status_code}")
+    finally:
+        r.close()
+
+
+def split_ranges(total, segments):
+    """[(start, end), ...] з включним end — `segments` майже рівних частин."""
+    size = -(-total // segments)
+    return [(start, min(start + size, total) - 1) for start in range(0, total, size)]
+
+
+def part_paths(out_path):
+    """(шлях .part, шлях sidecar) для кінцевого файлу `out_path`."""
+    return out_path + PART_SUFFIX, out_path + META_SUFFIX
+
+
+def discard_part(out_path):
+    """Видаляє незавершене завантаження (.part і sidecar), якщо воно є."""
+    for path in part_paths(out_path):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+class _PartState:
+    """
+    Сегменти [start, end | None, pos] незавершеного файлу і їх sidecar.
+    Позиція оновлюється лише після запису шматка на диск.
+    """
+
+    def __init__(self, out_path, source, info, segments):
+        self.part_path, self.meta_path = part_paths(out_path)
+        self.source = source
+        self.info = info
+        self.segments = segments
+        self.lock = threading.Lock()
+        self._saved_at = 0.0
+
+    @classmethod
+    def resume(cls, out_path, source, info):
+        """Стан з sidecar, якщо він про той самий файл на сервері; інакше None."""
+        part_path, meta_path = part_paths(out_path)
+        if not info.ranges_ok or not info.validator or not os.path.isfile(part_path):
+            return None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (meta.get("url") != source or meta.get("size") != info.size
+                or meta.get("etag") != info.etag
+                or meta.get("last_modified") != info.last_modified):
+            return None
+        segments = meta.get("segments")
+        if not segments or os.path.getsize(part_path) < max(pos for _, _, pos in segments):
+            return None
+        return cls(out_path, source, info, segments)
+
+    @classmethod
+    def fresh(cls, out_path, source, info, segments):
+        if info.ranges_ok and info.size and segments > 1:
+            ranges = split_ranges(info.size, segments)
+        else:
+            ranges = [(0, info.size - 1 if info.size else None)]
+        state = cls(out_path, source, info, [[start, end, start] for start, end in ranges])
+        with open(state.part_path, "wb") as f:
+            if len(ranges) > 1:
+                f.truncate(info.size)
+        state.save()
+        return state
+
+    @property
+    def done(self):
+        return sum(pos - start for start, _, pos in self.segments)
+
+    @property
+    def contiguous(self):
+        """Скільки байтів записано підряд від початку файлу."""
+        for _, end, pos in self.segments:
+            if end is None or pos <= end:
+                return pos
+        return self.segments[-1][1] + 1
+
+    def advance(self, seg, n):
+        """Сегмент `seg` записав ще `n` байтів; повертає загальний done."""
+        with self.lock:
+            seg[2] += n
+            done = self.done
+            if time.monotonic() - self._saved_at >= META_SAVE_INTERVAL:
+                self._save_locked()
+        return done
+
+    def save(self):
+        with self.lock:
+            self._save_locked()
+
+    def _save_locked(self):
+        meta = {
+            "url": self.source,
+            "size": self.info.size,
+            "etag": self.info.etag,
+            "last_modified": self.info.last_modified,
+            "segments": self.segments,
+        }
+        tmp = self.meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self.meta_path)
+        self._saved_at = time.monotonic()
+
+
+def _fetch_segment(session, url, headers, state, seg, on_chunk, cancelled, limiter=None):
+    start, end, pos = seg
+    if end is not None and pos > end:
+        return
+    req_headers = dict(headers or {})
+    # Без Range — лише перший і єдиний сегмент з нуля (сервер без Range теж підходить)
+    ranged = len(state.segments) > 1 or pos > 0
+    if ranged:
+        req_headers["Range"] = f"bytes={pos}-{'' if end is None else end}"
+        if state.info.validator:
+            req_headers["If-Range"] = state.info.validator
+
+    r = session.get(url, headers=req_headers, stream=True)
+    with r:
+        if ranged and r.status_code == 200:
+            raise _ServerChanged()
+        if r.status_code != (206 if ranged else 200):
+            raise DownloadError(f"Діапазон {pos}-{end}: HTTP {r.status_code}")
+        if ranged:
+            m = _CONTENT_RANGE.match(r.headers.get("Content-Range", ""))
+            if not m or int(m.group(1)) != pos:
+                raise DownloadError(f"Діапазон {pos}-{end}: сервер повернув інший діапазон")
+
+        # Без буфера: записане у sidecar уже точно передане ОС
+        with open(state.part_path, "r+b", buffering=0) as f:
+            f.seek(pos)
+            for chunk in _iter_adaptive(r, limiter):
+                if cancelled.is_set():
+                    return
+                if not chunk:
+                    continue
+                if end is not None:
+                    chunk = chunk[:end + 1 - seg[2]]
+                f.write(chunk)
+                on_chunk(seg, chunk)
+                if end is not None and seg[2] > end:
+                    break
+    if end is not None and seg[2] != end + 1:
+        raise DownloadError(f"Діапазон {start}-{end}: з'єднання обірвалося на {seg[2]}")
+
+
+def _run_segments(session, url, headers, state, progress, on_data=None, hasher=None,
+                  limiter=None):
+    total = state.info.size or 0
+    cancelled = threading.Event()
+
+    def on_chunk(seg, chunk):
+        offset = seg[2]
+        progress(state.advance(seg, len(chunk)), total)
+        if on_data is None and hasher is None:
+            return
+        # Під замком — щоб межа не йшла назад між потоками сегментів
+        with state.lock:
+            contiguous = state.contiguous
+            if on_data is not None:
+                on_data(contiguous, False)
+        if hasher is not None:
+            hasher.feed(offset, chunk, contiguous)
+
+    pending = [seg for seg in state.segments if seg[1] is None or seg[2] <= seg[1]]
+    if not pending:
+        return
+    with ThreadPoolExecutor(max_workers=len(pending)) as pool:
+        futures = [pool.submit(_fetch_segment, session, url, headers, state, seg,
+                               on_chunk, cancelled, limiter)
+                   for seg in pending]
+        try:
+            for fut in futures:
+                fut.result()
+        except BaseException:
+            # Решта сегментів зупиняться на наступному шматку
+            cancelled.set()
+            raise
+        finally:
+            state.save()
+
+
+def download(url, out_path, segments=DEFAULT_SEGMENTS, session=None, headers=None,
+             progress=None, log=None, source=None, on_data=None, expect_size=None,
+             expect_sha256=None, limiter=None):
+    """Як download_with_info, але повертає лише розмір файлу."""
+    return download_with_info(url, out_path, segments, session, headers, progress, log,
+                              source, on_data, expect_size, expect_sha256, limiter)[0]
+
+
+def download_with_info(url, out_path, segments=DEFAULT_SEGMENTS, session=None, headers=None,
+                       progress=None, log=None, source=None, on_data=None, expect_size=None,
+                       expect_sha256=None, limiter=None):
+    """
+    Завантажує `url` у `out_path` через `out_path.part`, продовжуючи
+    попередню спробу, якщо файл на сервері не змінився. Кількома
+    з'єднаннями, якщо сервер підтримує Range і файл достатньо великий.
+    source — стабільний ідентифікатор джерела для sidecar, якщо `url`
+    щоразу інший (одноразові токени); за замовчуванням — сам `url`.
+    on_data(contiguous, complete) — див. опис модуля; менше значення, ніж
+    минулого разу, означає, що .part почато заново. Останній виклик
+    (complete=True) — до перейменування .part і може блокувати.
+    expect_size / expect_sha256 — очікувані розмір і хеш (hex); при
+    невідповідності — DownloadError, а .part з неправильним хешем видаляється.
+    limiter — спільний BandwidthLimiter (None — без обмеження).
+    Повертає (розмір файлу, RemoteInfo з валідаторами); DownloadError —
+    при HTTP-помилці (.part лишається для наступної спроби).
+    """
+    progress = progress or (lambda done, total: None)
+    log = log or (lambda message: None)
+    own_session = session is None
+    if own_session:
+        session = make_session(segments)
+    try:
+        source = source or url
+        info = probe(session, url, headers)
+        if expect_size is not None and info.size is not None and info.size != expect_size:
+            raise DownloadError(f"Розмір на сервері {info.size} замість очікуваних "
+                                f"{expect_size} байтів")
+        for attempt in range(2):
+            state = _PartState.resume(out_path, source, info) if attempt == 0 else None
+            if state is not None:
+                log(f"↻ Продовжуємо з {state.done / 1024 / 1024:.1f}MB")
+            else:
+                if not info.ranges_ok:
+                    log("ℹ Сервер не підтримує Range — одне з'єднання, без докачування")
+                parts = 1
+                if info.ranges_ok and info.size and info.size >= 2 * MIN_SEGMENT_SIZE:
+                    parts = min(segments, info.size // MIN_SEGMENT_SIZE)
+                state = _PartState.fresh(out_path, source, info, parts)
+                if parts > 1:
+                    log(f"⚡ {parts} з'єднань, {info.size / 1024 / 1024:.1f}MB")
+            progress(state.done, info.size or 0)
+            if on_data is not None:
+                on_data(state.contiguous, False)
+            hasher = StreamHash(state.part_path) if expect_sha256 else None
+            try:
+                _run_segments(session, url, headers, state, progress, on_data, hasher,
+                              limiter)
+                break
+            except _ServerChanged:
+                log("ℹ Файл на сервері змінився — завантаження з початку")
+                discard_part(out_path)
+                info = probe(session, url, headers)
+        else:
+            raise DownloadError("Файл на сервері змінюється під час завантаження")
+
+        size = state.done
+        if info.size is not None and size != info.size:
+            raise DownloadError(f"Отримано {size} з {info.size} байтів")
+        if expect_size is not None and size != expect_size:
+            raise DownloadError(f"Отримано {size} замість очікуваних {expect_size} байтів")
+        if hasher is not None:
+            digest = hasher.hexdigest(size)
+            if digest != expect_sha256:
+                discard_part(out_path)
+                raise DownloadError(f"SHA-256 не збігся: {digest} замість {expect_sha256}")
+            log("✔ SHA-256 збігся")
+        if on_data is not None:
+            on_data(size, True)
+        os.replace(state.part_path, out_path)
+        os.remove(state.meta_path)
+        return size, info
+    finally:
+        if own_session:
+            session.close()
@@ -0,0 +1,92 @@
+# core/gdrive.py
+"""
+Завантаження з Google Drive у процесі, без gdown.
+
+Великі файли Drive віддає не одразу: спершу приходить HTML-сторінка
+«не вдалося перевірити на віруси» з формою підтвердження. Форма
+(або, у старому варіанті, cookie download_warning / посилання з confirm=)
+розбирається тут (resolve_url), а сам файл качає core.sources.fetch_source
+через core.downloads — з докачуванням .part і кількома з'єднаннями,
+якщо Drive віддає Range.
+"""
+import re
+from html.parser import HTMLParser
+from urllib.parse import urlencode
+
+from core.downloads import DownloadError
+
+DRIVE_URL = "https://drive.usercontent.google.com/download"
+
+_CONFIRM_HREF = re.compile(r"confirm=([0-9A-Za-z_-]+)")
+
+
+class _ConfirmFormParser(HTMLParser):
+    """Дістає action і приховані поля форми підтвердження завантаження."""
+
+    def __init__(self):
+        super().__init__()
+        self.action = None
+        self.fields = {}
+        self._in_form = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "form" and (attrs.get("id") == "download-form" or "action" in attrs):
+            if self.action is None:
+                self.action = attrs.get("action")
+                self._in_form = True
+        elif tag == "input" and self._in_form and attrs.get("name"):
+            if attrs.get("type", "hidden") == "hidden":
+                self.fields[attrs["name"]] = attrs.get("value") or ""
+
+    def handle_endtag(self, tag):
+        if tag == "form":
+            self._in_form = False
+
+
+def _is_html(resp):
+    return resp.headers.get("Content-Type", "").startswith("text/html")
+
+
+def confirm_url(session, file_id):
+    """
+    URL, за яким Drive віддає сам файл (з підтвердженням для великих).
+    DownloadError — якщо файл недоступний або перевищено ліміт завантажень.
+    """
+    url = f"{DRIVE_URL}?{urlencode({'id': file_id, 'export': 'download'})}"
+    r = session.get(url, stream=True)
+    with r:
+        if r.status_code != 200:
+            raise DownloadError(f"Google Drive: HTTP {r.status_code}")
+        if not _is_html(r):
+            return url
+        page = r.text
+
+    parser = _ConfirmFormParser()
+    parser.feed(page)
+    if parser.action and parser.fields.get("id"):
+        return f"{parser.action}?{urlencode(parser.fields)}"
+
+    # Старий варіант: токен у cookie або в посиланні
+    token = next((v for k, v in session.cookies.items() if k.startswith("download_warning")), None)
+    if token is None:
+        m = _CONFIRM_HREF.search(page)
+        token = m.group(1) if m else None
+    if token:
+        return f"{url}&{urlencode({'confirm': token})}"
+
+    if "quota" in page.lower() or "too many users" in page.lower():
+        raise DownloadError("Google Drive: перевищено ліміт завантажень файлу, спробуйте пізніше")
+    raise DownloadError("Google Drive: файл недоступний (немає публічного доступу?)")
+
+
+def resolve_url(session, file_id, log=None):
+    """confirm_url з перевіркою, що за ним справді файл, а не HTML-сторінка."""
+    url = confirm_url(session, file_id)
+    with session.get(url, headers={"Range": "bytes=0-0"}, stream=True) as r:
+        if r.status_code in (200, 206) and _is_html(r):
+            raise DownloadError("Google Drive повернув сторінку замість файлу")
+    if log:
+        log("⚡ Google Drive: посилання підтверджено")
+    return url
+
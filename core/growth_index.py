@@ -0,0 +1,176 @@
+# core/growth_index.py
+"""
+Постійний індекс WeeklyGrowth для creature .xdb у .pak.
+
+Індекс зберігається у JSON і прив'язаний до відбитка архіву:
+розмір + mtime + CRC членів із центрального каталогу zip.
+Якщо розмір і mtime не змінилися — відповідь береться з індексу
+без відкриття архіву; інакше перечитуються лише члени зі зміненим CRC.
+Значення для члена з тим самим CRC і розміром беруться з будь-якого
+іншого .pak в індексі (кілька інсталяцій з однаковими істотами).
+
+Індекс спільний для всіх .pak і всіх запусків, тож за замовчуванням
+лежить у теці кешу користувача (default_index_path), а не в поточній теці.
+
+Один екземпляр можна ділити між потоками (пакетний режим).
+"""
+import json
+import os
+import threading
+import zipfile
+from xml.etree import ElementTree as ET
+
+from core.pak_stream import creature_member_parts
+from core.xdb_patch import scan_growth
+
+APP_DIR_NAME = "Heroes V Extended"
+INDEX_NAME = "growth_index.json"
+INDEX_VERSION = 2
+
+
+def default_index_path():
+    """
+    Файл індексу в теці кешу користувача: %LOCALAPPDATA% на Windows,
+    інакше $XDG_CACHE_HOME або ~/.cache.
+    """
+    base = (os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME")
+            or os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(base, APP_DIR_NAME, INDEX_NAME)
+
+
+def read_growth(data):
+    """Список поточних числових значень WeeklyGrowth у вмісті .xdb."""
+    spans = scan_growth(data)
+    if spans is not None:
+        return [value for _, _, value in spans]
+    try:
+        root = ET.fromstring(data)
+    except ET.ParseError:
+        return []
+    values = []
+    for elem in root.iter("WeeklyGrowth"):
+        val_str = (elem.text or "").strip()
+        if val_str.isdigit():
+            values.append(int(val_str))
+    return values
+
+
+def _pak_key(pak_path):
+    return os.path.normcase(os.path.abspath(pak_path))
+
+
+class GrowthIndex:
+    """
+    Індекс: {шлях_pak: {size, mtime, members: {ім'я: {crc, size, folder, growth}}}}.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_index_path()
+        self.data = {"version": INDEX_VERSION, "paks": {}}
+        self._lock = threading.RLock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == INDEX_VERSION:
+            self.data = data
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(self.data, f, ensure_ascii=False)
+                os.replace(tmp, self.path)
+            except OSError:
+                # Індекс — лише кеш; неможливість запису не є помилкою
+                pass
+
+    def _known_growth(self):
+        """(crc, size) → growth з усіх .pak в індексі."""
+        known = {}
+        for pak in self.data["paks"].values():
+            for entry in pak["members"].values():
+                known[(entry["crc"], entry["size"])] = entry["growth"]
+        return known
+
+    def entries(self, pak_path):
+        """
+        Актуальні записи для `pak_path` (ім'я члена → {crc, size, folder, growth}).
+        Повертає (entries, reparsed) — reparsed = скільки членів перечитано.
+        """
+        st = os.stat(pak_path)
+        key = _pak_key(pak_path)
+        with self._lock:
+            cached = self.data["paks"].get(key)
+            if cached and cached["size"] == st.st_size and cached["mtime"] == st.st_mtime_ns:
+                return cached["members"], 0
+            known = self._known_growth()
+
+        members = {}
+        reparsed = 0
+        with zipfile.ZipFile(pak_path, "r") as z_in:
+            for info in z_in.infolist():
+                if info.is_dir() or not info.filename.lower().endswith(".xdb"):
+                    continue
+                parts = creature_member_parts(info.filename)
+                if not parts:
+                    continue
+                growth = known.get((info.CRC, info.file_size))
+                if growth is None:
+                    growth = read_growth(z_in.read(info))
+                    known[(info.CRC, info.file_size)] = growth
+                    reparsed += 1
+                members[info.filename] = {
+                    "crc": info.CRC,
+                    "size": info.file_size,
+                    "folder": parts[0],
+                    "growth": growth,
+                }
+
+        with self._lock:
+            self.data["paks"][key] = {
+                "size": st.st_size,
+                "mtime": st.st_mtime_ns,
+                "members": members,
+            }
+        self.save()
+        return members, reparsed
+
+
+def select(entries, creature_filter="", folders=None):
+    """Імена членів, що проходять фільтр назви та список тек фракцій."""
+    creature_filter = creature_filter.lower().strip()
+    names = []
+    for name, entry in entries.items():
+        if folders is not None and entry["folder"] not in folders:
+            continue
+        base = name.rsplit("/", 1)[-1]
+        if creature_filter and creature_filter not in base.lower():
+            continue
+        names.append(name)
+    return names
+
+
+def preview(entries, factor, creature_filter="", folders=None):
+    """
+    Dry-run за індексом. Повертає (список_змінених_імен_членів, sample),
+    де sample = (c_name, old, new) першої зміни.
+    """
+    changed = []
+    sample = None
+    for name in select(entries, creature_filter, folders):
+        base = name.rsplit("/", 1)[-1]
+        for old_val in entries[name]["growth"]:
+            new_val = int(round(old_val * factor))
+            if new_val != old_val:
+                changed.append(name)
+                if sample is None:
+                    sample = (os.path.splitext(base)[0], old_val, new_val)
+                break
+    return changed, sample
@@ -0,0 +1,353 @@
+# core/install.py
+"""
+Встановлення файлів з архіву в папку гри за картою встановлення
+(INSTALL_MAP у tabs/download_tab.py) без залежності від Qt.
+
+Карта — {підтека гри: [імена файлів] або ["*"]}. Член архіву потрапляє
+у кожну підтеку, до списку якої входить його ім'я (без урахування
+регістру), а з ["*"] — усі файли. Шлях усередині архіву не зберігається:
+файл кладеться в підтеку під своїм базовим іменем.
+
+Файл спершу пишеться поруч як `<ім'я>.installing` і замінює старий
+лише повністю записаним.
+
+Встановлення з готового архіву — один прохід по центральному каталогу
+(plan_install) і паралельне розпакування членів одразу в кінцеві шляхи
+(install_members), без тимчасових тек. Файли, що вже є в папці гри,
+знаходить find_conflicts, а apply_policy застосовує до них одне рішення
+для всіх: перезаписати, пропустити або лишити новіші. Встановлені файли
+отримують дату члена архіву — щоб «лишити новіші» працювало й надалі.
+
+Диференційне встановлення (diff_plan) пропускає цілі, де вже лежить файл
+з тим самим CRC32 і розміром, що й член архіву. CRC встановлених файлів
+кешуються в <папка гри>/.install_fingerprints.json (Fingerprints) разом
+з розміром і часом зміни, тож файл перераховується, лише якщо змінився.
+"""
+import json
+import os
+import threading
+import time
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+COPY_CHUNK = 1024 * 1024
+TMP_SUFFIX = ".installing"
+# Розпакування впирається в диск, а не в CPU, — більше потоків не допомагає
+MAX_WORKERS = 8
+
+FINGERPRINTS_NAME = ".install_fingerprints.json"
+FINGERPRINTS_VERSION = 1
+
+# Що робити з файлами, які вже є в папці гри
+POLICY_OVERWRITE = "overwrite"
+POLICY_SKIP = "skip"
+POLICY_NEWER = "newer"
+
+
+def zip_mtime(date_time):
+    """ZipInfo.date_time (місцевий час) → мітка часу для os.utime."""
+    return time.mktime(tuple(date_time) + (0, 0, -1))
+
+
+def default_workers():
+    """Кількість потоків розпакування за замовчуванням."""
+    return min(MAX_WORKERS, os.cpu_count() or 1)
+
+
+class InstallLookup:
+    """Карта встановлення, розгорнута в ім'я файлу → теки призначення."""
+
+    def __init__(self, mapping, hero_root):
+        self.by_name = {}
+        self.wildcard = []
+        for subfolder, files in mapping.items():
+            dest = os.path.join(hero_root, subfolder)
+            if files == ["*"]:
+                self.wildcard.append(dest)
+            else:
+                for name in files:
+                    self.by_name.setdefault(name.lower(), []).append(dest)
+
+    def targets(self, member_name):
+        """Кінцеві шляхи члена архіву; [] — член не встановлюється."""
+        base = member_name.replace("\\", "/").rsplit("/", 1)[-1]
+        if not base:
+            return []  # тека
+        dirs = self.wildcard + self.by_name.get(base.lower(), [])
+        return [os.path.join(d, base) for d in dirs]
+
+
+class MemberWriter:
+    """
+    Пише вміст члена в тимчасові файли поруч з усіма цілями, рахуючи CRC.
+    commit() замінює цілі, discard() прибирає тимчасові файли.
+    """
+
+    def __init__(self, paths):
+        self.paths = paths
+        self.crc = 0
+        self.size = 0
+        self._files = []
+        try:
+            for path in paths:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self._files.append(open(path + TMP_SUFFIX, "wb"))
+        except BaseException:
+            self.discard()
+            raise
+
+    def write(self, data):
+        for f in self._files:
+            f.write(data)
+        self.crc = zlib.crc32(data, self.crc)
+        self.size += len(data)
+
+    def _close(self):
+        for f in self._files:
+            f.close()
+        self._files = []
+
+    def commit(self, mtime=None):
+        """Замінює цілі; mtime — дата зміни, яку їм поставити (None — поточна)."""
+        self._close()
+        for path in self.paths:
+            os.replace(path + TMP_SUFFIX, path)
+            if mtime is not None:
+                os.utime(path, (mtime, mtime))
+
+    def discard(self):
+        self._close()
+        for path in self.paths:
+            if os.path.exists(path + TMP_SUFFIX):
+                os.remove(path + TMP_SUFFIX)
+
+
+def extract_member(archive, info, paths):
+    """
+    Розпаковує член `info` відкритого ZipFile у всі `paths`.
+    BadZipFile — якщо CRC не збігся (цілі тоді не змінюються).
+    """
+    writer = MemberWriter(paths)
+    try:
+        with archive.open(info) as src:
+            while True:
+                chunk = src.read(COPY_CHUNK)
+                if not chunk:
+                    break
+                writer.write(chunk)
+    except BaseException:
+        writer.discard()
+        raise
+    writer.commit(zip_mtime(info.date_time))
+
+
+def plan_install(infos, lookup):
+    """
+    [(ZipInfo, [цілі]), ...] для членів `infos`, що встановлюються.
+    Якщо кілька членів мають ту саму ціль, лишається останній в архіві —
+    як при послідовному розпакуванні з перезаписом.
+    """
+    owner = {}
+    for info in infos:
+        for path in lookup.targets(info.filename):
+            owner[os.path.normcase(os.path.abspath(path))] = (info, path)
+    grouped = {}
+    for info, path in owner.values():
+        grouped.setdefault(id(info), (info, []))[1].append(path)
+    return sorted(grouped.values(), key=lambda item: item[0].header_offset)
+
+
+def file_crc32(path):
+    crc = 0
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(COPY_CHUNK)
+            if not chunk:
+                return crc
+            crc = zlib.crc32(chunk, crc)
+
+
+class Fingerprints:
+    """
+    CRC32 файлів папки гри: {відносний шлях: {size, mtime_ns, crc}}.
+    Запис чинний, поки розмір і час зміни файлу ті самі.
+    """
+
+    def __init__(self, hero_root):
+        self.root = hero_root
+        self.path = os.path.join(hero_root, FINGERPRINTS_NAME)
+        self.files = {}
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == FINGERPRINTS_VERSION:
+                self.files = data.get("files", {})
+        except (OSError, ValueError):
+            pass
+
+    def _key(self, path):
+        return os.path.normcase(os.path.relpath(path, self.root))
+
+    def matches(self, path, crc, size, compute=True):
+        """
+        Чи лежить у `path` файл із CRC `crc` і розміром `size`. Без `compute`
+        файли без чинного запису вважаються іншими (не читаються).
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        if st.st_size != size:
+            return False
+        key = self._key(path)
+        with self._lock:
+            entry = self.files.get(key)
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            return entry["crc"] == crc
+        if not compute:
+            return False
+        actual = file_crc32(path)
+        with self._lock:
+            self.files[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "crc": actual}
+        return actual == crc
+
+    def record(self, path, crc):
+        """Щойно записаний файл із відомим CRC (з центрального каталогу)."""
+        st = os.stat(path)
+        with self._lock:
+            self.files[self._key(path)] = {
+                "size": st.st_size, "mtime_ns": st.st_mtime_ns, "crc": crc,
+            }
+
+    def forget(self, path):
+        """Файл змінено не через встановлення (напр. відкат) — запис більше не чинний."""
+        with self._lock:
+            self.files.pop(self._key(path), None)
+
+    def save(self):
+        with self._lock:
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": FINGERPRINTS_VERSION, "files": self.files}, f, indent=1)
+            os.replace(tmp, self.path)
+
+
+def diff_plan(plan, fingerprints, compute=True, workers=None):
+    """
+    `plan` без цілей, де вже лежить такий самий файл (CRC і розмір).
+    Перевірки без чинного запису в `fingerprints` (читання файлу) — паралельно.
+    Повертає (новий plan, кількість пропущених цілей).
+    """
+    checks = [(info, path) for info, paths in plan for path in paths]
+
+    def same(item):
+        info, path = item
+        return fingerprints.matches(path, info.CRC, info.file_size, compute)
+
+    if compute and len(checks) > 1:
+        with ThreadPoolExecutor(max_workers=workers or default_workers()) as pool:
+            results = list(pool.map(same, checks))
+    else:
+        results = [same(item) for item in checks]
+    unchanged = {path for (_, path), is_same in zip(checks, results) if is_same}
+
+    result = []
+    for info, paths in plan:
+        paths = [p for p in paths if p not in unchanged]
+        if paths:
+            result.append((info, paths))
+    return result, len(unchanged)
+
+
+def find_conflicts(plan):
+    """[(ZipInfo, шлях), ...] цілей `plan`, що вже існують."""
+    return [(info, path) for info, paths in plan for path in paths if os.path.exists(path)]
+
+
+def apply_policy(plan, conflicts, policy):
+    """
+    `plan` без цілей, які `policy` каже не чіпати. POLICY_NEWER лишає файл,
+    якщо він не старший за член архіву (з точністю DOS-дати, 2 с).
+    Повертає (новий plan, кількість пропущених цілей).
+    """
+    if policy == POLICY_OVERWRITE or not conflicts:
+        return plan, 0
+    keep_existing = set()
+    for info, path in conflicts:
+        if policy == POLICY_SKIP:
+            keep_existing.add(path)
+        elif policy == POLICY_NEWER:
+            try:
+                if os.path.getmtime(path) >= zip_mtime(info.date_time) - 2:
+                    keep_existing.add(path)
+            except OSError:
+                pass  # зник після перевірки — просто встановити
+        else:
+            raise ValueError(f"Невідома політика конфліктів: {policy}")
+    result = []
+    for info, paths in plan:
+        paths = [p for p in paths if p not in keep_existing]
+        if paths:
+            result.append((info, paths))
+    return result, len(keep_existing)
+
+
+def install_members(zip_path, plan, workers=None, progress=None, log=None, fingerprints=None):
+    """
+    Розпаковує члени `plan` (див. plan_install) з `zip_path` паралельно,
+    кожен потік — зі своїм ZipFile. progress(done, total) — у байтах
+    розпакованих даних, log(str) — після кожного файлу. З `fingerprints`
+    CRC записаних файлів одразу потрапляють у кеш (зберігає викликач).
+    Повертає кількість встановлених членів; першу помилку — прокидає далі.
+    """
+    progress = progress or (lambda done, total: None)
+    log = log or (lambda message: None)
+    workers = max(1, min(workers or default_workers(), len(plan)))
+    total = sum(info.file_size for info, _ in plan)
+    done = 0
+    lock = threading.Lock()
+    local = threading.local()
+    opened = []
+    failed = threading.Event()
+
+    def archive():
+        if not hasattr(local, "zip"):
+            local.zip = zipfile.ZipFile(zip_path, "r")
+            with lock:
+                opened.append(local.zip)
+        return local.zip
+
+    def run_one(item):
+        nonlocal done
+        if failed.is_set():
+            return  # після першої помилки решту не чіпаємо
+        info, paths = item
+        try:
+            extract_member(archive(), info, paths)
+        except BaseException:
+            failed.set()
+            raise
+        if fingerprints is not None:
+            for path in paths:
+                fingerprints.record(path, info.CRC)
+        with lock:
+            done += info.file_size
+            progress(done, total)
+        log(f"✔ {os.path.basename(paths[0])} → {', '.join(os.path.dirname(p) for p in paths)}")
+
+    progress(0, total)
+    # Великі файли першими — менше шансів, що один потік довантажує хвіст
+    ordered = sorted(plan, key=lambda item: -item[0].compress_size)
+    try:
+        if workers == 1:
+            for item in ordered:
+                run_one(item)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(run_one, ordered))
+    finally:
+        for z in opened:
+            z.close()
+    return len(plan)
@@ -0,0 +1,87 @@
+# core/log_buffer.py
+"""
+Обмежений кільцевий буфер рядків логу без залежності від Qt.
+
+Потоки-воркери лише додають повідомлення в чергу (append, під замком).
+Потік GUI періодично забирає накопичене одним пакетом (take_pending)
+і переносить у кільце (drop + extend), сповіщаючи представлення про
+зміни. Кільце змінюється й читається лише потоком GUI, тож модель
+читає рядки напряму, без копіювання й без замка.
+"""
+import threading
+from collections import deque
+
+LOG_CAPACITY = 20000
+
+
+class LogBuffer:
+    """Останні `capacity` рядків логу плюс ще не перенесені повідомлення."""
+
+    def __init__(self, capacity=LOG_CAPACITY):
+        self.capacity = capacity
+        self._ring = [None] * capacity
+        self._start = 0
+        self._count = 0
+        # Більше за capacity у чергу класти немає сенсу — витіснить однаково
+        self._pending = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    # -----------------------
+    # Будь-який потік
+    # -----------------------
+    def append(self, message):
+        """Додає повідомлення (багаторядкове — кількома рядками)."""
+        lines = str(message).splitlines() or [""]
+        with self._lock:
+            self._pending.extend(lines)
+
+    # -----------------------
+    # Лише потік GUI
+    # -----------------------
+    def take_pending(self):
+        """Забирає накопичені рядки (не більше capacity останніх)."""
+        with self._lock:
+            lines = list(self._pending)
+            self._pending.clear()
+        return lines
+
+    def overflow(self, incoming):
+        """Скільки найстаріших рядків витіснить додавання `incoming` рядків."""
+        return min(self._count, max(0, self._count + incoming - self.capacity))
+
+    def drop(self, n):
+        """Прибирає `n` найстаріших рядків."""
+        n = min(n, self._count)
+        for i in range(n):
+            self._ring[(self._start + i) % self.capacity] = None
+        self._start = (self._start + n) % self.capacity
+        self._count -= n
+
+    def extend(self, lines):
+        """Дописує рядки в кінець; місце має звільнити drop(overflow(...))."""
+        lines = lines[-self.capacity:]
+        if self._count + len(lines) > self.capacity:
+            raise ValueError("кільце логу переповнене — спершу drop()")
+        for line in lines:
+            self._ring[(self._start + self._count) % self.capacity] = line
+            self._count += 1
+
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+        self._ring = [None] * self.capacity
+        self._start = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return self._ring[(self._start + i) % self.capacity]
+
+    def text(self, rows=None):
+        """Рядки `rows` (усі — якщо None) одним текстом, напр. для буфера обміну."""
+        rows = range(self._count) if rows is None else rows
+        return "\n".join(self[i] for i in rows)
@@ -0,0 +1,62 @@
+# core/overlay.py
+"""
+Overlay-.pak: окремий маленький архів поруч з Universe_mod.pak,
+що містить лише змінені creature .xdb.
+
+Гра читає всі .pak з теки data, і для однакових шляхів бере член
+з новішою датою — тому члени overlay пишуться з поточною датою,
+а оригінальний .pak лишається незмінним.
+"""
+import os
+import time
+import zipfile
+
+OVERLAY_SUFFIX = "_growth_overlay"
+
+
+def overlay_path(pak_path):
+    """Universe_mod.pak → Universe_mod_growth_overlay.pak у тій самій теці."""
+    base, ext = os.path.splitext(pak_path)
+    return base + OVERLAY_SUFFIX + (ext or ".pak")
+
+
+def read_overlay(path):
+    """Поточний вміст overlay (ім'я члена → байти); {} якщо його немає."""
+    if not os.path.isfile(path):
+        return {}
+    with zipfile.ZipFile(path, "r") as z_in:
+        return {info.filename: z_in.read(info) for info in z_in.infolist() if not info.is_dir()}
+
+
+def write_overlay(path, members):
+    """
+    Записує overlay з `members` (ім'я члена → байти) атомарно.
+    Порожній `members` означає «змін немає» — overlay видаляється.
+    Повертає розмір overlay у байтах (0, якщо видалено).
+    """
+    if not members:
+        remove_overlay(path)
+        return 0
+
+    now = time.localtime()[:6]
+    tmp = path + ".new"
+    try:
+        with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as z_out:
+            for name in sorted(members):
+                zinfo = zipfile.ZipInfo(name, now)
+                zinfo.compress_type = zipfile.ZIP_DEFLATED
+                z_out.writestr(zinfo, members[name])
+        os.replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return os.path.getsize(path)
+
+
+def remove_overlay(path):
+    """Видаляє overlay, якщо він є. Повертає True, якщо щось видалено."""
+    if os.path.exists(path):
+        os.remove(path)
+        return True
+    return False
@@ -0,0 +1,113 @@
+# core/pak_stream.py
+"""
+Потоковий перезапис .pak (звичайний zip) без розпакування на диск.
+
+Незмінені члени архіву копіюються «як є» — стиснуті байти переносяться
+у новий архів без inflate/deflate. Заново стискаються лише ті члени,
+для яких передано нові дані.
+"""
+import struct
+import time
+import zipfile
+
+CREATURES_PREFIX = "GameMechanics/Creature/Creatures/"
+
+# Локальний заголовок zip (APPNOTE 4.3.7)
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_LOCAL_SIGNATURE = b"PK\003\004"
+_FLAG_DATA_DESCRIPTOR = 0x08
+
+RAW_CHUNK = 1024 * 1024
+
+
+def creature_member_parts(name):
+    """
+    Для імені члена архіву під GameMechanics/Creature/Creatures
+    повертає (тека_фракції, ім'я_файлу), інакше None.
+    """
+    if not name.lower().startswith(CREATURES_PREFIX.lower()):
+        return None
+    rel = name[len(CREATURES_PREFIX):]
+    if "/" not in rel:
+        return None
+    folder_top = rel.split("/", 1)[0]
+    return folder_top, rel.rsplit("/", 1)[-1]
+
+
+def iter_raw_member(src, info, chunk_size=RAW_CHUNK):
+    """Генератор стиснутих байтів члена `info` з відкритого файлу `src`."""
+    src.seek(info.header_offset)
+    header = src.read(_LOCAL_HEADER.size)
+    if len(header) != _LOCAL_HEADER.size or header[:4] != _LOCAL_SIGNATURE:
+        raise zipfile.BadZipFile(f"Пошкоджений локальний заголовок: {info.filename}")
+    fields = _LOCAL_HEADER.unpack(header)
+    src.seek(fields[10] + fields[11], 1)
+
+    left = info.compress_size
+    while left > 0:
+        chunk = src.read(min(chunk_size, left))
+        if not chunk:
+            raise zipfile.BadZipFile(f"Обрізані дані члена: {info.filename}")
+        left -= len(chunk)
+        yield chunk
+
+
+def clone_info(info):
+    """Копія ZipInfo для запису в інший архів (без data descriptor і extra)."""
+    out = zipfile.ZipInfo(info.filename, info.date_time)
+    out.compress_type = info.compress_type
+    out.comment = info.comment
+    out.create_system = info.create_system
+    out.internal_attr = info.internal_attr
+    out.external_attr = info.external_attr
+    out.flag_bits = info.flag_bits & ~_FLAG_DATA_DESCRIPTOR
+    out.CRC = info.CRC
+    out.compress_size = info.compress_size
+    out.file_size = info.file_size
+    return out
+
+
+def copy_raw_member(src, info, z_out):
+    """Дописує член `info` у `z_out`, копіюючи стиснуті байти без перепакування."""
+    zinfo = clone_info(info)
+    fp = z_out.fp
+    zinfo.header_offset = fp.tell()
+    fp.write(zinfo.FileHeader())
+    for chunk in iter_raw_member(src, info):
+        fp.write(chunk)
+    z_out.filelist.append(zinfo)
+    z_out.NameToInfo[zinfo.filename] = zinfo
+    z_out.start_dir = fp.tell()
+    return zinfo
+
+
+def rewrite_pak(src_path, dst_path, replacements, progress=None, dates=None):
+    """
+    Записує `dst_path` як копію `src_path`, де члени з `replacements`
+    (ім'я → нові байти) заново стиснуті DEFLATE з поточною датою
+    (або з `dates[ім'я]`, якщо задано), а решта скопійована сирими.
+
+    `progress(done, total)` викликається після кожного члена.
+    """
+    with zipfile.ZipFile(src_path, "r") as z_in:
+        infos = z_in.infolist()
+        comment = z_in.comment
+
+    total = len(infos)
+    now = time.localtime()[:6]
+    with open(src_path, "rb") as src, \
+            zipfile.ZipFile(dst_path, "w", compression=zipfile.ZIP_DEFLATED) as z_out:
+        z_out.comment = comment
+        for i, info in enumerate(infos, start=1):
+            new_data = replacements.get(info.filename)
+            if new_data is None:
+                copy_raw_member(src, info, z_out)
+            else:
+                date_time = dates.get(info.filename, now) if dates else now
+                zinfo = zipfile.ZipInfo(info.filename, tuple(date_time))
+                zinfo.external_attr = info.external_attr
+                zinfo.compress_type = zipfile.ZIP_DEFLATED
+                z_out.writestr(zinfo, new_data)
+            if progress:
+                progress(i, total)
+    return total
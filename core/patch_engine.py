@@ -0,0 +1,492 @@
+# core/patch_engine.py
+"""
+Рушій Universe Editor без залежності від Qt.
+
+Використовується InplacePatchWorker (GUI) і patch_cli.py (консоль/скрипти).
+"""
+import math
+import os
+import zipfile
+import shutil
+import tempfile
+
+from core.backup_store import BackupStore
+from core.growth_index import GrowthIndex, preview, select
+from core.overlay import overlay_path, read_overlay, write_overlay
+from core.pak_stream import rewrite_pak
+from core.stat_rules import (
+    format_report, growth_rules, only_growth, ops_signature, patch_creature,
+    patch_creature_file
+)
+from core.xdb_patch import ENGINE_FAST, map_parallel
+
+# Папки й коефіцієнти
+CREATURE_FOLDERS = [
+    "Academy", "Dungeon", "Dwarf", "Haven", "Inferno",
+    "Necropolis", "Neutrals", "Orcs", "Preserve"
+]
+PERCENT_FACTORS = {
+    "50%": 0.50,
+    "75%": 0.75,
+    "100%": 1.00,
+    "125%": 1.25,
+    "150%": 1.50,
+    "175%": 1.75,
+    "200%": 2.00,
+    "225%": 2.25,
+    "250%": 2.50
+}
+
+# Куди писати результат
+OUTPUT_INPLACE = "inplace"   # перезаписати Universe_mod.pak
+OUTPUT_OVERLAY = "overlay"   # окремий overlay-.pak, оригінал не чіпається
+
+# Коди виходу (patch_cli.py)
+EXIT_OK = 0
+EXIT_ERROR = 1        # непередбачена помилка під час роботи
+EXIT_USAGE = 2        # невірні аргументи (як у argparse)
+EXIT_NOT_FOUND = 3    # .pak не знайдено
+EXIT_ACCESS = 4       # немає прав на читання/запис
+EXIT_RULES = 5        # помилка у файлі правил
+
+
+class PatchError(Exception):
+    """Помилка, яку слід показати користувачу; exit_code — для CLI."""
+
+    def __init__(self, message, exit_code=EXIT_ERROR):
+        super().__init__(message)
+        self.exit_code = exit_code
+
+
+class PatchResult:
+    """Підсумок запуску: текст для логу, кількість змінених .xdb, чи був dry-run."""
+
+    def __init__(self, message, changed_count, dry_run=False):
+        self.message = message
+        self.changed_count = changed_count
+        self.dry_run = dry_run
+
+
+def parse_factor(text):
+    """'150%' або '1.5' → 1.5; ValueError для нечислового/нескінченного/від'ємного."""
+    text = text.strip()
+    if text in PERCENT_FACTORS:
+        return PERCENT_FACTORS[text]
+    factor = float(text[:-1]) / 100 if text.endswith("%") else float(text)
+    # float() приймає і "nan", "inf" — з ними int(round(...)) впав би вже посеред запису
+    if not math.isfinite(factor):
+        raise ValueError("множник має бути скінченним числом")
+    if factor < 0:
+        raise ValueError("множник має бути ≥ 0")
+    return factor
+
+
+class PatchEngine:
+    """
+    Рушій, що редагує WeeklyGrowth та інші характеристики у .xdb файлах
+    (Universe_mod.pak) за один прохід архівом.
+
+    rules — список core.stat_rules.Rule; якщо не задано — лише множник
+    `factor` для WeeklyGrowth, як раніше.
+
+    streaming=True — потоковий перезапис: .pak читається один раз,
+    незмінені члени копіюються стиснутими, розпаковуються лише creature .xdb.
+    streaming=False — старий режим: повне розпакування у тимчасову теку.
+    workers — кількість процесів для розбору/зміни .xdb (1 — без пулу).
+    engine — ENGINE_FAST (байтовий сканер) або ENGINE_ETREE.
+    output — OUTPUT_INPLACE або OUTPUT_OVERLAY: у другому випадку змінені
+    .xdb пишуться в окремий overlay-.pak, а правила завжди рахуються
+    від значень оригінального .pak (без змін overlay просто видаляється).
+
+    Якщо правила чіпають лише WeeklyGrowth, dry-run і вибір файлів для
+    зміни відповідають за GrowthIndex — архів перечитується лише для
+    членів зі зміненим CRC.
+
+    Резервна копія у потоковому режимі — знімок BackupStore лише зі
+    зміненими членами; у режимі розпакування — повна копія .backup.
+
+    Без Qt: прогрес і лог ідуть через колбеки progress(int 0–100) і log(str),
+    run() повертає PatchResult або кидає PatchError з кодом виходу.
+    phase(name) — необов'язковий колбек на початку кожного етапу
+    ("index", "extract", "collect", "patch", "backup", "rewrite", "repack",
+    "overlay", "done"); ним користуються бенчмарки.
+
+    index і patch_cache — спільні для кількох рушіїв GrowthIndex і
+    core.batch.PatchCache (пакетний режим); без них кожен рушій працює сам.
+    index_path — файл власного GrowthIndex, якщо index не задано
+    (за замовчуванням — core.growth_index.default_index_path()).
+    """
+    def __init__(self, pak_path, factor, do_backup, creature_filter, dry_run,
+                 streaming=True, workers=1, engine=ENGINE_FAST,
+                 output=OUTPUT_INPLACE, rules=None, progress=None, log=None, phase=None,
+                 index=None, patch_cache=None, index_path=None):
+        self.pak_path = pak_path
+        self.factor = factor
+        self.do_backup = do_backup
+        self.creature_filter = creature_filter.lower().strip()
+        self.dry_run = dry_run
+        self.streaming = streaming
+        self.workers = max(1, workers)
+        self.engine = engine
+        self.output = output
+        self.rules = rules if rules is not None else growth_rules(factor)
+        self.progress = progress or (lambda value: None)
+        self.log = log or (lambda message: None)
+        self.phase = phase or (lambda name: None)
+        self.index = index
+        self.index_path = index_path
+        self.patch_cache = patch_cache
+
+    def run(self):
+        if not os.path.isfile(self.pak_path):
+            raise PatchError("Помилка: Universe_mod.pak не знайдено.", EXIT_NOT_FOUND)
+
+        # Перевірка прав
+        if not os.access(self.pak_path, os.R_OK):
+            raise PatchError("Помилка: немає прав на читання .pak", EXIT_ACCESS)
+        if not os.access(os.path.dirname(os.path.abspath(self.pak_path)), os.W_OK):
+            raise PatchError("Помилка: немає прав на запис у теку .pak", EXIT_ACCESS)
+
+        if self.dry_run:
+            result = self._run_preview()
+        elif self.output == OUTPUT_OVERLAY:
+            result = self._run_overlay()
+        elif self.streaming:
+            result = self._run_streaming()
+        else:
+            result = self._run_extracted()
+        self.phase("done")
+        return result
+
+    def _load_index(self):
+        self.phase("index")
+        index = self.index or GrowthIndex(self.index_path)
+        entries, reparsed = index.entries(self.pak_path)
+        self.log(f"Індекс WeeklyGrowth: {len(entries)} .xdb, перечитано {reparsed}")
+        return index, entries
+
+    def _growth_factor(self):
+        """Єдиний множник WeeklyGrowth, коли only_growth(self.rules)."""
+        return self.rules[-1].multiply if self.rules else 1.0
+
+    def _candidates(self, entries):
+        """Члени, які варто читати: за індексом — лише ті, що зміняться."""
+        if only_growth(self.rules):
+            changed, _ = preview(entries, self._growth_factor(),
+                                 self.creature_filter, CREATURE_FOLDERS)
+            return changed
+        return select(entries, self.creature_filter, CREATURE_FOLDERS)
+
+    def _describe_rules(self):
+        text = "; ".join(rule.describe() for rule in self.rules)
+        if self.creature_filter:
+            text += f", фільтр '{self.creature_filter}'"
+        return text
+
+    def _run_preview(self):
+        _, entries = self._load_index()
+        if only_growth(self.rules):
+            changed, sample_info = preview(entries, self._growth_factor(),
+                                           self.creature_filter, CREATURE_FOLDERS)
+            return self._finish_dry(len(changed), sample_info)
+
+        to_patch = self._candidates(entries)
+        replacements, _, per_file, _ = self._patch_members(to_patch, entries)
+        self.progress(100)
+        return self._finish_dry(len(replacements), _sample(per_file), per_file)
+
+    def _patch_members(self, to_patch, entries):
+        """
+        Читає й змінює лише члени `to_patch` за правилами. Прогрес 0–50%.
+        Члени, чий результат уже є в patch_cache (той самий CRC, розмір,
+        рушій і дійові правила в іншому .pak), не читаються й не розбираються.
+        Повертає (replacements, originals, per_file, changed_files_list):
+        originals — вміст і дата змінених членів до змін (для знімка),
+        per_file — [(c_name, [(поле, old, new), ...]), ...].
+        """
+        changed_files_list = []
+        replacements = {}
+        originals = {}
+        per_file = []
+        if not to_patch:
+            return replacements, originals, per_file, changed_files_list
+
+        self.phase("patch")
+        self.log(f"Читаємо {len(to_patch)} creature .xdb з оригінального .pak...")
+        cache = self.patch_cache
+        # ім'я члена → (c_name, оригінальні_байти | None, нові_байти | None, changes)
+        done_members = {}
+        jobs = []
+        job_members = []
+        waiting = []  # (info, key, event, folder, c_name) — рахує інший рушій пакета
+
+        def on_patched(done, total_jobs):
+            self.progress(10 + int(40 * done / total_jobs))
+
+        try:
+            with zipfile.ZipFile(self.pak_path, 'r') as z_in:
+                members = [z_in.getinfo(name) for name in to_patch]
+                total = len(members)
+                for i, info in enumerate(members, start=1):
+                    c_name = os.path.splitext(os.path.basename(info.filename))[0]
+                    folder = entries[info.filename]["folder"]
+                    cached = event = key = None
+                    if cache is not None:
+                        key = self._cache_key(info, folder, c_name)
+                        cached, event = cache.claim(key)
+                    if cached is not None:
+                        done_members[info.filename] = (c_name,) + cached
+                    elif event is not None:
+                        waiting.append((info, key, event, folder, c_name))
+                    else:
+                        job_members.append((info, key))
+                        jobs.append((z_in.read(info), self.rules, folder, c_name, self.engine))
+                    self.progress(int(10 * i / total))
+            if cache is not None:
+                self.log(f"Спільний кеш .xdb: {total - len(jobs)} з {total} без повторного розбору")
+            results = map_parallel(patch_creature, jobs, self.workers, on_patched, self.engine)
+        except Exception:
+            # Інакше рушії, що чекають на ці ключі, зависли б
+            if cache is not None:
+                for _, key in job_members:
+                    cache.release(key)
+            raise
+        for (info, key), job, (new_data, changes) in zip(job_members, jobs, results):
+            # Оригінал потрібен лише зміненим членам (для знімка)
+            value = (job[0] if new_data is not None else None, new_data, changes)
+            if cache is not None:
+                cache.put(key, value)
+            done_members[info.filename] = (job[3],) + value
+
+        if waiting:
+            with zipfile.ZipFile(self.pak_path, 'r') as z_in:
+                for info, key, event, folder, c_name in waiting:
+                    value = cache.wait(key, event)
+                    if value is None:
+                        # Інший рушій упав — рахуємо самі
+                        data = z_in.read(info)
+                        new_data, changes = patch_creature(data, self.rules, folder,
+                                                           c_name, self.engine)
+                        value = (data if new_data is not None else None, new_data, changes)
+                    done_members[info.filename] = (c_name,) + value
+
+        for info in members:
+            c_name, original, new_data, changes = done_members[info.filename]
+            if new_data is not None:
+                replacements[info.filename] = new_data
+                originals[info.filename] = (original, info.date_time)
+                changed_files_list.append(os.path.basename(info.filename))
+                per_file.append((c_name, changes))
+        return replacements, originals, per_file, changed_files_list
+
+    def _cache_key(self, info, folder, c_name):
+        return (info.CRC, info.file_size, self.engine,
+                ops_signature(self.rules, folder, c_name))
+
+    def _run_overlay(self):
+        overlay = overlay_path(self.pak_path)
+        _, entries = self._load_index()
+        replacements, _, per_file, changed_files_list = self._patch_members(
+            self._candidates(entries), entries)
+
+        # Члени поза фільтром цього запуску лишаються в overlay як були
+        members = read_overlay(overlay)
+        for name in select(entries, self.creature_filter, CREATURE_FOLDERS):
+            members.pop(name, None)
+        members.update(replacements)
+
+        self.phase("overlay")
+        size = write_overlay(overlay, members)
+        self.progress(100)
+        if size:
+            self.log(f"Overlay: {overlay} ({size / 1024:.1f} KB)")
+        else:
+            self.log(f"Змін немає — overlay прибрано: {overlay}")
+        return self._finish(len(replacements), _sample(per_file), changed_files_list, per_file)
+
+    def _run_streaming(self):
+        index, entries = self._load_index()
+        replacements, originals, per_file, changed_files_list = self._patch_members(
+            self._candidates(entries), entries)
+        if not replacements:
+            return self._finish(0, None, [])
+
+        if self.do_backup:
+            self.phase("backup")
+            note = self._describe_rules()
+            snap_id = BackupStore(self.pak_path).save_snapshot(originals, note)
+            self.log(f"Знімок резервної копії #{snap_id}: {len(originals)} .xdb")
+
+        # Перезаписуємо: змінені .xdb — заново, решта — сирою копією
+        new_pak = self.pak_path + ".new"
+        self.log("Потоковий перезапис архіву...")
+
+        def on_progress(done, total_members):
+            self.progress(50 + int(50 * done / total_members))
+
+        try:
+            self.phase("rewrite")
+            rewrite_pak(self.pak_path, new_pak, replacements, on_progress)
+        except Exception:
+            if os.path.exists(new_pak):
+                os.remove(new_pak)
+            raise
+
+        os.replace(new_pak, self.pak_path)
+        # Оновлюємо індекс одразу — перечитаються лише щойно змінені члени
+        index.entries(self.pak_path)
+        return self._finish(len(replacements), _sample(per_file), changed_files_list, per_file)
+
+    def _run_extracted(self):
+        self.log("Читаємо оригінальний .pak...")
+        with zipfile.ZipFile(self.pak_path, 'r') as z_in:
+            file_names = z_in.namelist()
+            total = len(file_names)
+
+        tmp_dir = tempfile.mkdtemp(prefix="universe_inplace_")
+
+        # Розпаковуємо
+        self.phase("extract")
+        extracted_count = 0
+        with zipfile.ZipFile(self.pak_path, 'r') as z_in:
+            for f_name in file_names:
+                info = z_in.getinfo(f_name)
+                if info.is_dir():
+                    dest_dir = os.path.join(tmp_dir, f_name)
+                    os.makedirs(dest_dir, exist_ok=True)
+                    extracted_count += 1
+                    prog = int(50 * extracted_count / total)
+                    self.progress(prog)
+                    continue
+
+                dest_path = os.path.join(tmp_dir, f_name)
+                os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+                with z_in.open(info) as fin, open(dest_path, 'wb') as fout:
+                    shutil.copyfileobj(fin, fout)
+
+                extracted_count += 1
+                prog = int(50 * extracted_count / total)
+                self.progress(prog)
+
+        self.log("Аналізуємо .xdb та змінюємо характеристики...")
+        creatures_root = os.path.join(tmp_dir, "GameMechanics", "Creature", "Creatures")
+        self.phase("collect")
+        xdb_files = self._collect_xdb(creatures_root)
+
+        changed_files_list = []
+        self.phase("patch")
+        per_file = self._process_xdb_files(xdb_files, creatures_root, changed_files_list)
+
+        self.phase("backup")
+        self._make_backup()
+
+        # Перезапаковуємо
+        self.phase("repack")
+        new_pak = self.pak_path + ".new"
+        self.log("Запаковуємо оновлений архів...")
+        updated_files = []
+        for root, dirs, files in os.walk(tmp_dir):
+            for f in files:
+                updated_files.append(os.path.join(root, f))
+        total_updated = len(updated_files)
+
+        packed_count = 0
+        with zipfile.ZipFile(new_pak, 'w', compression=zipfile.ZIP_DEFLATED) as z_out:
+            for fpath in updated_files:
+                rel_path = os.path.relpath(fpath, tmp_dir)
+                z_out.write(fpath, rel_path)
+                packed_count += 1
+                prog = 50 + int(50 * packed_count / total_updated)
+                self.progress(prog)
+
+        # Заміна
+        os.remove(self.pak_path)
+        os.rename(new_pak, self.pak_path)
+        shutil.rmtree(tmp_dir)
+
+        return self._finish(len(per_file), _sample(per_file), changed_files_list, per_file)
+
+    def _make_backup(self):
+        if not self.do_backup:
+            return
+        backup_path = self.pak_path + ".backup"
+        if not os.path.exists(backup_path):
+            shutil.copy2(self.pak_path, backup_path)
+            self.log(f"Створено резервну копію: {backup_path}")
+
+    def _log_report(self, per_file):
+        for line in format_report(per_file):
+            self.log(line)
+
+    def _finish_dry(self, changed_count, sample_info, per_file=None):
+        if per_file:
+            self._log_report(per_file)
+        msg = f"[РЕЖИМ ПЕРЕГЛЯДУ] Зміни: {changed_count} файлів"
+        if sample_info:
+            cr_name, oldv, newv = sample_info
+            msg += f" (Приклад: {cr_name} {oldv}→{newv})"
+        return PatchResult(msg, changed_count, dry_run=True)
+
+    def _finish(self, changed_count, sample_info, changed_files_list, per_file=None):
+        # Лог
+        if per_file and not only_growth(self.rules):
+            self._log_report(per_file)
+        elif changed_files_list:
+            self.log("Змінено файли:")
+            for f in changed_files_list:
+                self.log(f" - {f}")
+
+        if changed_count > 0:
+            if sample_info:
+                cr_name, oldv, newv = sample_info
+                msg = f"Готово! Змінено {changed_count} .xdb. Приклад: {cr_name} {oldv}→{newv}"
+            else:
+                msg = f"Готово! Змінено {changed_count} .xdb"
+        else:
+            msg = "Готово! Не знайдено змін."
+        return PatchResult(msg, changed_count)
+
+    def _collect_xdb(self, creatures_root):
+        xdb_files = []
+        if not os.path.isdir(creatures_root):
+            return xdb_files
+
+        for root, dirs, files in os.walk(creatures_root):
+            for f in files:
+                if not f.lower().endswith(".xdb"):
+                    continue
+                rel_path = os.path.relpath(os.path.join(root, f), creatures_root)
+                folder_top = rel_path.split(os.sep, 1)[0]
+                if folder_top not in CREATURE_FOLDERS:
+                    continue
+
+                if self.creature_filter and self.creature_filter not in f.lower():
+                    continue
+                xdb_files.append(os.path.join(root, f))
+        return xdb_files
+
+    def _process_xdb_files(self, xdb_files, creatures_root, changed_files_list):
+        def on_patched(done, total_files):
+            self.progress(50 + int(40 * done / total_files))
+
+        jobs = []
+        for p in xdb_files:
+            folder = os.path.relpath(p, creatures_root).split(os.sep, 1)[0]
+            jobs.append((p, self.rules, folder, True, self.engine))
+        results = map_parallel(patch_creature_file, jobs, self.workers, on_patched, self.engine)
+
+        per_file = []
+        for p, (changed, changes) in zip(xdb_files, results):
+            if changed:
+                changed_files_list.append(os.path.basename(p))
+                per_file.append((os.path.splitext(os.path.basename(p))[0], changes))
+        return per_file
+
+
+def _sample(per_file):
+    """(c_name, old, new) першої зміни — для короткого підсумку."""
+    if not per_file:
+        return None
+    c_name, changes = per_file[0]
+    _, old_val, new_val = changes[0]
+    return c_name, old_val, new_val
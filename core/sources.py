@@ -0,0 +1,147 @@
+# core/sources.py
+"""
+Завантаження одного запису DOWNLOAD_SOURCES без залежності від Qt.
+
+Запис — dict з "type":
+    {"type": "git", "repo": "owner/name", "file": "шлях у репо"}
+    {"type": "gdrive", "id": "<id файлу>"}
+    {"url": "https://..."} або {"id": ...} без типу — прямий URL / Drive uc
+
+Необов'язкові "size" і "sha256" у записі перевіряються під час
+завантаження (core.checksums); перевірений хеш записується в маніфест
+поруч із файлом і в запис кешу.
+
+З DownloadCache джерело спершу перевіряється умовним запитом
+(GitHub — sha блоба й ETag відповіді API, решта — ETag / Last-Modified),
+і якщо воно не змінилося, файл береться з кешу без завантаження.
+"""
+import os
+
+import requests
+
+from core.checksums import expected_checks, file_sha256, manifest_for
+from core.download_cache import revalidate, source_key
+from core.downloads import DEFAULT_SEGMENTS, download, download_with_info, make_session
+from core.gdrive import resolve_url
+
+
+def _github_headers():
+    token = os.getenv("GITHUB_TOKEN")
+    if not token:
+        raise RuntimeError("Set GITHUB_TOKEN environment variable")
+    return {"Authorization": f"token {token}"}
+
+
+def github_contents(repo, filepath, session=None, api_etag=None):
+    """
+    Метадані файлу з GitHub contents API. Повертає (json | None, etag відповіді);
+    None — якщо з `api_etag` відповідь 304 (файл не змінився). Умовні запити
+    з 304 не витрачають ліміт API.
+    """
+    headers = _github_headers()
+    if api_etag:
+        headers["If-None-Match"] = api_etag
+    url_api = f"https://api.github.com/repos/{repo}/contents/{filepath}"
+    r = (session or requests).get(url_api, headers=headers)
+    if r.status_code == 304:
+        return None, api_etag
+    if r.status_code != 200:
+        raise RuntimeError(f"GitHub API {r.status_code}: {r.text}")
+    return r.json(), r.headers.get("ETag")
+
+
+def _fetch_git(info, out_path, session, segments, progress, log, cache, key, entry, on_data,
+               limiter):
+    meta, api_etag = github_contents(info["repo"], info["file"], session,
+                                     entry.get("api_etag") if entry else None)
+    if entry and (meta is None or meta.get("sha") == entry.get("github_sha")):
+        cache.update(key, api_etag=api_etag)
+        return None
+    download_url = meta.get("download_url")
+    if not download_url:
+        raise RuntimeError("No download_url in API response")
+    expect_size, expect_sha256 = expected_checks(info)
+    size = download(download_url, out_path, segments, session, _github_headers(),
+                    progress, log, on_data=on_data, expect_size=expect_size,
+                    expect_sha256=expect_sha256, limiter=limiter)
+    if cache is not None:
+        cache.store(key, out_path, github_sha=meta.get("sha"), api_etag=api_etag,
+                    sha256=expect_sha256)
+    return size
+
+
+def _fetch_http(info, out_path, session, segments, progress, log, cache, key, entry, on_data,
+                limiter):
+    if info.get("type") == "gdrive":
+        url = resolve_url(session, info["id"], log)
+    else:
+        url = info.get("url")
+        if not url and info.get("id"):
+            url = f"https://drive.google.com/uc?export=download&id={info['id']}"
+        if not url:
+            raise RuntimeError("Не змогли визначити тип джерела.")
+
+    if entry and revalidate(session, url, entry):
+        return None
+    expect_size, expect_sha256 = expected_checks(info)
+    size, remote = download_with_info(url, out_path, segments, session, progress=progress,
+                                      log=log, source=key, on_data=on_data,
+                                      expect_size=expect_size, expect_sha256=expect_sha256,
+                                      limiter=limiter)
+    if cache is not None:
+        cache.store(key, out_path, etag=remote.etag, last_modified=remote.last_modified,
+                    sha256=expect_sha256)
+    return size
+
+
+def _cached_matches(cache, key, entry, info):
+    """Чи відповідає версія в кеші очікуваним розміру й хешу запису `info`."""
+    expect_size, expect_sha256 = expected_checks(info)
+    if expect_size is not None and entry["size"] != expect_size:
+        return False
+    if expect_sha256 is None or entry.get("sha256") == expect_sha256:
+        return True
+    if entry.get("sha256"):
+        return False
+    # Закешовано до того, як у записі з'явився хеш, — перевірити один раз
+    actual = file_sha256(cache.object_path(entry))
+    cache.update(key, sha256=actual)
+    return actual == expect_sha256
+
+
+def fetch_source(info, out_path, session=None, segments=DEFAULT_SEGMENTS,
+                 progress=None, log=None, cache=None, on_data=None, limiter=None):
+    """
+    Завантажує запис DOWNLOAD_SOURCES `info` у `out_path` (через .part).
+    З `cache` (DownloadCache) незмінене джерело береться з кешу.
+    Якщо в `info` є "size" / "sha256", файл перевіряється (DownloadError
+    при невідповідності), а хеш записується в маніфест теки.
+    on_data — див. core.downloads (з кешу не викликається), limiter —
+    спільний BandwidthLimiter.
+    Повертає розмір; RuntimeError (у т.ч. DownloadError) — при помилці.
+    """
+    log = log or (lambda message: None)
+    own_session = session is None
+    if own_session:
+        session = make_session(segments)
+    try:
+        key = source_key(info)
+        entry = cache.lookup(key) if cache is not None else None
+        if entry is not None and not _cached_matches(cache, key, entry, info):
+            log("ℹ Кеш: версія не відповідає очікуваному розміру / SHA-256")
+            entry = None
+        fetch = _fetch_git if info.get("type") == "git" else _fetch_http
+        size = fetch(info, out_path, session, segments, progress, log, cache, key, entry,
+                     on_data, limiter)
+        if size is None:
+            size = cache.materialize(key, out_path)
+            log(f"✔ Кеш: джерело не змінилося, {size / 1024 / 1024:.2f}MB без завантаження")
+            if progress:
+                progress(size, size)
+        expect_sha256 = expected_checks(info)[1]
+        if expect_sha256:
+            manifest_for(out_path).record(out_path, expect_sha256)
+        return size
+    finally:
+        if own_session:
+            session.close()
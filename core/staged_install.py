@@ -0,0 +1,246 @@
+# core/staged_install.py
+"""
+Атомарне встановлення в папку гри через теку staging без залежності від Qt.
+
+Кожне встановлення — окрема транзакція в <папка гри>/.install_staging/txn-*
+(та сама файлова система, що й гра): члени спершу розпаковуються в її new/,
+і лише потім commit переносить їх на місця перейменуваннями. Перед
+перенесенням у journal.json записується весь план: для кожної цілі — звідки
+береться новий файл і куди (у backup/ транзакції) відкладається старий.
+Відкат — ті самі перейменування у зворотному порядку, тож він працює і після
+збою посеред commit, і для останнього завершеного встановлення, без
+повторного розпакування.
+
+Попередня транзакція (її backup/ і журнал) лишається, доки нова не пройде
+commit: невдале розпакування чи обірваний commit не забирають можливості
+відкотити попереднє встановлення.
+
+Кроки відкату визначаються станом файлів, а не тим, до якого кроку дійшов
+commit, тому його можна безпечно повторювати. Цілі, змінені після commit
+(розмір чи час зміни не ті, що записані в журналі), відкат не чіпає; інші
+способи встановлення в ту саму папку мають викликати discard().
+"""
+import json
+import os
+import shutil
+import time
+
+from core.install import install_members
+
+STAGING_DIR_NAME = ".install_staging"
+JOURNAL_NAME = "journal.json"
+JOURNAL_VERSION = 2
+
+# Стан журналу (state())
+STATE_NONE = None
+STATE_INCOMPLETE = "incomplete"
+STATE_COMMITTED = "committed"
+
+
+def _stat_key(path):
+    """(розмір, mtime_ns) файлу або None, якщо його немає."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def _recorded_key(move):
+    """_stat_key цілі, записаний у журнал після commit ([розмір, mtime_ns] у JSON)."""
+    installed = move.get("installed")
+    return tuple(installed) if installed is not None else None
+
+
+class StagedInstall:
+    """Транзакція встановлення в `hero_root`; одна остання зберігається для відкату."""
+
+    def __init__(self, hero_root, log=None):
+        self.hero_root = hero_root
+        self.log = log or (lambda message: None)
+        self.staging = os.path.join(hero_root, STAGING_DIR_NAME)
+        self.journal_path = os.path.join(self.staging, JOURNAL_NAME)
+
+    # -----------------------
+    # Журнал
+    # -----------------------
+    def _read_journal(self):
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                journal = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return journal if journal.get("version") == JOURNAL_VERSION else None
+
+    def _write_journal(self, journal):
+        tmp = self.journal_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(journal, f, ensure_ascii=False, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.journal_path)
+
+    def _remove_journal(self):
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def _remove_stale(self):
+        """Прибирає теки транзакцій, на які не посилається журнал."""
+        if not os.path.isdir(self.staging):
+            return
+        journal = self._read_journal()
+        keep = set()
+        while journal:
+            keep.add(os.path.normcase(journal["dir"]))
+            journal = journal.get("previous")
+        for name in os.listdir(self.staging):
+            path = os.path.join(self.staging, name)
+            if os.path.isdir(path) and os.path.normcase(path) not in keep:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def state(self):
+        """STATE_NONE, STATE_INCOMPLETE (commit обірвався) або STATE_COMMITTED."""
+        journal = self._read_journal()
+        if journal is None:
+            return STATE_NONE
+        return STATE_COMMITTED if journal.get("committed") else STATE_INCOMPLETE
+
+    # -----------------------
+    # Встановлення
+    # -----------------------
+    def recover(self):
+        """Відкочує обірваний commit, якщо він є. True — якщо відкочено."""
+        if self.state() != STATE_INCOMPLETE:
+            return False
+        self.log("↩ Попереднє встановлення обірвалося посеред commit — відкат")
+        self.rollback()
+        return True
+
+    def discard(self):
+        """
+        Папку гри змінює інший спосіб встановлення: відкат останньої
+        транзакції більше не чинний — журнал і backup видаляються
+        (обірваний commit спершу відкочується).
+        """
+        self.recover()
+        if os.path.isdir(self.staging):
+            shutil.rmtree(self.staging)
+
+    def install(self, zip_path, plan, workers=None, progress=None, log=None, fingerprints=None):
+        """
+        Розпаковує `plan` (core.install.plan_install) у staging і переносить
+        на місця. При помилці до або під час commit папка гри лишається
+        такою, як була, а попереднє встановлення — доступним для відкату.
+        Повертає кількість встановлених членів.
+        """
+        self.recover()
+        self._remove_stale()
+        txn = os.path.join(self.staging, f"txn-{time.time_ns()}")
+        new_dir = os.path.join(txn, "new")
+        backup_dir = os.path.join(txn, "backup")
+        os.makedirs(new_dir)
+        os.makedirs(backup_dir)
+
+        staged_plan = []
+        moves = []
+        for info, paths in plan:
+            staged = []
+            for target in paths:
+                n = len(moves)
+                path = os.path.join(new_dir, f"{n}_{os.path.basename(target)}")
+                staged.append(path)
+                moves.append({"target": target, "staged": path,
+                              "backup": os.path.join(backup_dir, str(n))})
+            staged_plan.append((info, staged))
+
+        try:
+            count = install_members(zip_path, staged_plan, workers, progress, log)
+        except BaseException:
+            shutil.rmtree(txn, ignore_errors=True)
+            raise
+
+        try:
+            self.commit(moves, txn)
+        except BaseException:
+            self.rollback()
+            raise
+        if fingerprints is not None:
+            for (info, _), (_, paths) in zip(staged_plan, plan):
+                for target in paths:
+                    fingerprints.record(target, info.CRC)
+        return count
+
+    def commit(self, moves, txn):
+        """
+        Перейменування staged → ціль (старе — у backup) за записаним журналом.
+        Лише після успіху прибирається попередня транзакція.
+        """
+        for move in moves:
+            if not os.path.exists(move["target"]):
+                move["backup"] = None  # нового файлу не було — при відкаті просто видалити
+        previous = self._read_journal()
+        journal = {"version": JOURNAL_VERSION, "committed": False, "dir": txn,
+                   "moves": moves, "previous": previous}
+        self._write_journal(journal)
+
+        for move in moves:
+            os.makedirs(os.path.dirname(move["target"]), exist_ok=True)
+            if move["backup"]:
+                os.replace(move["target"], move["backup"])
+            os.replace(move["staged"], move["target"])
+            # Щоб відкат не затер файл, змінений уже після встановлення
+            move["installed"] = _stat_key(move["target"])
+
+        journal["committed"] = True
+        journal["previous"] = None
+        self._write_journal(journal)
+        if previous:
+            shutil.rmtree(previous["dir"], ignore_errors=True)
+        shutil.rmtree(os.path.join(txn, "new"), ignore_errors=True)
+        self.log(f"✔ Commit: {len(moves)} файлів на місцях (відкат можливий)")
+
+    # -----------------------
+    # Відкат
+    # -----------------------
+    def rollback(self, fingerprints=None):
+        """
+        Повертає папку гри до стану перед останнім commit. Повертає
+        кількість відновлених цілей; 0 — якщо відкочувати нічого.
+        Після обірваного commit знову чинним стає журнал попереднього
+        встановлення.
+        """
+        journal = self._read_journal()
+        if journal is None:
+            self._remove_stale()
+            return 0
+        committed = journal["committed"]
+        restored = changed = 0
+        for move in reversed(journal["moves"]):
+            target, backup = move["target"], move["backup"]
+            current = _stat_key(target)
+            if committed and current != _recorded_key(move):
+                # Ціль змінили вже після встановлення (або її вже відкочено)
+                if current is not None:
+                    changed += 1
+                continue
+            if backup:
+                if os.path.exists(backup):
+                    os.replace(backup, target)
+                    restored += 1
+            elif not os.path.exists(move["staged"]) and os.path.exists(target):
+                # Нового файлу раніше не було, а staged уже перенесено
+                os.remove(target)
+                restored += 1
+            if fingerprints is not None:
+                fingerprints.forget(target)
+
+        previous = journal.get("previous")
+        if previous:
+            self._write_journal(previous)
+        else:
+            self._remove_journal()
+        shutil.rmtree(journal["dir"], ignore_errors=True)
+        self.log(f"↩ Відкат: відновлено {restored} файлів")
+        if changed:
+            self.log(f"ℹ Не відкочено {changed} файлів, змінених після встановлення")
+        return restored
@@ -0,0 +1,174 @@
+# core/startup_profile.py
+"""
+Профілювання запуску програми без залежності від Qt.
+
+Вмикається аргументом `--profile-startup[=звіт.json]` (див. main.py).
+start() викликається до імпорту Qt і ставить обгортку над
+builtins.__import__: для кожного модуля, вперше імпортованого після
+старту, записується повний час імпорту (з вкладеними) і власний.
+mark(етап) — мітки етапів побудови вікна від моменту start().
+finish() знімає обгортку, пише JSON-звіт і повертає його текстовий підсумок.
+
+Звіт — {version, timestamp, python, platform, total, stages: [{stage, at,
+delta}], imports: [{module, depth, total, self}]}; час — у секундах.
+"""
+import builtins
+import json
+import platform
+import sys
+import threading
+import time
+
+PROFILE_ARG = "--profile-startup"
+EXIT_ARG = "--profile-exit"    # закрити програму одразу після звіту (бенчмарк)
+TABS_ARG = "--profile-tabs"    # побудувати й заміряти всі вкладки, а не лише поточну
+DEFAULT_REPORT = "startup_profile.json"
+REPORT_VERSION = 1
+
+_active = None
+
+
+class StartupProfile:
+    """Мітки етапів і час імпортів від моменту створення."""
+
+    def __init__(self, report_path=DEFAULT_REPORT, exit_after=False, build_tabs=False):
+        self.report_path = report_path
+        self.exit_after = exit_after
+        self.build_tabs = build_tabs
+        self.t0 = time.perf_counter()
+        self.stages = []
+        self.imports = []
+        self._stack = []
+        self._thread = threading.get_ident()
+        self._hooked = False
+        self._original_import = builtins.__import__
+
+    # -----------------------
+    # Імпорти
+    # -----------------------
+    def install_import_hook(self):
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+        self._hooked = True
+
+    def remove_import_hook(self):
+        # Хтось міг обгорнути нас (shiboken) — тоді лише вимикаємо заміри
+        if builtins.__import__ == self._import:
+            builtins.__import__ = self._original_import
+        self._hooked = False
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original_import
+        if (not self._hooked or level or threading.get_ident() != self._thread
+                or (name in sys.modules and not fromlist)):
+            return original(name, globals, locals, fromlist, level)
+        new = name not in sys.modules
+        loaded = len(sys.modules)
+        start = time.perf_counter()
+        self._stack.append(0.0)
+        depth = len(self._stack) - 1
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            total = time.perf_counter() - start
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += total
+            # `from пакет import атрибут` без нових модулів — не імпорт
+            if len(sys.modules) > loaded:
+                label = name if new else f"{name}.{{{', '.join(fromlist)}}}"
+                self.imports.append({"module": label, "depth": depth,
+                                     "total": total, "self": total - children})
+
+    # -----------------------
+    # Етапи
+    # -----------------------
+    def mark(self, stage):
+        self.stages.append((stage, time.perf_counter() - self.t0))
+
+    def report(self):
+        stages = []
+        previous = 0.0
+        for stage, at in self.stages:
+            stages.append({"stage": stage, "at": at, "delta": at - previous})
+            previous = at
+        return {
+            "version": REPORT_VERSION,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "total": previous,
+            "stages": stages,
+            "imports": self.imports,
+        }
+
+    def finish(self):
+        """Знімає обгортку імпорту, пише звіт у report_path; повертає текст підсумку."""
+        self.remove_import_hook()
+        report = self.report()
+        if self.report_path:
+            with open(self.report_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=1)
+        return format_report(report)
+
+
+def format_report(report, limit=15):
+    """Текстовий підсумок звіту: етапи й найдорожчі імпорти."""
+    lines = [f"Запуск: {report['total'] * 1000:.0f} мс"]
+    for s in report["stages"]:
+        lines.append(f"  {s['at'] * 1000:8.1f} мс  +{s['delta'] * 1000:7.1f}  {s['stage']}")
+    imports = report["imports"]
+    top_level = sum(i["total"] for i in imports if i["depth"] == 0)
+    lines.append(f"Імпорти: {len(imports)} модулів, {top_level * 1000:.0f} мс верхнього рівня")
+    lines.append("  Найдорожчі (повний / власний час, мс):")
+    for i in sorted(imports, key=lambda i: -i["total"])[:limit]:
+        lines.append(f"  {i['total'] * 1000:8.1f} / {i['self'] * 1000:7.1f}  {i['module']}")
+    return "\n".join(lines)
+
+
+def start(argv):
+    """
+    Вмикає профілювання, якщо в `argv` є PROFILE_ARG; прибирає з `argv`
+    аргументи профілювання (щоб не дійшли до QApplication). Повертає
+    StartupProfile або None.
+    """
+    global _active
+    path = None
+    exit_after = build_tabs = False
+    rest = [argv[0]] if argv else []
+    for arg in argv[1:]:
+        if arg == PROFILE_ARG:
+            path = DEFAULT_REPORT
+        elif arg.startswith(PROFILE_ARG + "="):
+            path = arg.split("=", 1)[1] or DEFAULT_REPORT
+        elif arg == EXIT_ARG:
+            exit_after = True
+        elif arg == TABS_ARG:
+            build_tabs = True
+        else:
+            rest.append(arg)
+    argv[:] = rest
+    if path is None:
+        return None
+    _active = StartupProfile(path, exit_after, build_tabs)
+    _active.install_import_hook()
+    _active.mark("start")
+    return _active
+
+
+def active():
+    """Поточний StartupProfile або None (профілювання вимкнене чи вже завершене)."""
+    return _active
+
+
+def mark(stage):
+    """Мітка етапу; без увімкненого профілювання нічого не робить."""
+    if _active is not None:
+        _active.mark(stage)
+
+
+def finish():
+    """Завершує профілювання (див. StartupProfile.finish); None — якщо вимкнене."""
+    global _active
+    profile, _active = _active, None
+    return profile.finish() if profile is not None else None
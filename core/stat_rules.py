@@ -0,0 +1,175 @@
+# core/stat_rules.py
+"""
+Правила зміни характеристик істот у creature .xdb.
+
+Файл правил — JSON-список (або {"rules": [...]}) записів виду:
+    {"field": "Health", "multiply": 1.25}
+    {"field": "WeeklyGrowth", "set": 10, "faction": "Haven"}
+    {"field": "AttackSkill", "multiply": 2, "faction": ["Inferno", "Dungeon"], "creature": "*dragon*"}
+
+faction — тека фракції (Academy, Haven, …), creature — шаблон fnmatch
+для назви файлу без .xdb (без урахування регістру). Для кожного поля
+діє останнє правило у списку, що підходить під істоту, — тож загальні
+правила пишуть першими, а уточнення для фракцій/істот після них.
+"""
+import fnmatch
+import json
+import math
+import os
+import re
+
+from core.xdb_patch import ENGINE_FAST, GROWTH_FIELD, patch_fields
+
+# Назва поля — XML-тег у ASCII (саме так його шукає core.xdb_patch)
+_FIELD_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_.-]*")
+
+
+def _is_number(value):
+    # bool — теж int, але в JSON true/false числом не є
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class Rule:
+    def __init__(self, field, multiply=None, set=None, faction=None, creature=None):
+        if not isinstance(field, str) or not _FIELD_NAME.fullmatch(field):
+            raise ValueError(f"{field!r}: 'field' має бути назвою XML-поля")
+        if (multiply is None) == (set is None):
+            raise ValueError(f"{field}: потрібно рівно одне з 'multiply' або 'set'")
+        if set is not None and (isinstance(set, bool) or not isinstance(set, int) or set < 0):
+            raise ValueError(f"{field}: 'set' має бути цілим ≥ 0")
+        if multiply is not None and (not _is_number(multiply) or not math.isfinite(multiply)
+                                     or multiply < 0):
+            raise ValueError(f"{field}: 'multiply' має бути скінченним числом ≥ 0")
+        if isinstance(faction, str):
+            faction = [faction]
+        if faction is not None and (not isinstance(faction, list)
+                                    or not all(isinstance(f, str) for f in faction)):
+            raise ValueError(f"{field}: 'faction' має бути рядком або списком рядків")
+        if creature is not None and not isinstance(creature, str):
+            raise ValueError(f"{field}: 'creature' має бути рядком (шаблоном)")
+        self.field = field
+        self.multiply = multiply
+        self.set = set
+        self.faction = faction
+        self.creature = creature.lower() if creature else None
+
+    def matches(self, folder, c_name):
+        if self.faction is not None and folder not in self.faction:
+            return False
+        if self.creature is not None and not fnmatch.fnmatchcase(c_name.lower(), self.creature):
+            return False
+        return True
+
+    def apply(self, old_val):
+        if self.set is not None:
+            return self.set
+        return int(round(old_val * self.multiply))
+
+    def key(self):
+        """Хешоване представлення правила (для спільного кешу результатів)."""
+        faction = tuple(self.faction) if self.faction is not None else None
+        return (self.field, self.multiply, self.set, faction, self.creature)
+
+    def describe(self):
+        what = f"={self.set}" if self.set is not None else f"×{self.multiply:g}"
+        scope = []
+        if self.faction:
+            scope.append("/".join(self.faction))
+        if self.creature:
+            scope.append(self.creature)
+        return f"{self.field} {what}" + (f" [{', '.join(scope)}]" if scope else "")
+
+
+def growth_rules(factor):
+    """Правила, еквівалентні старому глобальному множнику WeeklyGrowth."""
+    return [Rule(GROWTH_FIELD, multiply=factor)]
+
+
+def parse_rules(raw):
+    """Список Rule з розібраного JSON (список або {"rules": [...]})."""
+    if isinstance(raw, dict):
+        raw = raw.get("rules", [])
+    if not isinstance(raw, list):
+        raise ValueError("Файл правил має містити список правил")
+    rules = []
+    for i, item in enumerate(raw, start=1):
+        if not isinstance(item, dict) or not item.get("field"):
+            raise ValueError(f"Правило №{i}: потрібне поле 'field'")
+        unknown = set(item) - {"field", "multiply", "set", "faction", "creature"}
+        if unknown:
+            raise ValueError(f"Правило №{i}: невідомі ключі {sorted(unknown)}")
+        try:
+            rules.append(Rule(**item))
+        except ValueError as ex:
+            raise ValueError(f"Правило №{i}: {ex}") from None
+    return rules
+
+
+def load_rules(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return parse_rules(json.load(f))
+
+
+def only_growth(rules):
+    """True, якщо правила чіпають лише WeeklyGrowth і без меж фракцій/істот."""
+    return all(r.field == GROWTH_FIELD and r.multiply is not None
+               and not r.faction and not r.creature for r in rules)
+
+
+def ops_for(rules, folder, c_name):
+    """Поле → правило, що діє для цієї істоти (останнє, що підходить)."""
+    ops = {}
+    for rule in rules:
+        if rule.matches(folder, c_name):
+            ops[rule.field] = rule
+    return ops
+
+
+def ops_signature(rules, folder, c_name):
+    """
+    Ключ дійових для істоти правил: дві істоти з однаковим вмістом .xdb
+    і однаковим ключем дають однаковий результат patch_creature.
+    """
+    ops = ops_for(rules, folder, c_name)
+    return tuple(sorted((field, rule.key()) for field, rule in ops.items()))
+
+
+def patch_creature(data, rules, folder, c_name, engine=ENGINE_FAST):
+    """
+    Застосовує правила до однієї істоти.
+    Повертає (нові_байти | None, [(поле, old, new), ...]).
+    """
+    ops = ops_for(rules, folder, c_name)
+    if not ops:
+        return None, []
+    return patch_fields(data, ops, engine)
+
+
+def patch_creature_file(path, rules, folder, write=True, engine=ENGINE_FAST):
+    """Те саме для файлу на диску; при write=False лише перевіряє."""
+    c_name = os.path.splitext(os.path.basename(path))[0]
+    with open(path, "rb") as f:
+        new_data, changes = patch_creature(f.read(), rules, folder, c_name, engine)
+    if new_data is not None and write:
+        with open(path, "wb") as f:
+            f.write(new_data)
+    return new_data is not None, changes
+
+
+def format_report(per_file):
+    """
+    Зведений звіт: per_file — список (c_name, [(поле, old, new), ...]).
+    Повертає рядки: підсумок за полями, далі зміни по кожній істоті.
+    """
+    by_field = {}
+    for _, changes in per_file:
+        for field in {field for field, _, _ in changes}:
+            by_field[field] = by_field.get(field, 0) + 1
+
+    lines = ["Підсумок за полями:"]
+    for field in sorted(by_field):
+        lines.append(f"  {field}: {by_field[field]} істот")
+    for c_name, changes in per_file:
+        diff = ", ".join(f"{field} {old}→{new}" for field, old, new in changes)
+        lines.append(f" - {c_name}: {diff}")
+    return lines
@@ -0,0 +1,313 @@
+# core/stream_install.py
+"""
+Встановлення архіву за картою (core.install) ще під час його завантаження.
+
+Завантаження (core.downloads) через on_data повідомляє, скільки байтів
+.part уже записано підряд від початку. Окремий потік читає ці байти,
+розбирає локальні заголовки zip і розпаковує потрібні члени одразу
+в папку гри. Коли архів завантажено, кожен встановлений файл звіряється
+з центральним каталогом (CRC і розмір); невідповідні й ті, що потоково
+розібрати не вдалося (data descriptor без стиснення, шифрування, інші
+методи), доставляються з готового архіву.
+"""
+import struct
+import threading
+import zipfile
+import zlib
+
+from core.downloads import part_paths
+from core.install import (COPY_CHUNK, Fingerprints, InstallLookup, MemberWriter, install_members,
+                          plan_install, zip_mtime)
+
+# Локальний заголовок zip (APPNOTE 4.3.7)
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_LOCAL_SIGNATURE = b"PK\003\004"
+_CENTRAL_SIGNATURES = (b"PK\001\002", b"PK\005\006", b"PK\006\006")
+_DESCRIPTOR_SIGNATURE = b"PK\007\010"
+_ZIP64_EXTRA = 0x0001
+_FLAG_ENCRYPTED = 0x01
+_FLAG_DATA_DESCRIPTOR = 0x08
+_FLAG_UTF8 = 0x800
+
+
+class _StreamAbort(Exception):
+    """Далі потоково читати не можна — решта членів піде з готового архіву."""
+
+
+class _StreamClosed(_StreamAbort):
+    """Даних більше не буде (завантаження не почалося або перервалося)."""
+
+
+class GrowingFile:
+    """
+    .part, що дописується завантаженням: read() чекає на нові байти.
+    Файл відкривається лише на час читання, щоб не заважати його
+    перейменуванню; останній advance(complete=True) чекає на release().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.pos = 0
+        self.available = 0
+        self.complete = False
+        self.closed = False
+        self.reset = False
+        self.released = False
+        self._cond = threading.Condition()
+
+    def advance(self, contiguous, complete=False):
+        with self._cond:
+            if contiguous < self.available:
+                self.reset = True
+            self.available = contiguous
+            self.complete = complete
+            self._cond.notify_all()
+            if complete:
+                while not self.released:
+                    self._cond.wait()
+
+    def release(self):
+        """Читач більше не торкається файлу."""
+        with self._cond:
+            self.released = True
+            self._cond.notify_all()
+
+    def close(self):
+        """Нових даних не буде."""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def _wait(self, end):
+        with self._cond:
+            while self.available < end and not (self.complete or self.closed or self.reset):
+                self._cond.wait()
+            if self.reset:
+                raise _StreamAbort("файл на сервері змінився")
+            if self.available < end and not self.complete:
+                raise _StreamClosed()
+            return min(end, self.available)
+
+    def read(self, n):
+        end = self._wait(self.pos + n)
+        if end == self.pos:
+            return b""
+        with open(self.path, "rb") as f:
+            f.seek(self.pos)
+            data = f.read(end - self.pos)
+        self.pos += len(data)
+        return data
+
+    def skip(self, n):
+        end = self._wait(self.pos + n)
+        skipped = end - self.pos
+        self.pos = end
+        return skipped
+
+
+class _Source:
+    """Буферизоване читання з GrowingFile з можливістю повернути байти назад."""
+
+    def __init__(self, growing):
+        self.growing = growing
+        self.buf = b""
+
+    def read(self, n):
+        if self.buf:
+            data, self.buf = self.buf[:n], self.buf[n:]
+            return data
+        return self.growing.read(n)
+
+    def read_exact(self, n):
+        parts = []
+        while n > 0:
+            data = self.read(n)
+            if not data:
+                raise _StreamAbort("архів обірвався")
+            parts.append(data)
+            n -= len(data)
+        return b"".join(parts)
+
+    def skip(self, n):
+        from_buf = min(n, len(self.buf))
+        self.buf = self.buf[from_buf:]
+        if self.growing.skip(n - from_buf) != n - from_buf:
+            raise _StreamAbort("архів обірвався")
+
+    def unread(self, data):
+        self.buf = data + self.buf
+
+
+def _zip64_sizes(extra, usize, csize):
+    """Розміри з extra-поля ZIP64 для тих, що в заголовку 0xFFFFFFFF."""
+    while len(extra) >= 4:
+        tag, length = struct.unpack("<HH", extra[:4])
+        if tag == _ZIP64_EXTRA:
+            values = list(struct.unpack(f"<{length // 8}Q", extra[4:4 + length // 8 * 8]))
+            if usize == 0xFFFFFFFF and values:
+                usize = values.pop(0)
+            if csize == 0xFFFFFFFF and values:
+                csize = values.pop(0)
+            return usize, csize, True
+        extra = extra[4 + length:]
+    return usize, csize, False
+
+
+def _dos_date_time(date, time):
+    """DOS-дата й час з локального заголовка → кортеж як у ZipInfo.date_time."""
+    return ((date >> 9) + 1980, (date >> 5) & 0xF, date & 0x1F,
+            time >> 11, (time >> 5) & 0x3F, (time & 0x1F) * 2)
+
+
+def _copy_member(src, method, csize, writer):
+    """Читає дані члена (до кінця deflate-потоку, якщо csize None) у `writer`."""
+    decomp = zlib.decompressobj(-15) if method == zipfile.ZIP_DEFLATED else None
+    left = csize
+    while left is None or left > 0:
+        chunk = src.read(COPY_CHUNK if left is None else min(COPY_CHUNK, left))
+        if not chunk:
+            raise _StreamAbort("архів обірвався")
+        if left is not None:
+            left -= len(chunk)
+        data = decomp.decompress(chunk) if decomp else chunk
+        if writer is not None:
+            writer.write(data)
+        if decomp and decomp.eof:
+            if left is None:
+                src.unread(decomp.unused_data)
+            break
+    if decomp and not decomp.eof:
+        raise _StreamAbort("пошкоджений deflate-потік")
+
+
+def _read_descriptor(src, zip64):
+    sig = src.read_exact(4)
+    crc_raw = src.read_exact(4) if sig == _DESCRIPTOR_SIGNATURE else sig
+    fmt = "<QQ" if zip64 else "<LL"
+    csize, usize = struct.unpack(fmt, src.read_exact(struct.calcsize(fmt)))
+    return struct.unpack("<L", crc_raw)[0], csize, usize
+
+
+def _parse_stream(src, lookup, streamed, log):
+    """
+    Розбирає локальні записи до центрального каталогу, встановлюючи члени,
+    для яких lookup дає цілі. streamed[ім'я] = (CRC, розмір) встановлених.
+    """
+    while True:
+        sig = src.read_exact(4)
+        if sig in _CENTRAL_SIGNATURES:
+            return
+        if sig != _LOCAL_SIGNATURE:
+            raise _StreamAbort("невідомий запис у архіві")
+        fields = _LOCAL_HEADER.unpack(sig + src.read_exact(_LOCAL_HEADER.size - 4))
+        flags, method, crc, csize, usize = fields[3], fields[4], fields[7], fields[8], fields[9]
+        raw_name = src.read_exact(fields[10])
+        extra = src.read_exact(fields[11])
+        name = raw_name.decode("utf-8" if flags & _FLAG_UTF8 else "cp437")
+        # Та сама нормалізація імені, що й у центральному каталозі (zipfile)
+        name = zipfile.ZipInfo(name).filename
+        usize, csize, zip64 = _zip64_sizes(extra, usize, csize)
+
+        if flags & _FLAG_ENCRYPTED:
+            raise _StreamAbort(f"шифрований член {name}")
+        descriptor = bool(flags & _FLAG_DATA_DESCRIPTOR)
+        if method not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+            if descriptor:
+                raise _StreamAbort(f"{name}: метод стиснення {method}")
+            src.skip(csize)
+            continue
+        if descriptor and method != zipfile.ZIP_DEFLATED:
+            raise _StreamAbort(f"{name}: розмір невідомий до кінця даних")
+
+        targets = lookup.targets(name)
+        if not targets and not descriptor:
+            src.skip(csize)
+            continue
+        writer = MemberWriter(targets) if targets else None
+        try:
+            _copy_member(src, method, None if descriptor else csize, writer)
+            if descriptor:
+                crc, _, usize = _read_descriptor(src, zip64)
+        except BaseException:
+            if writer is not None:
+                writer.discard()
+            raise
+        if writer is None:
+            continue
+        if (writer.crc, writer.size) != (crc, usize):
+            writer.discard()
+            continue  # з готового архіву
+        writer.commit(zip_mtime(_dos_date_time(fields[6], fields[5])))
+        streamed[name] = (crc, usize)
+        log(f"✔ {name.rsplit('/', 1)[-1]} (під час завантаження)")
+
+
+class PipelinedInstall:
+    """
+    Встановлення `zip_path` за картою під час завантаження:
+
+        pipeline = PipelinedInstall(zip_path, mapping, hero_root, log)
+        pipeline.start()
+        fetch_source(..., on_data=pipeline.on_data)   # abort() — якщо помилка
+        streamed, from_archive = pipeline.finish()
+    """
+
+    def __init__(self, zip_path, mapping, hero_root, log=None):
+        self.zip_path = zip_path
+        self.hero_root = hero_root
+        self.lookup = InstallLookup(mapping, hero_root)
+        self.log = log or (lambda message: None)
+        self.growing = GrowingFile(part_paths(zip_path)[0])
+        self.streamed = {}
+        self.error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def on_data(self, contiguous, complete):
+        self.growing.advance(contiguous, complete)
+
+    def _run(self):
+        try:
+            _parse_stream(_Source(self.growing), self.lookup, self.streamed, self.log)
+        except _StreamClosed:
+            pass
+        except Exception as ex:
+            # Будь-яка помилка читача (битий заголовок, ім'я не в UTF-8, …) лише
+            # зупиняє потокову частину — finish() доставить решту з архіву
+            self.error = str(ex) or type(ex).__name__
+        finally:
+            self.growing.release()
+
+    def abort(self):
+        """Завантаження не вдалося — зупинити читача."""
+        self.growing.close()
+        self._thread.join()
+
+    def finish(self, workers=None):
+        """
+        Після завантаження: звірка встановленого з центральним каталогом
+        і доставка решти з готового архіву (core.install.install_members);
+        CRC усіх встановлених файлів ідуть у кеш Fingerprints.
+        Повертає (потоково, з архіву).
+        """
+        self.growing.close()
+        self._thread.join()
+        if self.error:
+            self.log(f"ℹ Потокове встановлення зупинено ({self.error}) — решта з архіву")
+
+        with zipfile.ZipFile(self.zip_path, "r") as archive:
+            plan = plan_install(archive.infolist(), self.lookup)
+        fingerprints = Fingerprints(self.hero_root)
+        rest = []
+        for info, paths in plan:
+            if self.streamed.get(info.filename) != (info.CRC, info.file_size):
+                rest.append((info, paths))
+                continue
+            for path in paths:
+                fingerprints.record(path, info.CRC)
+        if rest:
+            install_members(self.zip_path, rest, workers, log=self.log, fingerprints=fingerprints)
+        fingerprints.save()
+        return len(plan) - len(rest), len(rest)
@@ -0,0 +1,215 @@
+# core/xdb_patch.py
+"""
+Зміна числових полів (WeeklyGrowth, Health, …) у вмісті creature .xdb.
+
+Два рушії:
+- "fast"  — байтовий сканер: переписує лише цифри всередині
+  <Поле>…</Поле>, решта файлу лишається байт-у-байт;
+- "etree" — повний розбір ElementTree і серіалізація заново.
+"fast" сам перемикається на "etree", якщо файл йому не під силу.
+
+Функції модуля не залежать від Qt, тож їх можна виконувати
+в дочірніх процесах (див. map_parallel).
+"""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree import ElementTree as ET
+
+ENGINE_FAST = "fast"
+ENGINE_ETREE = "etree"
+
+GROWTH_FIELD = "WeeklyGrowth"
+
+# Заміри для pool_pays_off (spawn, creature .xdb у кілька КБ): час одного файлу
+# кожним рушієм, передача завдання й результату в дочірній процес і назад,
+# запуск пулу. "fast" дешевший за саму передачу — для нього пул не окупається.
+JOB_SECONDS = {ENGINE_FAST: 25e-6, ENGINE_ETREE: 400e-6}
+POOL_IPC_SECONDS = 20e-6
+POOL_STARTUP_SECONDS = 0.6
+
+_WS = rb"[ \t\r\n]*"
+# Конструкції, з якими простий сканер може розійтися з XML-парсером
+_UNSAFE_MARKERS = (b"<!--", b"<![CDATA[", b"xmlns=", b"<!DOCTYPE")
+_FIELD_RES = {}
+
+
+class Multiply:
+    """Операція над полем: old × factor з округленням."""
+
+    def __init__(self, factor):
+        self.factor = factor
+
+    def apply(self, old_val):
+        return int(round(old_val * self.factor))
+
+
+def default_workers():
+    """Кількість процесів за замовчуванням — усі ядра (чи вмикати пул — pool_pays_off)."""
+    return os.cpu_count() or 1
+
+
+def pool_pays_off(jobs, workers, engine=ENGINE_ETREE):
+    """
+    Чи швидше виконати `jobs` .xdb рушієм `engine` у пулі з `workers`
+    процесів, ніж в одному: виграш від розподілу мусить перекрити
+    передачу кожного завдання й запуск пулу. Для "etree" на 4 ядрах
+    це приблизно від 2000 .xdb, для "fast" — ніколи.
+    """
+    # Процесів понад кількість ядер паралельно однаково не виконаються
+    workers = min(workers, jobs, default_workers())
+    if workers <= 1:
+        return False
+    per_job = JOB_SECONDS.get(engine, JOB_SECONDS[ENGINE_ETREE])
+    saved = jobs * (per_job * (1 - 1 / workers) - POOL_IPC_SECONDS)
+    return saved > POOL_STARTUP_SECONDS
+
+
+def _field_res(field):
+    res = _FIELD_RES.get(field)
+    if res is None:
+        tag = re.escape(field.encode("ascii"))
+        res = (
+            re.compile(rb"<" + tag + rb">" + _WS + rb"([0-9]+)" + _WS + rb"</" + tag + rb">"),
+            re.compile(rb"<" + tag + rb"\b"),
+        )
+        _FIELD_RES[field] = res
+    return res
+
+
+def scan_field(data, field):
+    """
+    Знаходить числа поля `field` у сирих байтах без розбору XML.
+
+    Повертає список (start, end, value) для цифр кожного вузла
+    або None, якщо файл треба віддати ElementTree
+    (UTF-16, коментарі/CDATA, простори імен, нечислові чи порожні вузли).
+    """
+    if data[:2] in (b"\xff\xfe", b"\xfe\xff"):
+        return None
+    if any(marker in data for marker in _UNSAFE_MARKERS):
+        return None
+
+    value_re, tag_re = _field_res(field)
+    spans = [(m.start(1), m.end(1), int(m.group(1))) for m in value_re.finditer(data)]
+    if len(spans) != len(tag_re.findall(data)):
+        return None
+    return spans
+
+
+def scan_growth(data):
+    """scan_field для WeeklyGrowth."""
+    return scan_field(data, GROWTH_FIELD)
+
+
+def patch_fields_fast(data, ops):
+    """
+    Байтовий варіант patch_fields: змінює лише цифри потрібних полів,
+    решта файлу не чіпається. Якщо сканер не впорався — patch_fields_tree.
+    """
+    spans = []
+    for field, op in ops.items():
+        field_spans = scan_field(data, field)
+        if field_spans is None:
+            return patch_fields_tree(data, ops)
+        spans.extend((start, end, old_val, field, op) for start, end, old_val in field_spans)
+    spans.sort()
+
+    parts = []
+    pos = 0
+    changes = []
+    for start, end, old_val, field, op in spans:
+        new_val = op.apply(old_val)
+        if new_val == old_val:
+            continue
+        parts.append(data[pos:start])
+        parts.append(str(new_val).encode("ascii"))
+        pos = end
+        changes.append((field, old_val, new_val))
+
+    if not parts:
+        return None, []
+    parts.append(data[pos:])
+    return b"".join(parts), changes
+
+
+def patch_fields_tree(data, ops):
+    """
+    Те саме через ElementTree. Непарсибельні файли пропускаються.
+    """
+    try:
+        root = ET.fromstring(data)
+    except ET.ParseError:
+        return None, []
+
+    changes = []
+    for elem in root.iter():
+        op = ops.get(elem.tag)
+        if op is None:
+            continue
+        val_str = (elem.text or "").strip()
+        if val_str.isdigit():
+            old_val = int(val_str)
+            new_val = op.apply(old_val)
+            if new_val != old_val:
+                elem.text = str(new_val)
+                changes.append((elem.tag, old_val, new_val))
+
+    if changes:
+        return ET.tostring(root, encoding="utf-8", xml_declaration=True), changes
+    return None, []
+
+
+def patch_fields(data, ops, engine=ENGINE_FAST):
+    """
+    Застосовує `ops` (поле → об'єкт з .apply(old) -> new) до вмісту .xdb.
+
+    Повертає (нові_байти, [(поле, old, new), ...]) якщо щось змінилося,
+    інакше (None, []).
+    """
+    if engine == ENGINE_FAST:
+        return patch_fields_fast(data, ops)
+    return patch_fields_tree(data, ops)
+
+
+def patch_growth(data, factor, c_name, engine=ENGINE_FAST):
+    """
+    Множить усі WeeklyGrowth у `data` на `factor`.
+
+    Повертає (нові_байти, (c_name, old, new)) якщо щось змінилося,
+    інакше (None, None).
+    """
+    new_data, changes = patch_fields(data, {GROWTH_FIELD: Multiply(factor)}, engine)
+    if new_data is None:
+        return None, None
+    _, old_val, new_val = changes[0]
+    return new_data, (c_name, old_val, new_val)
+
+
+def map_parallel(fn, jobs, workers=1, progress=None, engine=ENGINE_ETREE):
+    """
+    Виконує fn(*job) для кожного кортежу з `jobs` і повертає результати
+    в тому ж порядку. Роботу розкидає по пулу з `workers` процесів, лише
+    якщо для рушія `engine` це окупається (pool_pays_off).
+
+    `progress(done, total)` викликається в поточному потоці
+    після кожного отриманого результату.
+    """
+    total = len(jobs)
+    results = []
+    if not pool_pays_off(total, workers, engine):
+        for i, job in enumerate(jobs, start=1):
+            results.append(fn(*job))
+            if progress:
+                progress(i, total)
+        return results
+
+    workers = min(workers, total)
+    # Невеликі порції — менше накладних витрат на pickle, але прогрес не «стрибає»
+    chunksize = max(1, total // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for i, res in enumerate(pool.map(fn, *zip(*jobs), chunksize=chunksize), start=1):
+            results.append(res)
+            if progress:
+                progress(i, total)
+    return results
@@ -0,0 +1,185 @@
+# main_window.py
+# Головне вікно; імпортується лише з main() — див. main.py
+from PySide6.QtCore import Signal
+from PySide6.QtWidgets import QApplication, QMainWindow, QTabWidget, QMenuBar, QMenu
+
+from core import startup_profile
+# Вкладки створюються при першому показі (tabs/lazy_tab.py)
+from tabs.lazy_tab import LazyTab
+
+
+class MainWindow(QMainWindow):
+    hotkeySignal = Signal()
+    firstPainted = Signal()
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Heroes V Extended")
+        self._painted = False
+        startup_profile.mark("window: QMainWindow")
+
+        # Тулбар вкладок
+        self.tabs = QTabWidget()
+        self.setCentralWidget(self.tabs)
+
+        # 1) Universe Editor
+        self.universe_tab = LazyTab("tabs.universe_editor_tab", "UniverseEditorTab", parent=self)
+        self.tabs.addTab(self.universe_tab, "Universe Editor")
+
+        # 2) Колесо вмінь (QtWebEngine — лише коли вкладку відкрито)
+        self.wheel_tab = LazyTab("tabs.wheel_tab", "WheelTab", parent=self)
+        self.tabs.addTab(self.wheel_tab, "Колесо вмінь")
+
+        # 3) Download
+        self.download_tab = LazyTab("tabs.download_tab", "DownloadTab", parent=self)
+        self.tabs.addTab(self.download_tab, "Download")
+        startup_profile.mark("window: tabs")
+
+        # Меню
+        menubar = QMenuBar()
+        self.setMenuBar(menubar)
+        menuFile = QMenu("Файл", self)
+        menubar.addMenu(menuFile)
+        actExit = menuFile.addAction("Вихід")
+        actExit.triggered.connect(self.close)
+
+        # Додайте меню “Про програму” за потреби
+        menuHelp = QMenu("Довідка", self)
+        menubar.addMenu(menuHelp)
+        aboutAct = menuHelp.addAction("Про програму")
+        aboutAct.triggered.connect(self.onAbout)
+        startup_profile.mark("window: menu")
+
+        self.tabs.currentChanged.connect(self.onTabChanged)
+        self.applyNeonStyle()
+        self.resize(1000, 700)
+        startup_profile.mark("window: stylesheet")
+
+        self.hotkeySignal.connect(self._show_wheel)
+
+        try:
+            import keyboard
+            keyboard.add_hotkey('ctrl+alt', self.hotkeySignal.emit)
+        except Exception as ex:
+            # Без модуля чи доступу до клавіатури (headless, offscreen-бенчмарк) — без гарячої клавіші
+            print(f"⚠ Гаряча клавіша Ctrl+Alt недоступна: {ex!r}")
+        startup_profile.mark("window: hotkey")
+
+    def lazyTabs(self):
+        return [self.universe_tab, self.wheel_tab, self.download_tab]
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._painted:
+            self._painted = True
+            startup_profile.mark("first paint")
+            self.firstPainted.emit()
+
+    def _show_wheel(self):
+        from ctypes import windll
+
+        hwnd = int(self.winId())
+        # Якщо зараз мінімізовано → відновлюємо і показуємо колесо
+        if self.isMinimized() or not self.isVisible():      
+            self.tabs.blockSignals(True)            
+            self.tabs.setCurrentIndex(1 )
+            self.tabs.blockSignals(False)
+
+            windll.user32.ShowWindow(hwnd, 9)  # SW_RESTORE
+            windll.user32.SetForegroundWindow(hwnd)
+            self.showMaximized()
+        else:
+            # Інакше — мінімізуємо
+            windll.user32.ShowWindow(hwnd, 6)  # SW_MINIMIZE
+
+    def onTabChanged(self, index):
+        # Якщо вкладка «Колесо вмінь» (індекс 1), розгортаємо на весь екран
+        if index == 1:
+            self.showMaximized()
+        else:
+            self.showNormal()
+            self.resize(1000, 700)
+
+    def onAbout(self):
+        """Просте вікно з інформацією."""
+        from PySide6.QtWidgets import QMessageBox
+        QMessageBox.information(self, "Про програму",
+                                "Heroes V Extended\n\n"
+                                " - Universe Editor\n"
+                                " - Колесо вмінь\n"
+                                " - Завантаження ZIP та ін.\n\n"
+                                "Автор: ChatGPT Extended")
+
+    def applyNeonStyle(self):
+        self.setStyleSheet("""
+            QMainWindow, QWidget {
+                background-color: #242424;
+                color: #A8FFC4;
+                font-family: Segoe UI, Consolas;
+                font-size: 10pt;
+            }
+            QLineEdit, QComboBox, QTextEdit, QListView {
+                background-color: #2E2E2E;
+                border: 1px solid #444;
+                color: #C4FFE4;
+            }
+            QPushButton {
+                background-color: #3A3A3A;
+                border: 1px solid #5EECCB;
+                padding: 5px;
+            }
+            QPushButton:hover {
+                background-color: #4A4A4A;
+            }
+            QCheckBox {
+                spacing: 6px;
+            }
+            QProgressBar {
+                text-align: center;
+                background-color: #2A2A2A;
+                border: 1px solid #444;
+            }
+            QProgressBar::chunk {
+                background-color: #00FFC8;
+            }
+            QMenuBar {
+                background-color: #2A2A2A;
+            }
+            QMenuBar::item {
+                background-color: #2A2A2A;
+                color: #A8FFC4;
+            }
+            QMenuBar::item:selected {
+                background-color: #3A3A3A;
+            }
+            QMenu {
+                background-color: #2A2A2A;
+                color: #A8FFC4;
+            }
+            QMenu::item:selected {
+                background-color: #3A3A3A;
+            }
+
+            QTabBar::tab {
+                background-color: #2E2E2E;
+                color: #C4FFE4;
+                border: 1px solid #5EECCB;
+                padding: 5px 10px;
+                margin: 2px;
+            }
+            QTabBar::tab:selected {
+                background-color: #3A3A3A;
+                border-color: #00FFC8;
+            }
+        """)
+
+
+def finishStartupProfile(mw, profile):
+    """Звіт профілювання запуску (див. core/startup_profile.py)."""
+    if profile.build_tabs:
+        for tab in mw.lazyTabs():
+            tab.build()
+    print(startup_profile.finish())
+    print(f"Звіт: {profile.report_path}")
+    if profile.exit_after:
+        QApplication.quit()
@@ -0,0 +1,163 @@
+# patch_cli.py
+"""
+Консольний запуск Universe Editor без GUI і без імпорту Qt.
+
+Приклади:
+    python patch_cli.py --pak "C:/Games/HeroesV/data/Universe_mod.pak" --factor 150%
+    python patch_cli.py --pak Universe_mod.pak --factor 1.25 --filter dragon --dry-run
+    python patch_cli.py --pak Universe_mod.pak --rules creature_rules.example.json --output overlay
+    python patch_cli.py --batch installs.json --parallel 3
+
+--batch — JSON-файл завдань (формат — у core/batch.py): кожен .pak зі своїм
+множником, фільтром і правилами. Для кожного .pak, що завершився, виводиться
+{"event": "pak_done", "index": 1, "pak": "...", "exit_code": 0, "changed": 12, ...},
+а код виходу пакета — код першого .pak, що завершився з помилкою.
+
+Кожен рядок stdout — JSON-подія:
+    {"event": "progress", "percent": 42}
+    {"event": "log", "message": "..."}
+    {"event": "done", "exit_code": 0, "changed": 12, "dry_run": false, "message": "..."}
+Коди виходу — EXIT_* у core/patch_engine.py.
+"""
+import argparse
+import json
+import sys
+import threading
+
+from core.batch import format_summary, load_jobs, run_batch
+from core.growth_index import default_index_path
+from core.patch_engine import (
+    EXIT_ERROR, EXIT_OK, EXIT_RULES, EXIT_USAGE, OUTPUT_INPLACE, OUTPUT_OVERLAY,
+    PatchEngine, PatchError, parse_factor
+)
+from core.stat_rules import growth_rules, load_rules
+from core.xdb_patch import ENGINE_ETREE, ENGINE_FAST, default_workers
+
+
+# Пакетний режим пише події з кількох потоків
+_emit_lock = threading.Lock()
+
+
+def emit(event, **fields):
+    fields = {"event": event, **fields}
+    with _emit_lock:
+        sys.stdout.write(json.dumps(fields, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+
+
+def build_parser():
+    ap = argparse.ArgumentParser(description="Зміна характеристик істот у Universe_mod.pak без GUI.")
+    ap.add_argument("--pak", help="шлях до Universe_mod.pak")
+    ap.add_argument("--batch", help="JSON-файл завдань для кількох .pak замість --pak")
+    ap.add_argument("--parallel", type=int, default=2,
+                    help="скільки .pak пакета обробляти одночасно (за замовчуванням 2)")
+    ap.add_argument("--factor", default="100%",
+                    help="множник WeeklyGrowth: 150%% або 1.5 (за замовчуванням 100%%)")
+    ap.add_argument("--filter", default="", help="підрядок у назві .xdb істоти")
+    ap.add_argument("--rules", help="JSON-файл правил (див. core/stat_rules.py)")
+    ap.add_argument("--dry-run", action="store_true", help="лише показати, що зміниться")
+    ap.add_argument("--no-backup", action="store_true", help="не робити знімок резервної копії")
+    ap.add_argument("--output", choices=[OUTPUT_INPLACE, OUTPUT_OVERLAY], default=OUTPUT_INPLACE)
+    ap.add_argument("--engine", choices=[ENGINE_FAST, ENGINE_ETREE], default=ENGINE_FAST)
+    ap.add_argument("--extract", action="store_true",
+                    help="старий режим: повне розпакування замість потокового перезапису")
+    ap.add_argument("--workers", type=int, default=default_workers(),
+                    help="найбільша кількість процесів для .xdb (за замовчуванням — "
+                         "усі ядра; пул вмикається, лише якщо окупається — рушій etree, "
+                         "тисячі .xdb)")
+    ap.add_argument("--index", default=default_index_path(),
+                    help="файл індексу WeeklyGrowth (за замовчуванням — у теці кешу "
+                         "користувача, спільний з GUI)")
+    return ap
+
+
+def progress_emitter():
+    """on_progress, що пише подію лише коли відсоток змінився."""
+    last_percent = [-1]
+
+    def on_progress(percent):
+        if percent != last_percent[0]:
+            last_percent[0] = percent
+            emit("progress", percent=percent)
+    return on_progress
+
+
+def main_batch(args):
+    try:
+        jobs = load_jobs(args.batch)
+    except (OSError, ValueError) as e:
+        emit("done", exit_code=EXIT_RULES, message=f"Помилка у файлі завдань: {e}")
+        return EXIT_RULES
+
+    parallel = max(1, min(args.parallel, len(jobs)))
+    jobs_index = {id(job): n for n, job in enumerate(jobs, start=1)}
+
+    def on_result(result):
+        emit("pak_done", index=jobs_index[id(result.job)], pak=result.job.pak_path,
+             exit_code=result.exit_code, changed=result.changed_count,
+             seconds=round(result.seconds, 3), message=result.message)
+
+    results = run_batch(
+        jobs, parallel, not args.no_backup, args.dry_run,
+        # Процеси для .xdb ділимо між .pak, що йдуть одночасно
+        streaming=not args.extract, workers=max(1, args.workers // parallel),
+        engine=args.engine, progress=progress_emitter(),
+        log=lambda message: emit("log", message=message), on_result=on_result,
+        index_path=args.index,
+    )
+    for line in format_summary(results):
+        emit("log", message=line)
+
+    failed = [r.exit_code for r in results if r.exit_code != EXIT_OK]
+    exit_code = failed[0] if failed else EXIT_OK
+    emit("done", exit_code=exit_code, changed=sum(r.changed_count for r in results),
+         dry_run=args.dry_run, message=format_summary(results)[0])
+    return exit_code
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if bool(args.pak) == bool(args.batch):
+        emit("done", exit_code=EXIT_USAGE, message="Потрібно вказати або --pak, або --batch")
+        return EXIT_USAGE
+    if args.batch:
+        return main_batch(args)
+
+    try:
+        factor = parse_factor(args.factor)
+    except ValueError as e:
+        emit("done", exit_code=EXIT_USAGE, message=f"Невірний --factor: {e}")
+        return EXIT_USAGE
+
+    rules = growth_rules(factor)
+    if args.rules:
+        try:
+            rules += load_rules(args.rules)
+        except (OSError, ValueError) as e:
+            emit("done", exit_code=EXIT_RULES, message=f"Помилка у файлі правил: {e}")
+            return EXIT_RULES
+
+    engine = PatchEngine(
+        args.pak, factor, not args.no_backup, args.filter, args.dry_run,
+        streaming=not args.extract, workers=args.workers, engine=args.engine,
+        output=args.output, rules=rules,
+        progress=progress_emitter(), log=lambda message: emit("log", message=message),
+        index_path=args.index,
+    )
+    try:
+        result = engine.run()
+    except PatchError as e:
+        emit("done", exit_code=e.exit_code, message=str(e))
+        return e.exit_code
+    except Exception as e:
+        emit("done", exit_code=EXIT_ERROR, message=f"Помилка: {e}")
+        return EXIT_ERROR
+
+    emit("done", exit_code=EXIT_OK, changed=result.changed_count,
+         dry_run=result.dry_run, message=result.message)
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
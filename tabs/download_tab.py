@@ -2,13 +2,10 @@
 # -*- coding: utf-8 -*-
 
 import os
-import re
+import threading
 
-import gdown
 import requests
 import zipfile
-import shutil
-import tempfile
 from time import time
 
 from PySide6.QtCore import (QThread, Signal, QSettings, QTimer,
@@ -16,13 +13,27 @@ from PySide6.QtCore import (QThread, Signal, QSettings, QTimer,
 from PySide6.QtGui import QDesktopServices, QRegion
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
-    QFileDialog, QProgressBar, QTextEdit, QComboBox, QMessageBox, QDialog,
-    QPlainTextEdit, QGridLayout, QDialogButtonBox
+    QFileDialog, QProgressBar, QComboBox, QMessageBox,
+    QGridLayout, QSpinBox, QTableWidget,
+    QTableWidgetItem, QHeaderView, QCheckBox
 )
 
 import dotenv
 dotenv.load_dotenv()
 
+from core.download_queue import STATUS_DONE, STATUS_FAILED, STATUS_QUEUED, QueueItem, run_queue, totals
+from core.checksums import expected_checks, trusted_sha256
+from core.download_cache import CACHE_DIR_NAME, DownloadCache
+from core.downloads import (DEFAULT_SEGMENTS, BandwidthLimiter, DownloadError, RateMeter,
+                            TransferStats)
+from core.install import (POLICY_NEWER, POLICY_OVERWRITE, POLICY_SKIP, Fingerprints,
+                          InstallLookup, apply_policy, diff_plan, find_conflicts,
+                          install_members, plan_install)
+from core.sources import fetch_source
+from core.staged_install import StagedInstall
+from core.stream_install import PipelinedInstall
+from tabs.log_view import LogView, show_log_dialog
+
 # ------------------------------------------------------
 # 1) Мапа встановлення
 # ------------------------------------------------------
@@ -42,6 +53,8 @@ INSTALL_MAP = {
 
 # ------------------------------------------------------
 # 2) Джерела завантаження
+#    Необов'язкові "size" (байти) і "sha256" (hex) — перевірка файлу
+#    під час завантаження і перед встановленням (core.checksums)
 # ------------------------------------------------------
 DOWNLOAD_SOURCES = {
     "Universe_mod": {
@@ -68,145 +81,339 @@ DOWNLOAD_SOURCES = {
 }
 
 # ------------------------------------------------------
-# 3) Функція для GitHub (приватне/публічне репо)
+# 3) Допоміжне форматування швидкості/ETA
 # ------------------------------------------------------
-def github_download(repo: str, filepath: str, dest: str):
-    """Завантаження одного файлу з приватного (або публічного) репо GitHub через API."""
-    token = os.getenv("GITHUB_TOKEN")
-    if not token:
-        raise RuntimeError("Set GITHUB_TOKEN environment variable")
-
-    url_api = f"https://api.github.com/repos/{repo}/contents/{filepath}"
-    headers = {"Authorization": f"token {token}"}
-    r = requests.get(url_api, headers=headers)
-    if r.status_code != 200:
-        raise RuntimeError(f"GitHub API {r.status_code}: {r.text}")
-
-    download_url = r.json().get("download_url")
-    if not download_url:
-        raise RuntimeError("No download_url in API response")
-
-    resp = requests.get(download_url, headers=headers, stream=True)
-    resp.raise_for_status()
-    with open(dest, "wb") as f:
-        for chunk in resp.iter_content(32768):
-            if chunk:
-                f.write(chunk)
+def format_transfer(done, total, speed, eta=None):
+    """«12.3 / 45.6 MB · 1.20 MB/s · ETA 0:27» для рядків прогресу."""
+    text = f"{done / 1024 / 1024:.1f}"
+    if total:
+        text += f" / {total / 1024 / 1024:.1f}"
+    text += f" MB · {speed / 1024 / 1024:.2f} MB/s"
+    if eta is not None:
+        text += f" · ETA {int(eta) // 60}:{int(eta) % 60:02d}"
+    return text
 
 # ------------------------------------------------------
 # 4) Воркери завантаження (Git / GDrive / Прямий)
 # ------------------------------------------------------
-class DownloadWorker(QThread):
-    """Універсальний потік для прямого URL (але не GDrive великих файлів)."""
+class TransferWorker(QThread):
+    """
+    Спільна основа воркерів завантаження: progressChanged — відсоток (лише
+    при зміні), statsChanged — (байтів, усього, байт/с, ETA | None) не
+    частіше STATS_INTERVAL, навіть коли розмір невідомий (core.downloads.TransferStats).
+    limiter — спільний BandwidthLimiter вкладки.
+    """
+    STATS_INTERVAL = 0.25
+
     progressChanged = Signal(int)
     statusMessage   = Signal(str)
     finishedSignal  = Signal(str)
+    statsChanged    = Signal(object, object, float, object)
 
-    def __init__(self, url: str, out_path: str):
+    def __init__(self, limiter=None):
         super().__init__()
+        self.limiter = limiter
+        self._stats = TransferStats(self.STATS_INTERVAL)
+
+    def onProgress(self, done, total):
+        percent, stats = self._stats.update(done, total)
+        if percent is not None:
+            self.progressChanged.emit(percent)
+        if stats is not None:
+            self.statsChanged.emit(*stats)
+
+
+class DownloadWorker(TransferWorker):
+    """
+    Універсальний потік для прямого URL (але не GDrive великих файлів).
+    Якщо сервер підтримує Range — качає `segments` діапазонів паралельно.
+    """
+
+    def __init__(self, url: str, out_path: str, segments: int = DEFAULT_SEGMENTS, cache=None,
+                 checks=None, limiter=None):
+        super().__init__(limiter)
         self.url = url
         self.out_path = out_path
+        self.segments = segments
+        self.cache = cache
+        self.checks = checks or {}
 
     def run(self):
         t0 = time()
         self.statusMessage.emit(f"⚡ Завантаження: {self.url}")
-        r = requests.get(self.url, stream=True)
-        if r.status_code != 200:
-            self.finishedSignal.emit(f"❌ HTTP {r.status_code}")
+        try:
+            done = fetch_source({"url": self.url, **self.checks}, self.out_path,
+                                segments=self.segments,
+                                progress=self.onProgress, log=self.statusMessage.emit,
+                                cache=self.cache, limiter=self.limiter)
+        except DownloadError as ex:
+            self.finishedSignal.emit(f"❌ {ex}")
+            return
+        except requests.RequestException as ex:
+            self.finishedSignal.emit(f"❌ Помилка мережі: {ex}")
+            return
+        except Exception as ex:
+            # Диск, права, файл стану .part.json — вкладка не має лишитися заблокованою
+            self.finishedSignal.emit(f"❌ Помилка завантаження: {ex}")
             return
-
-        total = int(r.headers.get("Content-Length", 0))
-        done = 0
-        with open(self.out_path, "wb") as f:
-            for chunk in r.iter_content(32768):
-                if not chunk:
-                    continue
-                f.write(chunk)
-                done += len(chunk)
-                if total:
-                    prog = int(done*100/total)
-                    self.progressChanged.emit(prog)
 
         dt = time() - t0
         mb = done/1024/1024
         self.finishedSignal.emit(f"✅ Завантажено {mb:.2f}MB за {dt:.1f}с")
 
 
-class GitDownloadWorker(QThread):
+class GitDownloadWorker(TransferWorker):
     """Воркeр для скачування файлу з GitHub (приватного/публічного репо)."""
-    progressChanged = Signal(int)
-    statusMessage   = Signal(str)
-    finishedSignal  = Signal(str)
 
-    def __init__(self, repo: str, filepath: str, out_path: str):
-        super().__init__()
+    def __init__(self, repo: str, filepath: str, out_path: str, cache=None, checks=None,
+                 limiter=None):
+        super().__init__(limiter)
         self.repo = repo
         self.filepath = filepath
         self.out_path = out_path
+        self.cache = cache
+        self.checks = checks or {}
 
     def run(self):
         try:
             self.statusMessage.emit(f"⚡ GitHub: {self.repo}/{self.filepath}")
-            github_download(self.repo, self.filepath, self.out_path)
+            info = {"type": "git", "repo": self.repo, "file": self.filepath, **self.checks}
+            fetch_source(info, self.out_path, progress=self.onProgress,
+                         log=self.statusMessage.emit, cache=self.cache, limiter=self.limiter)
             self.finishedSignal.emit("✅ GitHub файл отримано")
         except Exception as ex:
             self.finishedSignal.emit(f"❌ GitHub download failed: {ex}")
 
 
-import subprocess
-import re
+class GDriveDownloadWorker(TransferWorker):
+    """
+    Воркeр для скачування Google Drive у процесі (core.gdrive), без gdown.
+    У лог пишуться лише етапи, а не кожен шматок.
+    """
 
-class GDriveDownloadWorker(QThread):
-    """Воркeр для скачування Google Drive через gdown з відображенням прогресу."""
-    progressChanged = Signal(int)
+    def __init__(self, file_id: str, out_path: str, segments: int = DEFAULT_SEGMENTS,
+                 cache=None, checks=None, limiter=None):
+        super().__init__(limiter)
+        self.file_id = file_id
+        self.out_path = out_path
+        self.segments = segments
+        self.cache = cache
+        self.checks = checks or {}
+
+    def run(self):
+        t0 = time()
+        self.statusMessage.emit(f"⚡ Google Drive: {self.file_id}")
+        try:
+            info = {"type": "gdrive", "id": self.file_id, **self.checks}
+            done = fetch_source(info, self.out_path, segments=self.segments,
+                                progress=self.onProgress, log=self.statusMessage.emit,
+                                cache=self.cache, limiter=self.limiter)
+        except DownloadError as ex:
+            self.finishedSignal.emit(f"❌ {ex}")
+            return
+        except requests.RequestException as ex:
+            self.finishedSignal.emit(f"❌ Помилка мережі: {ex}")
+            return
+        except Exception as ex:
+            # Запис файлу, розбір сторінки підтвердження Drive тощо
+            self.finishedSignal.emit(f"❌ Помилка завантаження з Google Drive: {ex}")
+            return
+
+        dt = time() - t0
+        mb = done/1024/1024
+        self.progressChanged.emit(100)
+        self.finishedSignal.emit(f"✅ Завантажено {self.out_path}: {mb:.2f}MB за {dt:.1f}с")
+
+
+class DownloadQueueWorker(QThread):
+    """
+    Воркер черги: кілька записів DOWNLOAD_SOURCES паралельно (core.download_queue).
+    itemProgress/itemStatus — для рядка запису (номер рядка = індекс у items),
+    statsChanged — загальна швидкість і ETA.
+    """
+    STATS_INTERVAL = 0.25
+
+    itemProgress   = Signal(int, int)
+    itemStatus     = Signal(int, str)
+    statsChanged   = Signal(str)
     statusMessage  = Signal(str)
     finishedSignal = Signal(str)
 
-    def __init__(self, file_id: str, out_path: str):
+    def __init__(self, items, parallel: int, segments: int = DEFAULT_SEGMENTS, cache=None,
+                 limiter=None):
         super().__init__()
-        self.file_id = file_id
-        self.out_path = out_path
+        self.items = items
+        self.parallel = parallel
+        self.segments = segments
+        self.cache = cache
+        self.limiter = limiter
+        self._rows = {id(item): row for row, item in enumerate(items)}
+        self._last_prog = {}
+        self._meter = RateMeter(self.STATS_INTERVAL)
+        self._last_stats = 0.0
+        self._lock = threading.Lock()
+
+    def onProgress(self, item):
+        row = self._rows[id(item)]
+        if item.total:
+            prog = int(item.done*100/item.total)
+            if prog != self._last_prog.get(row):
+                self._last_prog[row] = prog
+                self.itemProgress.emit(row, prog)
+
+        with self._lock:
+            now = time()
+            if now - self._last_stats < self.STATS_INTERVAL:
+                return
+            self._last_stats = now
+            done, total, known = totals(self.items)
+            speed = self._meter.update(done)
+            eta = self._meter.eta(done, total) if known else None
+        self.statsChanged.emit(format_transfer(done, total, speed, eta))
+
+    def onStatus(self, item):
+        text = item.status if not item.error else f"{item.status}: {item.error}"
+        self.itemStatus.emit(self._rows[id(item)], text)
+
+    def run(self):
+        t0 = time()
+        run_queue(self.items, self.parallel, self.segments, progress=self.onProgress,
+                  log=lambda item, message: self.statusMessage.emit(f"[{item.name}] {message}"),
+                  on_status=self.onStatus, cache=self.cache, limiter=self.limiter)
+        ok = sum(1 for item in self.items if item.status == STATUS_DONE)
+        mb = sum(item.done for item in self.items if item.status == STATUS_DONE)/1024/1024
+        mark = "✅" if ok == len(self.items) else "❌"
+        self.finishedSignal.emit(f"{mark} Черга: {ok}/{len(self.items)} завантажено, "
+                                 f"{mb:.2f}MB за {time() - t0:.1f}с")
+
+
+class PipelineInstallWorker(TransferWorker):
+    """
+    Завантаження з одночасним встановленням (core.stream_install): члени
+    за INSTALL_MAP розпаковуються в папку гри, поки архів ще качається,
+    а в кінці звіряються з центральним каталогом.
+    """
+
+    def __init__(self, info: dict, zip_path: str, mapping: dict, hero_root: str,
+                 segments: int = DEFAULT_SEGMENTS, cache=None, limiter=None):
+        super().__init__(limiter)
+        self.info = info
+        self.zip_path = zip_path
+        self.mapping = mapping
+        self.hero_root = hero_root
+        self.segments = segments
+        self.cache = cache
 
     def run(self):
-        url = f"https://drive.google.com/uc?id={self.file_id}"
-        self.statusMessage.emit("⚡ Запуск gdown…")
-        # Формуємо команду
-        cmd = ["gdown", url, "-O", self.out_path]
+        t0 = time()
         try:
-            proc = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1
-            )
-        except FileNotFoundError:
-            return self.finishedSignal.emit("❌ Не знайдено gdown. Встановіть його через pip install gdown")
-
-        pattern = re.compile(r"\s*(\d+)%\s+([\d\.]+[KMG]?B/s)")
-
-        # Читаємо stdout рядок за рядком
-        for line in proc.stdout:
-            line = line.strip()
-            # Емімо будь‑які статусні повідомлення
-            self.statusMessage.emit(line)
-            # Шукаємо прогрес
-            m = pattern.search(line)
-            if m:
-                pct = int(m.group(1))
-                speed = m.group(2)
-                self.progressChanged.emit(pct)
-                # Додатково показуємо швидкість
-                self.statusMessage.emit(f"🚀 {speed}")
-        proc.wait()
-
-        if proc.returncode == 0:
-            self.progressChanged.emit(100)
-            self.finishedSignal.emit(f"✅ Завантажено {self.out_path}")
-        else:
-            self.finishedSignal.emit(f"❌ gdown завершився з кодом {proc.returncode}")
+            # Пишемо в папку гри повз журнал — відкат атомарного встановлення вже не чинний
+            StagedInstall(self.hero_root, self.statusMessage.emit).discard()
+        except OSError as ex:
+            self.finishedSignal.emit(f"❌ Помилка встановлення: {ex}")
+            return
+        pipeline = PipelinedInstall(self.zip_path, self.mapping, self.hero_root,
+                                    self.statusMessage.emit)
+        pipeline.start()
+        try:
+            fetch_source(self.info, self.zip_path, segments=self.segments,
+                         progress=self.onProgress, log=self.statusMessage.emit,
+                         cache=self.cache, on_data=pipeline.on_data, limiter=self.limiter)
+        except Exception as ex:
+            # Будь-яка помилка (мережа, диск, кеш) — інакше читач чекає на дані вічно
+            pipeline.abort()
+            if isinstance(ex, requests.RequestException):
+                self.finishedSignal.emit(f"❌ Помилка мережі: {ex}")
+            else:
+                self.finishedSignal.emit(f"❌ {ex}")
+            return
+        dt_download = time() - t0
+
+        try:
+            streamed, from_archive = pipeline.finish()
+        except Exception as ex:
+            self.finishedSignal.emit(f"❌ Помилка встановлення: {ex}")
+            return
+        self.finishedSignal.emit(
+            f"✅ Завантажено за {dt_download:.1f}с, встановлено за {time() - t0:.1f}с: "
+            f"{streamed} файлів під час завантаження, {from_archive} з архіву")
 
 
+class InstallWorker(QThread):
+    """
+    Встановлення готового ZIP у фоні (core.install): конфлікти вже
+    вирішено однією політикою, тож жодних запитань під час копіювання.
+    З `differential` члени, що вже лежать у папці гри з тим самим CRC
+    і розміром, не розпаковуються (кеш CRC — core.install.Fingerprints).
+    Зі `staged` усе спершу розпаковується в staging і переноситься на
+    місця одним commit із журналом (core.staged_install.StagedInstall).
+    """
+    progressChanged = Signal(int)
+    statusMessage   = Signal(str)
+    finishedSignal  = Signal(str)
+
+    def __init__(self, zip_path: str, hero_root: str, plan, conflicts, policy: str,
+                 fingerprints, differential: bool = True, expected_sha256=None,
+                 staged: bool = True):
+        super().__init__()
+        self.zip_path = zip_path
+        self.hero_root = hero_root
+        self.plan = plan
+        self.conflicts = conflicts
+        self.policy = policy
+        self.fingerprints = fingerprints
+        self.differential = differential
+        self.expected_sha256 = expected_sha256
+        self.staged = staged
+        self._last_prog = -1
+
+    def onProgress(self, done, total):
+        prog = int(done*100/total) if total else 100
+        if prog != self._last_prog:
+            self._last_prog = prog
+            self.progressChanged.emit(prog)
+
+    def run(self):
+        t0 = time()
+        if self.expected_sha256:
+            # Із маніфесту — без читання, якщо файл не змінювався після перевірки
+            try:
+                ok = trusted_sha256(self.zip_path, self.expected_sha256)
+            except OSError as ex:
+                self.finishedSignal.emit(f"❌ Перевірка SHA-256: {ex}")
+                return
+            if not ok:
+                self.finishedSignal.emit("❌ SHA-256 архіву не збігається з очікуваним — "
+                                         "завантажте його заново")
+                return
+            self.statusMessage.emit("✔ SHA-256 архіву перевірено")
+        try:
+            plan = self.plan
+            if self.differential:
+                plan, unchanged = diff_plan(plan, self.fingerprints)
+                if unchanged:
+                    self.statusMessage.emit(f"ℹ Без змін (CRC збігся): {unchanged}")
+            plan, skipped = apply_policy(plan, self.conflicts, self.policy)
+            if skipped:
+                self.statusMessage.emit(f"ℹ Лишаємо наявні файли: {skipped}")
+            if self.staged:
+                staging = StagedInstall(self.hero_root, self.statusMessage.emit)
+                count = staging.install(self.zip_path, plan, progress=self.onProgress,
+                                        log=self.statusMessage.emit,
+                                        fingerprints=self.fingerprints)
+            else:
+                # Пишемо повз журнал — відкат попереднього атомарного встановлення вже не чинний
+                StagedInstall(self.hero_root, self.statusMessage.emit).discard()
+                count = install_members(self.zip_path, plan, progress=self.onProgress,
+                                        log=self.statusMessage.emit,
+                                        fingerprints=self.fingerprints)
+            self.fingerprints.save()
+        except Exception as ex:
+            # zlib.error, NotImplementedError (метод стиснення), RuntimeError (шифрування) тощо
+            self.finishedSignal.emit(f"❌ Помилка встановлення: {ex}")
+            return
+        self.finishedSignal.emit(f"✅ Встановлено {count} файлів за {time() - t0:.1f}с")
+
 
 # ------------------------------------------------------
 # 5) Клас вкладки DownloadTab, інтегрованої в main.py
@@ -222,6 +429,7 @@ class DownloadTab(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.worker = None
+        self.installWorker = None
         # QSettings для збереження/відновлення шляхів
         self.settings = QSettings("download_tab_settings.ini", QSettings.IniFormat)
 
@@ -256,16 +464,66 @@ class DownloadTab(QWidget):
         row_save.addWidget(lbl_save)
         row_save.addWidget(self.edtSave)
         row_save.addWidget(btn_browse_save)
+        row_save.addWidget(QLabel("Кеш, ГБ:"))
+        self.spnCacheGb = QSpinBox()
+        self.spnCacheGb.setRange(0, 500)
+        self.spnCacheGb.setToolTip("Ліміт кешу архівів у теці ZIP (0 — без кешу). "
+                                   "Незмінені джерела не завантажуються повторно.")
+        self.spnCacheGb.valueChanged.connect(self.savePathsToSettings)
+        row_save.addWidget(self.spnCacheGb)
 
         # 3) Кнопка «Завантажити»
         self.btnDownload = QPushButton("🔄 Завантажити")
         self.btnDownload.setToolTip("Почати завантаження обраного ZIP")
         self.btnDownload.clicked.connect(self.onDownload)
-
-        # 4) Прогресбар + текстовий лог
+        self.btnDownloadInstall = QPushButton("⚡ Завантажити й встановити")
+        self.btnDownloadInstall.setToolTip("Встановлювати файли за картою в папку гри "
+                                           "ще під час завантаження архіву")
+        self.btnDownloadInstall.clicked.connect(self.onDownloadInstall)
+        row_download = QHBoxLayout()
+        row_download.addWidget(self.btnDownload)
+        row_download.addWidget(self.btnDownloadInstall)
+        row_download.addWidget(QLabel("Ліміт, МБ/с:"))
+        # Один ліміт на всі завантаження вкладки; змінюється й під час завантаження
+        self.limiter = BandwidthLimiter()
+        self.spnLimit = QSpinBox()
+        self.spnLimit.setRange(0, 1000)
+        self.spnLimit.setToolTip("Обмеження сумарної швидкості завантажень (0 — без обмеження), "
+                                 "щоб не заважати грі чи стріму")
+        self.spnLimit.valueChanged.connect(self.onLimitChanged)
+        row_download.addWidget(self.spnLimit)
+
+        # 3.1) Черга: кілька джерел паралельно
+        row_queue = QHBoxLayout()
+        btn_queue_add = QPushButton("➕ В чергу")
+        btn_queue_add.setToolTip("Додати обране джерело до черги завантажень")
+        btn_queue_add.clicked.connect(self.onQueueAdd)
+        self.spnParallel = QSpinBox()
+        self.spnParallel.setRange(1, len(DOWNLOAD_SOURCES))
+        self.spnParallel.setValue(2)
+        self.spnParallel.setToolTip("Скільки джерел черги качати одночасно")
+        self.btnQueueStart = QPushButton("▶ Запустити чергу")
+        self.btnQueueStart.clicked.connect(self.onQueueStart)
+        btn_queue_clear = QPushButton("🗑 Очистити")
+        btn_queue_clear.clicked.connect(self.onQueueClear)
+        row_queue.addWidget(btn_queue_add)
+        row_queue.addWidget(QLabel("Паралельно:"))
+        row_queue.addWidget(self.spnParallel)
+        row_queue.addWidget(self.btnQueueStart)
+        row_queue.addWidget(btn_queue_clear)
+        row_queue.addStretch(1)
+
+        self.tblQueue = QTableWidget(0, 3)
+        self.tblQueue.setHorizontalHeaderLabels(["Джерело", "Прогрес", "Стан"])
+        self.tblQueue.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        self.tblQueue.verticalHeader().setVisible(False)
+        self.tblQueue.setVisible(False)
+        self.lblQueueStats = QLabel("")
+
+        # 4) Прогресбар + швидкість + текстовий лог
         self.prg = QProgressBar()
-        self.txtLog = QTextEdit()
-        self.txtLog.setReadOnly(True)
+        self.lblStats = QLabel("")
+        self.txtLog = LogView()
 
         # 5) Тека гри + кнопка
         row_hero = QHBoxLayout()
@@ -283,11 +541,27 @@ class DownloadTab(QWidget):
         self.comboInstall = QComboBox()
         self.comboInstall.addItems(INSTALL_MAP.keys())
         self.comboInstall.setToolTip("Виберіть архів для встановлення (повинні вже завантажити відповідний ZIP).")
+        self.chkDiff = QCheckBox("Лише змінені файли")
+        self.chkDiff.setToolTip("Не розпаковувати файли, які вже є в папці гри з тим самим "
+                                "CRC і розміром (швидке повторне встановлення оновлень)")
+        self.chkDiff.toggled.connect(self.savePathsToSettings)
+        self.chkStaged = QCheckBox("Атомарно")
+        self.chkStaged.setToolTip("Розпакувати все в staging у папці гри й перенести на місця "
+                                  "одним commit: збій не лишить гру напіввстановленою")
+        self.chkStaged.toggled.connect(self.savePathsToSettings)
+        self.btnRollback = QPushButton("↩ Відкотити")
+        self.btnRollback.setToolTip("Повернути файли, замінені останнім атомарним встановленням")
+        self.btnRollback.clicked.connect(self.onRollback)
+        row_install = QHBoxLayout()
+        row_install.addWidget(self.comboInstall, stretch=1)
+        row_install.addWidget(self.chkDiff)
+        row_install.addWidget(self.chkStaged)
+        row_install.addWidget(self.btnRollback)
 
         # 7) Кнопка «Install ZIP»
-        btnInstall = QPushButton("✅ Встановити ZIP")
-        btnInstall.setToolTip("Розпакувати вибраний ZIP у кореневу папку гри.")
-        btnInstall.clicked.connect(self.onInstall)
+        self.btnInstall = QPushButton("✅ Встановити ZIP")
+        self.btnInstall.setToolTip("Розпакувати вибраний ZIP у кореневу папку гри.")
+        self.btnInstall.clicked.connect(self.onInstall)
 
         # 8) Кнопка «Відкрити папку з ZIP»
         self.btnOpenFolder = QPushButton("📂 Відкрити папку з ZIP")
@@ -303,12 +577,16 @@ class DownloadTab(QWidget):
         # Розміщення
         main_layout.addWidget(self.comboTargets)
         main_layout.addLayout(row_save)
-        main_layout.addWidget(self.btnDownload)
+        main_layout.addLayout(row_download)
+        main_layout.addLayout(row_queue)
+        main_layout.addWidget(self.tblQueue)
+        main_layout.addWidget(self.lblQueueStats)
         main_layout.addWidget(self.prg)
+        main_layout.addWidget(self.lblStats)
         main_layout.addWidget(self.txtLog, stretch=1)
         main_layout.addLayout(row_hero)
-        main_layout.addWidget(self.comboInstall)
-        main_layout.addWidget(btnInstall)
+        main_layout.addLayout(row_install)
+        main_layout.addWidget(self.btnInstall)
 
         row_extras = QHBoxLayout()
         row_extras.addWidget(self.btnOpenFolder)
@@ -327,7 +605,7 @@ class DownloadTab(QWidget):
                 font-family: Consolas, Segoe UI, Arial;
                 font-size: 10pt;
             }
-            QLineEdit, QComboBox, QTextEdit {
+            QLineEdit, QComboBox, QTextEdit, QListView {
                 background-color: #2E2E2E;
                 border: 1px solid #444;
                 color: #C4FFE4;
@@ -412,16 +690,40 @@ class DownloadTab(QWidget):
     # Збереження/відновлення шляхів
     # -----------------------
     def loadPathsFromSettings(self):
+        # Спершу прочитати все: сигнали віджетів нижче зберігають усі налаштування
         save_dir = self.settings.value("save_dir", "")
         game_dir = self.settings.value("game_dir", "")
+        cache_gb = int(self.settings.value("cache_limit_gb", 5))
+        limit_mb = int(self.settings.value("bandwidth_limit_mb", 0))
+        install_diff = self.settings.value("install_diff", True, type=bool)
+        install_staged = self.settings.value("install_staged", True, type=bool)
         if save_dir:
             self.edtSave.setText(save_dir)
         if game_dir:
             self.edtHeroRoot.setText(game_dir)
+        self.spnCacheGb.setValue(cache_gb)
+        self.spnLimit.setValue(limit_mb)
+        self.chkDiff.setChecked(install_diff)
+        self.chkStaged.setChecked(install_staged)
 
     def savePathsToSettings(self):
         self.settings.setValue("save_dir", self.edtSave.text())
         self.settings.setValue("game_dir", self.edtHeroRoot.text())
+        self.settings.setValue("cache_limit_gb", self.spnCacheGb.value())
+        self.settings.setValue("bandwidth_limit_mb", self.spnLimit.value())
+        self.settings.setValue("install_diff", self.chkDiff.isChecked())
+        self.settings.setValue("install_staged", self.chkStaged.isChecked())
+
+    def onLimitChanged(self, value):
+        self.limiter.rate = value * 1024 * 1024
+        self.savePathsToSettings()
+
+    def downloadCache(self, save_dir):
+        """DownloadCache у теці ZIP або None, якщо кеш вимкнено."""
+        limit_gb = self.spnCacheGb.value()
+        if not limit_gb:
+            return None
+        return DownloadCache(os.path.join(save_dir, CACHE_DIR_NAME), limit_gb * 1024**3)
 
     # -----------------------
     # Допоміжні методи UI
@@ -445,6 +747,7 @@ class DownloadTab(QWidget):
         """Користувач тисне «Завантажити»: визначити джерело, створити воркер."""
         self.txtLog.clear()
         self.prg.setValue(0)
+        self.lblStats.setText("")
         self.btnOpenFolder.setVisible(False)
 
         item_name = self.comboTargets.currentText()
@@ -461,20 +764,26 @@ class DownloadTab(QWidget):
         zip_path = os.path.join(save_dir, f"{item_name}.zip")
         self.log(f"🔄 Завантаження {item_name} → {zip_path}")
         src_type = info.get("type")
+        cache = self.downloadCache(save_dir)
+        # Очікувані розмір / SHA-256, якщо задані в DOWNLOAD_SOURCES
+        checks = {k: info[k] for k in ("size", "sha256") if k in info}
 
         # Вибір воркера за типом
         if src_type == "git":
             repo = info["repo"]
             file_in_repo = info["file"]
-            self.worker = GitDownloadWorker(repo, file_in_repo, zip_path)
+            self.worker = GitDownloadWorker(repo, file_in_repo, zip_path, cache=cache,
+                                            checks=checks, limiter=self.limiter)
         elif src_type == "gdrive":
             file_id = info["id"]
-            self.worker = GDriveDownloadWorker(file_id, zip_path)
+            self.worker = GDriveDownloadWorker(file_id, zip_path, cache=cache, checks=checks,
+                                               limiter=self.limiter)
         else:
             file_id = info.get("id")
             if file_id:
                 url = f"https://drive.google.com/uc?export=download&id={file_id}"
-                self.worker = DownloadWorker(url, zip_path)
+                self.worker = DownloadWorker(url, zip_path, cache=cache, checks=checks,
+                                             limiter=self.limiter)
             else:
                 # fallback
                 self.log("❌ Не змогли визначити тип джерела.")
@@ -482,25 +791,156 @@ class DownloadTab(QWidget):
 
         # Підписуємося на сигнали воркера
         self.worker.progressChanged.connect(self.prg.setValue)
-        self.worker.statusMessage.connect(self.txtLog.append)
+        self.worker.statusMessage.connect(self.txtLog.append, Qt.DirectConnection)
         self.worker.finishedSignal.connect(self.onDownloadFinished)
+        self.worker.statsChanged.connect(self.onDownloadStats)
 
         # Заблокувати кнопку поки йде завантаження
         self.btnDownload.setEnabled(False)
+        self.btnDownloadInstall.setEnabled(False)
+        self.btnQueueStart.setEnabled(False)
         self.prg.setValue(0)
         self.worker.start()
 
         # Зберегти теку
         self.savePathsToSettings()
 
+    def onDownloadInstall(self):
+        """Завантажити обране джерело й одразу встановлювати його за INSTALL_MAP."""
+        self.txtLog.clear()
+        self.prg.setValue(0)
+        self.lblStats.setText("")
+        self.btnOpenFolder.setVisible(False)
+
+        item_name = self.comboTargets.currentText()
+        info = DOWNLOAD_SOURCES.get(item_name, {})
+        mapping = INSTALL_MAP.get(item_name)
+        if not info or not mapping:
+            self.log(f"❌ Для «{item_name}» немає карти встановлення — лише «🔄 Завантажити».")
+            return
+
+        save_dir = self.edtSave.text().strip()
+        if not save_dir or not os.path.isdir(save_dir):
+            self.log("❌ Некоректна текa для збереження ZIP.")
+            return
+        hero_root = self.edtHeroRoot.text().strip()
+        if not hero_root or not os.path.isdir(hero_root):
+            self.log("❌ Некоректна коренева папка гри")
+            return
+
+        # Під час завантаження питати про кожен файл не можна — один раз наперед
+        reply = QMessageBox.question(
+            self, "Перезаписати файли?",
+            f"Файли «{item_name}», що вже є у {hero_root}, буде перезаписано. Продовжити?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply == QMessageBox.No:
+            return
+
+        zip_path = os.path.join(save_dir, f"{item_name}.zip")
+        self.log(f"⚡ Завантаження зі встановленням {item_name} → {hero_root}")
+        self.worker = PipelineInstallWorker(info, zip_path, mapping, hero_root,
+                                            cache=self.downloadCache(save_dir),
+                                            limiter=self.limiter)
+        self.worker.progressChanged.connect(self.prg.setValue)
+        self.worker.statsChanged.connect(self.onDownloadStats)
+        self.worker.statusMessage.connect(self.txtLog.append, Qt.DirectConnection)
+        self.worker.finishedSignal.connect(self.onDownloadFinished)
+        self.btnDownload.setEnabled(False)
+        self.btnDownloadInstall.setEnabled(False)
+        self.btnQueueStart.setEnabled(False)
+        self.btnInstall.setEnabled(False)
+        # Відкат посеред конвеєра зачепив би файли, які він саме встановлює
+        self.btnRollback.setEnabled(False)
+        self.worker.start()
+        self.savePathsToSettings()
+
+    def onDownloadStats(self, done, total, speed, eta):
+        """Рядок під прогресбаром: скільки завантажено, з якою швидкістю і скільки лишилось."""
+        self.lblStats.setText(format_transfer(done, total, speed, eta))
+
     def onDownloadFinished(self, msg: str):
         """Обробка завершення завантаження."""
         self.txtLog.append(msg)
         self.btnDownload.setEnabled(True)
+        self.btnQueueStart.setEnabled(True)
+        if self.installWorker is None or not self.installWorker.isRunning():
+            self.btnDownloadInstall.setEnabled(True)
+            self.btnInstall.setEnabled(True)
+            self.btnRollback.setEnabled(True)
         self.prg.setValue(100)
         # Робимо кнопку «Відкрити папку з ZIP» видимою
         self.btnOpenFolder.setVisible(True)
 
+    # -----------------------
+    # Черга завантажень
+    # -----------------------
+    def queuedNames(self):
+        return [self.tblQueue.item(row, 0).text() for row in range(self.tblQueue.rowCount())]
+
+    def onQueueAdd(self):
+        name = self.comboTargets.currentText()
+        if name in self.queuedNames():
+            self.log(f"ℹ {name} вже в черзі")
+            return
+        row = self.tblQueue.rowCount()
+        self.tblQueue.insertRow(row)
+        self.tblQueue.setItem(row, 0, QTableWidgetItem(name))
+        self.tblQueue.setCellWidget(row, 1, QProgressBar())
+        self.tblQueue.setItem(row, 2, QTableWidgetItem(STATUS_QUEUED))
+        self.tblQueue.setVisible(True)
+
+    def onQueueClear(self):
+        if self.worker is not None and self.worker.isRunning():
+            return
+        self.tblQueue.setRowCount(0)
+        self.tblQueue.setVisible(False)
+        self.lblQueueStats.setText("")
+
+    def onQueueStart(self):
+        names = self.queuedNames()
+        if not names:
+            self.log("❌ Черга порожня — додайте джерела кнопкою «➕ В чергу».")
+            return
+        save_dir = self.edtSave.text().strip()
+        if not save_dir or not os.path.isdir(save_dir):
+            self.log("❌ Некоректна текa для збереження ZIP.")
+            return
+
+        items = [QueueItem(name, DOWNLOAD_SOURCES[name], os.path.join(save_dir, f"{name}.zip"))
+                 for name in names]
+        for row in range(len(items)):
+            self.tblQueue.cellWidget(row, 1).setValue(0)
+            self.tblQueue.item(row, 2).setText(STATUS_QUEUED)
+        parallel = self.spnParallel.value()
+        self.log(f"🔄 Черга: {len(items)} джерел, одночасно {min(parallel, len(items))}")
+
+        self.worker = DownloadQueueWorker(items, parallel, cache=self.downloadCache(save_dir),
+                                          limiter=self.limiter)
+        self.worker.itemProgress.connect(lambda row, v: self.tblQueue.cellWidget(row, 1).setValue(v))
+        self.worker.itemStatus.connect(lambda row, text: self.tblQueue.item(row, 2).setText(text))
+        self.worker.statsChanged.connect(self.lblQueueStats.setText)
+        self.worker.statusMessage.connect(self.txtLog.append, Qt.DirectConnection)
+        self.worker.finishedSignal.connect(self.onQueueFinished)
+        self.btnDownload.setEnabled(False)
+        self.btnDownloadInstall.setEnabled(False)
+        self.btnQueueStart.setEnabled(False)
+        self.worker.start()
+        self.savePathsToSettings()
+
+    def onQueueFinished(self, msg: str):
+        for row, item in enumerate(self.worker.items):
+            if item.status == STATUS_DONE:
+                self.tblQueue.cellWidget(row, 1).setValue(100)
+            elif item.status == STATUS_FAILED:
+                self.log(f"❌ {item.name}: {item.error}")
+        self.txtLog.append(msg)
+        self.btnDownload.setEnabled(True)
+        self.btnQueueStart.setEnabled(True)
+        if self.installWorker is None or not self.installWorker.isRunning():
+            self.btnDownloadInstall.setEnabled(True)
+        self.btnOpenFolder.setVisible(True)
+
     # -----------------------
     # Встановити ZIP
     # -----------------------
@@ -520,38 +960,96 @@ class DownloadTab(QWidget):
             return
 
         mapping = INSTALL_MAP.get(choice, {})
+        try:
+            with zipfile.ZipFile(zip_path, "r") as archive:
+                plan = plan_install(archive.infolist(), InstallLookup(mapping, hero_root))
+        except zipfile.BadZipFile as ex:
+            self.txtLog.append(f"❌ Пошкоджений ZIP: {ex}")
+            return
+
+        fingerprints = Fingerprints(hero_root)
+        differential = self.chkDiff.isChecked()
+        if differential:
+            # Лише за кешем CRC, без читання файлів — щоб не питати про однакові;
+            # решту воркер перевірить сам
+            plan, _ = diff_plan(plan, fingerprints, compute=False)
+
+        conflicts = find_conflicts(plan)
+        policy = POLICY_OVERWRITE
+        if conflicts:
+            policy = self.askConflictPolicy(conflicts)
+            if policy is None:
+                self.txtLog.append("ℹ Встановлення скасовано")
+                return
+
         self.txtLog.append(f"⚙️ Інсталяція «{choice}» у {hero_root}")
+        self.prg.setValue(0)
+        # Окремо від self.worker — встановлення може йти паралельно із завантаженням
+        expected_sha256 = expected_checks(DOWNLOAD_SOURCES.get(choice, {}))[1]
+        self.installWorker = InstallWorker(zip_path, hero_root, plan, conflicts, policy,
+                                           fingerprints, differential, expected_sha256,
+                                           self.chkStaged.isChecked())
+        self.installWorker.progressChanged.connect(self.prg.setValue)
+        self.installWorker.statusMessage.connect(self.txtLog.append, Qt.DirectConnection)
+        self.installWorker.finishedSignal.connect(self.onInstallFinished)
+        self.btnInstall.setEnabled(False)
+        self.btnDownloadInstall.setEnabled(False)
+        self.btnRollback.setEnabled(False)
+        self.installWorker.start()
+
+    def askConflictPolicy(self, conflicts):
+        """
+        Один діалог на всі файли, що вже є в папці гри.
+        Повертає POLICY_* або None, якщо скасовано.
+        """
+        box = QMessageBox(self)
+        box.setWindowTitle("Файли вже існують")
+        box.setIcon(QMessageBox.Question)
+        box.setText(f"{len(conflicts)} файлів уже є в папці гри. Що з ними зробити?")
+        box.setDetailedText("\n".join(path for _, path in conflicts))
+        choices = {
+            box.addButton("Перезаписати всі", QMessageBox.AcceptRole): POLICY_OVERWRITE,
+            box.addButton("Пропустити всі", QMessageBox.AcceptRole): POLICY_SKIP,
+            box.addButton("Лишити новіші", QMessageBox.AcceptRole): POLICY_NEWER,
+        }
+        box.addButton(QMessageBox.Cancel)
+        box.exec()
+        return choices.get(box.clickedButton())
+
+    def onRollback(self):
+        """Відкат останнього атомарного встановлення (або обірваного commit)."""
+        hero_root = self.edtHeroRoot.text().strip()
+        if not hero_root or not os.path.isdir(hero_root):
+            self.txtLog.append("❌ Некоректна коренева папка гри")
+            return
+        staging = StagedInstall(hero_root, self.txtLog.append)
+        if staging.state() is None:
+            self.txtLog.append("ℹ Немає встановлення, яке можна відкотити")
+            return
+        reply = QMessageBox.question(
+            self, "Відкотити встановлення?",
+            "Повернути файли, які замінило останнє встановлення, і видалити нові?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply == QMessageBox.No:
+            return
+        # Лише перейменування — швидко, можна в потоці GUI
+        fingerprints = Fingerprints(hero_root)
+        try:
+            staging.rollback(fingerprints)
+            fingerprints.save()
+        except OSError as ex:
+            self.txtLog.append(f"❌ Відкат не завершено ({ex}) — спробуйте ще раз")
 
-        with zipfile.ZipFile(zip_path, "r") as archive:
-            for subfolder, files in mapping.items():
-                dest = os.path.join(hero_root, subfolder)
-                os.makedirs(dest, exist_ok=True)
-
-                for member in archive.namelist():
-                    base = os.path.basename(member)
-                    # Якщо ["*"] → переносимо всі файли
-                    if files == ["*"] or base.lower() in [f.lower() for f in files]:
-                        tmp = tempfile.mkdtemp()
-                        archive.extract(member, tmp)
-                        dest_file = os.path.join(dest, base)
-
-                        # Перезапитати, якщо існує
-                        if os.path.exists(dest_file):
-                            reply = QMessageBox.question(
-                                self, "Перезаписати файл?",
-                                f"Файл «{base}» вже існує у {dest}. Перезаписати?",
-                                QMessageBox.Yes | QMessageBox.No
-                            )
-                            if reply == QMessageBox.No:
-                                shutil.rmtree(tmp)
-                                continue
-                            os.remove(dest_file)
-
-                        shutil.move(os.path.join(tmp, member), dest)
-                        shutil.rmtree(tmp)
-                        self.txtLog.append(f"✔ {base} → {dest}")
-
-        self.txtLog.append(f"✅ «{choice}» успішно встановлено")
+    def onInstallFinished(self, msg: str):
+        self.txtLog.append(msg)
+        self.btnInstall.setEnabled(True)
+        if self.worker is None or not self.worker.isRunning():
+            self.btnDownloadInstall.setEnabled(True)
+        if not isinstance(self.worker, PipelineInstallWorker) or not self.worker.isRunning():
+            self.btnRollback.setEnabled(True)
+        if msg.startswith("✅"):
+            self.prg.setValue(100)
 
     # -----------------------
     # Додаткові кнопки
@@ -565,22 +1063,8 @@ class DownloadTab(QWidget):
             self.txtLog.append("❌ Тека з ZIP не існує.")
 
     def showFullLogDialog(self):
-        """Показати повний лог у новому вікні (копія тексту)."""
-        dlg = QDialog(self)
-        dlg.setWindowTitle("Повний лог")
-        dlg.resize(600, 400)
-
-        layout = QVBoxLayout(dlg)
-        txt = QPlainTextEdit()
-        txt.setReadOnly(True)
-        txt.setPlainText(self.txtLog.toPlainText())
-        layout.addWidget(txt)
-
-        btns = QDialogButtonBox(QDialogButtonBox.Ok)
-        btns.accepted.connect(dlg.accept)
-        layout.addWidget(btns)
-
-        dlg.exec()
+        """Показати повний лог у новому вікні (та сама модель, без копії тексту)."""
+        show_log_dialog(self, self.txtLog.model())
 
     # -----------------------
     # Допоміжне логування
@@ -0,0 +1,48 @@
+# tabs/lazy_tab.py
+# -*- coding: utf-8 -*-
+"""
+Заглушка вкладки, що створює справжню вкладку лише при першому показі.
+
+Модуль вкладки імпортується тоді ж, тож його важкі залежності
+(QtWebEngine у WheelTab, requests/dotenv у DownloadTab) не вантажаться,
+поки користувач не відкриє цю вкладку.
+"""
+import importlib
+
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import QLabel, QVBoxLayout, QWidget
+
+from core import startup_profile
+
+
+class LazyTab(QWidget):
+    """Контейнер для `module`.`class_name`; сам віджет — у `widget` після build()."""
+
+    def __init__(self, module: str, class_name: str, parent=None):
+        super().__init__(parent)
+        self.module = module
+        self.class_name = class_name
+        self.widget = None
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.lblPlaceholder = QLabel("Завантаження вкладки…")
+        self.lblPlaceholder.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.lblPlaceholder)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.widget is None:
+            # Спершу дати вікну й заглушці намалюватися
+            QTimer.singleShot(0, self.build)
+
+    def build(self):
+        """Створює вкладку (якщо ще не створена) і повертає її."""
+        if self.widget is None:
+            tab_class = getattr(importlib.import_module(self.module), self.class_name)
+            self.widget = tab_class(parent=self)
+            self.layout().removeWidget(self.lblPlaceholder)
+            self.lblPlaceholder.deleteLater()
+            self.layout().addWidget(self.widget)
+            startup_profile.mark(f"tab: {self.class_name}")
+        return self.widget
@@ -0,0 +1,122 @@
+# tabs/log_view.py
+# -*- coding: utf-8 -*-
+"""
+Спільний лог для вкладок: модель над core.log_buffer.LogBuffer і список,
+що її показує.
+
+LogView.append можна викликати з будь-якого потоку, тож сигнали воркерів
+під'єднуються напряму (Qt.DirectConnection): повідомлення одразу йдуть
+у буфер, а віджет оновлюється раз на FLUSH_MS одним пакетом рядків
+замість окремого перерахунку розмітки на кожне повідомлення.
+Повний лог — ще один LogView над тією самою моделлю, без копіювання тексту.
+"""
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt, QTimer
+from PySide6.QtGui import QKeySequence
+from PySide6.QtWidgets import (QAbstractItemView, QApplication, QDialog, QDialogButtonBox,
+                               QListView, QVBoxLayout)
+
+from core.log_buffer import LOG_CAPACITY, LogBuffer
+
+FLUSH_MS = 100
+
+
+class LogModel(QAbstractListModel):
+    """Рядки логу; нові з'являються пакетами раз на FLUSH_MS."""
+
+    def __init__(self, capacity=LOG_CAPACITY, parent=None):
+        super().__init__(parent)
+        self.buffer = LogBuffer(capacity)
+        self._timer = QTimer(self)
+        self._timer.setInterval(FLUSH_MS)
+        self._timer.timeout.connect(self.flush)
+        self._timer.start()
+
+    def append(self, message):
+        """Потокобезпечно: лише кладе повідомлення в чергу буфера."""
+        self.buffer.append(message)
+
+    def flush(self):
+        """Переносить накопичене в модель (потік GUI)."""
+        lines = self.buffer.take_pending()
+        if not lines:
+            return
+        dropped = self.buffer.overflow(len(lines))
+        if dropped:
+            self.beginRemoveRows(QModelIndex(), 0, dropped - 1)
+            self.buffer.drop(dropped)
+            self.endRemoveRows()
+        first = len(self.buffer)
+        self.beginInsertRows(QModelIndex(), first, first + len(lines) - 1)
+        self.buffer.extend(lines)
+        self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.buffer.clear()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.buffer)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid():
+            return self.buffer[index.row()]
+        return None
+
+
+class LogView(QListView):
+    """
+    Лог замість QTextEdit: append()/clear() як у нього. Прокручується
+    за новими рядками, лише якщо вже стояв унизу. Ctrl+C копіює виділені рядки.
+    """
+
+    def __init__(self, model=None, parent=None):
+        super().__init__(parent)
+        self.setModel(model or LogModel(parent=self))
+        self.setUniformItemSizes(True)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self._follow = True
+        self.model().rowsAboutToBeInserted.connect(self._checkFollow)
+        self.model().rowsInserted.connect(self._scrollIfFollowing)
+
+    def append(self, message):
+        """Потокобезпечно (див. LogModel.append)."""
+        self.model().append(message)
+
+    def clear(self):
+        self.model().clear()
+
+    def _checkFollow(self):
+        bar = self.verticalScrollBar()
+        self._follow = bar.value() >= bar.maximum()
+
+    def _scrollIfFollowing(self):
+        if self._follow:
+            self.scrollToBottom()
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.Copy):
+            rows = sorted(index.row() for index in self.selectedIndexes())
+            QApplication.clipboard().setText(self.model().buffer.text(rows))
+            return
+        super().keyPressEvent(event)
+
+
+def show_log_dialog(parent, model, title="Повний лог"):
+    """Окреме вікно з усім логом `model` (живе — нові рядки теж з'являються)."""
+    dlg = QDialog(parent)
+    dlg.setWindowTitle(title)
+    dlg.resize(600, 400)
+
+    layout = QVBoxLayout(dlg)
+    view = LogView(model)
+    view.scrollToBottom()
+    layout.addWidget(view)
+
+    btns = QDialogButtonBox(QDialogButtonBox.Ok)
+    btns.accepted.connect(dlg.accept)
+    layout.addWidget(btns)
+
+    dlg.exec()
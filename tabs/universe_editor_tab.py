@@ -1,252 +1,124 @@
 # universe_editor_tab.py
 import os
-import zipfile
-import shutil
-import tempfile
-from xml.etree import ElementTree as ET
 
-from PySide6.QtCore import QThread, Signal
+from PySide6.QtCore import QThread, Qt, Signal
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QLineEdit, QComboBox,
-    QProgressBar, QFileDialog, QTextEdit, QCheckBox
+    QProgressBar, QFileDialog, QCheckBox, QSpinBox, QInputDialog
 )
 
-# Папки й коефіцієнти
-CREATURE_FOLDERS = [
-    "Academy", "Dungeon", "Dwarf", "Haven", "Inferno",
-    "Necropolis", "Neutrals", "Orcs", "Preserve"
-]
-PERCENT_FACTORS = {
-    "50%": 0.50,
-    "75%": 0.75,
-    "100%": 1.00,
-    "125%": 1.25,
-    "150%": 1.50,
-    "175%": 1.75,
-    "200%": 2.00,
-    "225%": 2.25,
-    "250%": 2.50
+from core.backup_store import BackupStore
+from core.batch import format_summary, load_jobs, run_batch
+from core.growth_index import default_index_path
+from core.overlay import overlay_path, remove_overlay
+from core.patch_engine import (
+    OUTPUT_INPLACE, OUTPUT_OVERLAY, PERCENT_FACTORS, PatchEngine, PatchError
+)
+from core.stat_rules import growth_rules, load_rules
+from core.xdb_patch import ENGINE_ETREE, ENGINE_FAST, default_workers
+from tabs.log_view import LogView
+
+# Підписи режимів результату для комбобокса
+OUTPUT_MODES = {
+    "Перезаписати Universe_mod.pak": OUTPUT_INPLACE,
+    "Окремий overlay .pak": OUTPUT_OVERLAY,
 }
 
 
 class InplacePatchWorker(QThread):
     """
-    Потік, що редагує WeeklyGrowth у .xdb файлах (Universe_mod.pak).
+    Потік, що запускає core.patch_engine.PatchEngine і передає
+    його прогрес/лог у сигнали Qt. Параметри — див. PatchEngine.
     """
     progressChanged = Signal(int)
     logMessage = Signal(str)
     finishedSignal = Signal(str)
 
-    def __init__(self, pakPath, factor, doBackup, creatureFilter, dryRun, parent=None):
+    def __init__(self, pakPath, factor, doBackup, creatureFilter, dryRun,
+                 streaming=True, workers=1, engine=ENGINE_FAST,
+                 output=OUTPUT_INPLACE, rules=None, indexPath=None, parent=None):
         super().__init__(parent)
-        self.pakPath = pakPath
-        self.factor = factor
-        self.doBackup = doBackup
-        self.creatureFilter = creatureFilter.lower().strip()
-        self.dryRun = dryRun
+        self.engine = PatchEngine(
+            pakPath, factor, doBackup, creatureFilter, dryRun,
+            streaming=streaming, workers=workers, engine=engine,
+            output=output, rules=rules,
+            progress=self.progressChanged.emit, log=self.logMessage.emit,
+            index_path=indexPath,
+        )
 
     def run(self):
         try:
-            if not os.path.isfile(self.pakPath):
-                self.finishedSignal.emit("Помилка: Universe_mod.pak не знайдено.")
-                return
+            result = self.engine.run()
+            self.finishedSignal.emit(result.message)
+        except PatchError as e:
+            self.finishedSignal.emit(str(e))
+        except Exception as e:
+            self.finishedSignal.emit(f"Помилка: {e}")
 
-            # Перевірка прав
-            if not os.access(self.pakPath, os.R_OK):
-                self.finishedSignal.emit("Помилка: немає прав на читання .pak")
-                return
-            if not os.access(os.path.dirname(self.pakPath), os.W_OK):
-                self.finishedSignal.emit("Помилка: немає прав на запис у теку .pak")
-                return
 
-            self.logMessage.emit("Читаємо оригінальний .pak...")
-            with zipfile.ZipFile(self.pakPath, 'r') as z_in:
-                file_names = z_in.namelist()
-                total = len(file_names)
-
-            tmp_dir = tempfile.mkdtemp(prefix="universe_inplace_")
-
-            # Розпаковуємо
-            extracted_count = 0
-            with zipfile.ZipFile(self.pakPath, 'r') as z_in:
-                for f_name in file_names:
-                    info = z_in.getinfo(f_name)
-                    if info.is_dir():
-                        dest_dir = os.path.join(tmp_dir, f_name)
-                        os.makedirs(dest_dir, exist_ok=True)
-                        extracted_count += 1
-                        prog = int(50 * extracted_count / total)
-                        self.progressChanged.emit(prog)
-                        continue
-
-                    dest_path = os.path.join(tmp_dir, f_name)
-                    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-                    with z_in.open(info) as fin, open(dest_path, 'wb') as fout:
-                        shutil.copyfileobj(fin, fout)
-
-                    extracted_count += 1
-                    prog = int(50 * extracted_count / total)
-                    self.progressChanged.emit(prog)
-
-            self.logMessage.emit("Аналізуємо .xdb та змінюємо WeeklyGrowth...")
-            creatures_root = os.path.join(tmp_dir, "GameMechanics", "Creature", "Creatures")
-            xdb_files = self._collect_xdb(creatures_root)
-
-            changed_count = 0
-            sample_info = None
-            changed_files_list = []
-
-            if not self.dryRun:
-                changed_count, sample_info = self._process_xdb_files(xdb_files, changed_files_list)
-            else:
-                # Лише dry-run
-                for xdb_path in xdb_files:
-                    c, info = self._dry_check_xdb(xdb_path)
-                    if c:
-                        changed_count += 1
-                        changed_files_list.append(os.path.basename(xdb_path))
-                        if sample_info is None and info:
-                            sample_info = info
-
-            # backup
-            if not self.dryRun and self.doBackup:
-                backup_path = self.pakPath + ".backup"
-                if not os.path.exists(backup_path):
-                    shutil.copy2(self.pakPath, backup_path)
-                    self.logMessage.emit(f"Створено резервну копію: {backup_path}")
-
-            if self.dryRun:
-                shutil.rmtree(tmp_dir)
-                msg = f"[РЕЖИМ ПЕРЕГЛЯДУ] Зміни: {changed_count} файлів"
-                if sample_info:
-                    cr_name, oldv, newv = sample_info
-                    msg += f" (Приклад: {cr_name} {oldv}→{newv})"
-                self.finishedSignal.emit(msg)
-                return
+class BatchPatchWorker(QThread):
+    """
+    Потік пакетної обробки кількох .pak (core.batch.run_batch):
+    загальний прогрес, лог з префіксом [номер] і підсумок по кожному .pak.
+    """
+    progressChanged = Signal(int)
+    logMessage = Signal(str)
+    finishedSignal = Signal(str)
 
-            # Перезапаковуємо
-            new_pak = self.pakPath + ".new"
-            self.logMessage.emit("Запаковуємо оновлений архів...")
-            updated_files = []
-            for root, dirs, files in os.walk(tmp_dir):
-                for f in files:
-                    updated_files.append(os.path.join(root, f))
-            total_updated = len(updated_files)
-
-            packed_count = 0
-            with zipfile.ZipFile(new_pak, 'w', compression=zipfile.ZIP_DEFLATED) as z_out:
-                for fpath in updated_files:
-                    rel_path = os.path.relpath(fpath, tmp_dir)
-                    z_out.write(fpath, rel_path)
-                    packed_count += 1
-                    prog = 50 + int(50 * packed_count / total_updated)
-                    self.progressChanged.emit(prog)
-
-            # Заміна
-            os.remove(self.pakPath)
-            os.rename(new_pak, self.pakPath)
-            shutil.rmtree(tmp_dir)
-
-            # Лог
-            if changed_files_list:
-                self.logMessage.emit("Змінено файли:")
-                for f in changed_files_list:
-                    self.logMessage.emit(f" - {f}")
-
-            if changed_count > 0:
-                if sample_info:
-                    cr_name, oldv, newv = sample_info
-                    msg = f"Готово! Змінено {changed_count} .xdb. Приклад: {cr_name} {oldv}→{newv}"
-                else:
-                    msg = f"Готово! Змінено {changed_count} .xdb"
-            else:
-                msg = "Готово! Не знайдено змін."
-            self.finishedSignal.emit(msg)
+    def __init__(self, jobs, parallel, doBackup, dryRun, streaming=True, workers=1,
+                 engine=ENGINE_FAST, indexPath=None, parent=None):
+        super().__init__(parent)
+        self.jobs = jobs
+        self.parallel = parallel
+        self.doBackup = doBackup
+        self.dryRun = dryRun
+        self.streaming = streaming
+        self.workers = workers
+        self.engine = engine
+        self.indexPath = indexPath
 
+    def run(self):
+        try:
+            results = run_batch(
+                self.jobs, self.parallel, self.doBackup, self.dryRun,
+                streaming=self.streaming, workers=self.workers, engine=self.engine,
+                progress=self.progressChanged.emit, log=self.logMessage.emit,
+                index_path=self.indexPath,
+            )
+            lines = format_summary(results)
+            for line in lines[1:]:
+                self.logMessage.emit(line)
+            self.finishedSignal.emit(lines[0])
         except Exception as e:
             self.finishedSignal.emit(f"Помилка: {e}")
 
-    def _collect_xdb(self, creatures_root):
-        xdb_files = []
-        if not os.path.isdir(creatures_root):
-            return xdb_files
-
-        for root, dirs, files in os.walk(creatures_root):
-            for f in files:
-                if not f.lower().endswith(".xdb"):
-                    continue
-                rel_path = os.path.relpath(os.path.join(root, f), creatures_root)
-                folder_top = rel_path.split(os.sep, 1)[0]
-                if folder_top not in CREATURE_FOLDERS:
-                    continue
-
-                if self.creatureFilter and self.creatureFilter not in f.lower():
-                    continue
-                xdb_files.append(os.path.join(root, f))
-        return xdb_files
-
-    def _process_xdb_files(self, xdb_files, changed_files_list):
-        changed_count = 0
-        sample_info = None
-        total_files = len(xdb_files)
-        for i, p in enumerate(xdb_files, start=1):
-            changed, info = self._patch_xdb(p, self.factor)
-            if changed:
-                changed_count += 1
-                changed_files_list.append(os.path.basename(p))
-                if sample_info is None and info:
-                    sample_info = info
-            prog = 50 + int(40 * i / total_files)
-            self.progressChanged.emit(prog)
-        return changed_count, sample_info
-
-    def _dry_check_xdb(self, path):
-        try:
-            tree = ET.parse(path)
-            root = tree.getroot()
-        except ET.ParseError:
-            return False, None
-
-        changed = False
-        sample = None
-        for elem in root.iter("WeeklyGrowth"):
-            val_str = (elem.text or "").strip()
-            if val_str.isdigit():
-                old_val = int(val_str)
-                new_val = int(round(old_val * self.factor))
-                if old_val != new_val:
-                    changed = True
-                    if not sample:
-                        c_name = os.path.splitext(os.path.basename(path))[0]
-                        sample = (c_name, old_val, new_val)
-        return changed, sample
-
-    def _patch_xdb(self, path, factor):
+
+class RestoreWorker(QThread):
+    """Потік, що повертає .pak у стан знімка BackupStore."""
+    progressChanged = Signal(int)
+    logMessage = Signal(str)
+    finishedSignal = Signal(str)
+
+    def __init__(self, pakPath, snapshotId, parent=None):
+        super().__init__(parent)
+        self.pakPath = pakPath
+        self.snapshotId = snapshotId
+
+    def run(self):
         try:
-            tree = ET.parse(path)
-            root = tree.getroot()
-        except ET.ParseError:
-            return False, None
-
-        changed = False
-        sample = None
-        for elem in root.iter("WeeklyGrowth"):
-            val_str = (elem.text or "").strip()
-            if val_str.isdigit():
-                old_val = int(val_str)
-                new_val = int(round(old_val * factor))
-                if new_val != old_val:
-                    elem.text = str(new_val)
-                    changed = True
-                    if not sample:
-                        c_name = os.path.splitext(os.path.basename(path))[0]
-                        sample = (c_name, old_val, new_val)
-
-        if changed:
-            tree.write(path, encoding="utf-8", xml_declaration=True)
-            return True, sample
-        return False, None
+            self.logMessage.emit(f"Відновлюємо стан знімка #{self.snapshotId}...")
+
+            def on_progress(done, total):
+                self.progressChanged.emit(int(100 * done / total))
+
+            count = BackupStore(self.pakPath).restore(self.snapshotId, on_progress)
+            if count:
+                self.finishedSignal.emit(f"Відновлено знімок #{self.snapshotId}: {count} файлів")
+            else:
+                self.finishedSignal.emit(f"Знімок #{self.snapshotId}: архів уже в цьому стані")
+        except Exception as e:
+            self.finishedSignal.emit(f"Помилка: {e}")
 
 
 class UniverseEditorTab(QWidget):
@@ -287,20 +159,65 @@ class UniverseEditorTab(QWidget):
         self.edtFilter = QLineEdit()
         fltRow.addWidget(self.edtFilter)
 
+        # 3.1) Файл правил (JSON) — додаткові поля/фракції/істоти
+        rulesRow = QHBoxLayout()
+        self.layout().addLayout(rulesRow)
+        rulesRow.addWidget(QLabel("Файл правил:"))
+        self.edtRules = QLineEdit()
+        self.edtRules.setPlaceholderText("необов'язково: JSON з правилами для Health, AttackSkill, …")
+        rulesRow.addWidget(self.edtRules)
+        btnRules = QPushButton("Огляд")
+        rulesRow.addWidget(btnRules)
+        btnRules.clicked.connect(self.onBrowseRules)
+
         # 4) Прапорці
-        self.chkBackup = QCheckBox("Створити .backup")
+        self.chkBackup = QCheckBox("Створити резервну копію")
         self.chkBackup.setChecked(True)
         self.layout().addWidget(self.chkBackup)
 
         self.chkDryRun = QCheckBox("Режим перегляду (dry-run)")
         self.layout().addWidget(self.chkDryRun)
 
+        rowOutput = QHBoxLayout()
+        self.layout().addLayout(rowOutput)
+        rowOutput.addWidget(QLabel("Результат:"))
+        self.cmbOutput = QComboBox()
+        self.cmbOutput.addItems(OUTPUT_MODES.keys())
+        rowOutput.addWidget(self.cmbOutput, stretch=1)
+
+        self.chkStreaming = QCheckBox("Потоковий перезапис (без розпакування .pak)")
+        self.chkStreaming.setChecked(True)
+        self.layout().addWidget(self.chkStreaming)
+
+        self.chkFastEngine = QCheckBox("Байтовий патчер .xdb (без ElementTree)")
+        self.chkFastEngine.setChecked(True)
+        self.layout().addWidget(self.chkFastEngine)
+
+        rowWorkers = QHBoxLayout()
+        self.layout().addLayout(rowWorkers)
+        rowWorkers.addWidget(QLabel("Процесів для .xdb:"))
+        self.spnWorkers = QSpinBox()
+        self.spnWorkers.setRange(1, default_workers())
+        self.spnWorkers.setValue(default_workers())
+        self.spnWorkers.setToolTip("Пул процесів вмикається, лише якщо окупається: рушій ElementTree "
+                                   "і тисячі .xdb; байтовий патчер завжди швидший в одному процесі")
+        rowWorkers.addWidget(self.spnWorkers)
+        rowWorkers.addWidget(QLabel("Паралельних .pak (пакет):"))
+        self.spnParallel = QSpinBox()
+        self.spnParallel.setRange(1, 8)
+        self.spnParallel.setValue(2)
+        rowWorkers.addWidget(self.spnParallel)
+        rowWorkers.addStretch(1)
+
         # 5) Кнопки
         btnRow = QHBoxLayout()
         self.layout().addLayout(btnRow)
         self.btnRun = QPushButton("Почати")
         btnRow.addWidget(self.btnRun)
         self.btnRun.clicked.connect(self.onRun)
+        self.btnBatch = QPushButton("Пакетна обробка…")
+        btnRow.addWidget(self.btnBatch)
+        self.btnBatch.clicked.connect(self.onBatch)
         self.btnCheck = QPushButton("Перевірити права")
         btnRow.addWidget(self.btnCheck)
         self.btnCheck.clicked.connect(self.onCheck)
@@ -313,8 +230,7 @@ class UniverseEditorTab(QWidget):
         self.layout().addWidget(self.prgBar)
 
         # 7) Логи
-        self.txtLog = QTextEdit()
-        self.txtLog.setReadOnly(True)
+        self.txtLog = LogView()
         self.layout().addWidget(self.txtLog, stretch=1)
 
         self.worker = None
@@ -325,28 +241,97 @@ class UniverseEditorTab(QWidget):
         if path:
             self.edtPakPath.setText(path)
 
+    def _isBusy(self):
+        """Чи ще працює воркер: усі вони переписують той самий .pak."""
+        if self.worker is not None and self.worker.isRunning():
+            self.logMsg("Зачекайте: попередня операція ще не завершилась.")
+            return True
+        return False
+
+    def _setBusy(self, busy: bool):
+        for btn in (self.btnRun, self.btnBatch, self.btnRestore):
+            btn.setEnabled(not busy)
+
     def onRun(self):
+        if self._isBusy():
+            return
         pak_path = self.edtPakPath.text().strip()
         factor_str = self.cmbFactor.currentText()
         factor = PERCENT_FACTORS[factor_str]
         do_backup = self.chkBackup.isChecked()
         dry_run = self.chkDryRun.isChecked()
+        streaming = self.chkStreaming.isChecked()
+        workers = self.spnWorkers.value()
+        output = OUTPUT_MODES[self.cmbOutput.currentText()]
+        engine = ENGINE_FAST if self.chkFastEngine.isChecked() else ENGINE_ETREE
         creature_filter = self.edtFilter.text().strip()
+        rules_path = self.edtRules.text().strip()
 
         if not pak_path or not os.path.isfile(pak_path):
             self.logMsg("Помилка: невірний шлях")
             return
 
-        self.btnRun.setEnabled(False)
+        # Множник WeeklyGrowth — базове правило, правила з файлу йдуть після нього
+        rules = growth_rules(factor)
+        if rules_path:
+            try:
+                rules += load_rules(rules_path)
+            except (OSError, ValueError) as e:
+                self.logMsg(f"Помилка у файлі правил: {e}")
+                return
+
+        self._setBusy(True)
         self.prgBar.setValue(0)
         self.logMsg(f"Починаємо... {factor_str}, filter='{creature_filter}'\n")
+        if rules_path:
+            self.logMsg("Правила: " + "; ".join(rule.describe() for rule in rules))
 
-        self.worker = InplacePatchWorker(pak_path, factor, do_backup, creature_filter, dry_run)
+        self.worker = InplacePatchWorker(pak_path, factor, do_backup, creature_filter, dry_run,
+                                         streaming=streaming, workers=workers,
+                                         engine=engine, output=output, rules=rules,
+                                         indexPath=default_index_path())
         self.worker.progressChanged.connect(self.onProgress)
-        self.worker.logMessage.connect(self.logMsg)
+        self.worker.logMessage.connect(self.txtLog.append, Qt.DirectConnection)
         self.worker.finishedSignal.connect(self.onFinished)
         self.worker.start()
 
+    def onBatch(self):
+        if self._isBusy():
+            return
+        path, _ = QFileDialog.getOpenFileName(self, "Select batch jobs file", "",
+                                              "JSON Files (*.json);;All Files (*.*)")
+        if not path:
+            return
+        try:
+            jobs = load_jobs(path)
+        except (OSError, ValueError) as e:
+            self.logMsg(f"Помилка у файлі завдань: {e}")
+            return
+
+        parallel = min(self.spnParallel.value(), len(jobs))
+        self._setBusy(True)
+        self.prgBar.setValue(0)
+        self.logMsg(f"Пакет: {len(jobs)} .pak, одночасно {parallel}\n")
+
+        # Процеси для .xdb ділимо між .pak, що йдуть одночасно
+        self.worker = BatchPatchWorker(
+            jobs, parallel, self.chkBackup.isChecked(), self.chkDryRun.isChecked(),
+            streaming=self.chkStreaming.isChecked(),
+            workers=max(1, self.spnWorkers.value() // parallel),
+            engine=ENGINE_FAST if self.chkFastEngine.isChecked() else ENGINE_ETREE,
+            indexPath=default_index_path(),
+        )
+        self.worker.progressChanged.connect(self.onProgress)
+        self.worker.logMessage.connect(self.txtLog.append, Qt.DirectConnection)
+        self.worker.finishedSignal.connect(self.onFinished)
+        self.worker.start()
+
+    def onBrowseRules(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Select rules file", "",
+                                              "JSON Files (*.json);;All Files (*.*)")
+        if path:
+            self.edtRules.setText(path)
+
     def onCheck(self):
         p = self.edtPakPath.text().strip()
         if not p:
@@ -357,11 +342,46 @@ class UniverseEditorTab(QWidget):
         self.logMsg(f"Перевірка:\n  read={can_read}, write_dir={can_write_dir}")
 
     def onRestore(self):
+        if self._isBusy():
+            return
         p = self.edtPakPath.text().strip()
+        if OUTPUT_MODES[self.cmbOutput.currentText()] == OUTPUT_OVERLAY:
+            # Оригінал не змінювався — досить прибрати overlay
+            overlay = overlay_path(p)
+            if remove_overlay(overlay):
+                self.logMsg(f"Overlay видалено: {overlay}")
+            else:
+                self.logMsg("overlay-файл не знайдено.")
+            return
         backup = p + ".backup"
-        if not os.path.exists(backup):
+        snapshots = BackupStore(p).snapshots() if p else []
+        choices = {}
+        for snap in reversed(snapshots):
+            label = (f"#{snap['id']} — стан до «{snap['note']}» "
+                     f"({snap['created']}, {len(snap['members'])} файлів)")
+            choices[label] = snap["id"]
+        if os.path.exists(backup):
+            choices["Повна копія .backup"] = None
+
+        if not choices:
             self.logMsg("backup-файл не знайдено.")
             return
+        label, ok = QInputDialog.getItem(self, "Відновлення", "Оберіть точку відновлення:",
+                                         list(choices.keys()), 0, False)
+        if not ok:
+            return
+
+        snap_id = choices[label]
+        if snap_id is not None:
+            self._setBusy(True)
+            self.prgBar.setValue(0)
+            self.worker = RestoreWorker(p, snap_id)
+            self.worker.progressChanged.connect(self.onProgress)
+            self.worker.logMessage.connect(self.txtLog.append, Qt.DirectConnection)
+            self.worker.finishedSignal.connect(self.onFinished)
+            self.worker.start()
+            return
+
         if os.path.exists(p):
             os.remove(p)
         os.rename(backup, p)
@@ -372,7 +392,7 @@ class UniverseEditorTab(QWidget):
 
     def onFinished(self, msg):
         self.logMsg(msg)
-        self.btnRun.setEnabled(True)
+        self._setBusy(False)
         self.prgBar.setValue(100)
 
         # beep